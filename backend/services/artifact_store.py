@@ -0,0 +1,140 @@
+"""
+Per-request output artifacts (HTML visualizations, JSONL results).
+
+Each result is saved under its own content-addressed directory
+``<root>/<artifact_id>/<name>``, so concurrent requests never overwrite each
+other and identical results are stored once. ``save`` does no disk I/O: files
+are written by a single background writer thread. Until a write lands, reads
+are served from memory. Old artifacts are pruned by count and age.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from backend.services.atomic_files import BackgroundWriter, atomic_write
+
+logger = logging.getLogger(__name__)
+
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{16,64}$")
+
+Content = Union[str, bytes]
+
+
+def _to_bytes(content: Content) -> bytes:
+    return content.encode("utf-8") if isinstance(content, str) else content
+
+
+class ArtifactStore:
+    """Content-addressed artifact directories with background writes and retention."""
+
+    def __init__(
+        self, root_dir: str, max_artifacts: int = 200, max_age_seconds: float = 7 * 24 * 3600
+    ):
+        self.root_dir = Path(root_dir)
+        self.max_artifacts = max_artifacts
+        self.max_age_seconds = max_age_seconds
+        self.latest_id: Optional[str] = None
+        self.written = 0
+        self.pruned = 0
+        self._pending: Dict[str, Dict[str, bytes]] = {}
+        self._lock = threading.Lock()
+        self._writer = BackgroundWriter("artifacts")
+
+    @staticmethod
+    def is_valid_id(artifact_id: str) -> bool:
+        return bool(_ARTIFACT_ID.match(artifact_id))
+
+    def save(self, files: Dict[str, Content]) -> str:
+        """
+        Queue ``files`` ({name: content}) for writing and return the artifact id.
+
+        The id is a hash of the contents, so saving identical results twice
+        reuses one artifact.
+        """
+        encoded = {name: _to_bytes(content) for name, content in files.items()}
+        digest = hashlib.sha256()
+        for name in sorted(encoded):
+            digest.update(name.encode("utf-8") + b"\0" + encoded[name] + b"\0")
+        artifact_id = digest.hexdigest()[:24]
+
+        with self._lock:
+            self.latest_id = artifact_id
+            if artifact_id in self._pending:
+                return artifact_id
+            self._pending[artifact_id] = encoded
+        self._writer.submit(self._write, artifact_id, encoded)
+        return artifact_id
+
+    def paths(self, artifact_id: str, names) -> Dict[str, str]:
+        """Where each named file of an artifact is (or will be) stored."""
+        return {name: str(self.root_dir / artifact_id / name) for name in names}
+
+    def read(self, artifact_id: str, name: str) -> Optional[bytes]:
+        """Return a file of an artifact, or None if unknown, pruned or invalid."""
+        if not self.is_valid_id(artifact_id) or "/" in name or "\\" in name:
+            return None
+        with self._lock:
+            pending = self._pending.get(artifact_id)
+            if pending is not None:
+                return pending.get(name)
+        try:
+            return (self.root_dir / artifact_id / name).read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, artifact_id: str, files: Dict[str, bytes]):
+        directory = self.root_dir / artifact_id
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, data in files.items():
+                if (directory / name).exists():
+                    continue  # Same id means same content
+                # Write-then-rename so readers never see a partial file
+                atomic_write(directory / name, data)
+            # Touch the directory so retention sees the artifact as recent
+            os.utime(directory)
+            self.written += 1
+        except OSError as e:
+            logger.error(f"Could not write artifact {artifact_id}: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(artifact_id, None)
+        self._prune()
+
+    def _prune(self):
+        """Delete artifacts older than max_age_seconds, then the oldest beyond max_artifacts."""
+        try:
+            directories = [(d.stat().st_mtime, d) for d in self.root_dir.iterdir() if d.is_dir()]
+        except OSError:
+            return
+        directories.sort(reverse=True)
+        now = time.time()
+        for rank, (mtime, directory) in enumerate(directories):
+            if rank >= self.max_artifacts or now - mtime > self.max_age_seconds:
+                if directory.name == self.latest_id:
+                    continue
+                shutil.rmtree(directory, ignore_errors=True)
+                self.pruned += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending_writes": pending,
+            "written": self.written,
+            "pruned": self.pruned,
+            "latest_id": self.latest_id,
+            "max_artifacts": self.max_artifacts,
+            "max_age_seconds": self.max_age_seconds,
+        }
+
+    def close(self):
+        """Finish queued writes (call on shutdown)."""
+        self._writer.close()
@@ -0,0 +1,90 @@
+"""
+Crash-safe file writes shared by the output writer, artifact store and caches.
+
+``atomic_write`` writes to a temporary file in the target's directory and
+renames it over the target, so readers see either the old file or the whole
+new one, never a partial write. ``BackgroundWriter`` runs write jobs in order
+on one daemon thread, so request handlers never wait on the disk; a bounded
+queue applies backpressure instead of growing without limit.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """Write ``data`` to ``path`` via a temporary file and an atomic rename."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class BackgroundWriter:
+    """One daemon thread running queued write jobs in submission order."""
+
+    def __init__(self, name: str, queue_size: int = 0):
+        """
+        Args:
+            name: Thread name
+            queue_size: Jobs that can wait before ``submit`` blocks (0 = unbounded)
+        """
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args):
+        """Queue ``fn(*args)``, blocking while the queue is full."""
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        self._queue.put((fn, args))
+
+    async def submit_async(self, fn: Callable, *args):
+        """Queue ``fn(*args)``; when the queue is full, wait off the event loop."""
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            logger.warning(f"{self._thread.name} queue is full; waiting for the writer to catch up")
+            await asyncio.to_thread(self._queue.put, (fn, args))
+
+    def pending(self) -> int:
+        """Jobs queued and not yet started."""
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args = job
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Background write failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        """Run everything still queued, then stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
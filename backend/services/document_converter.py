@@ -1,5 +1,5 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict
 import tempfile
@@ -11,7 +11,10 @@ import warnings
 from pathlib import Path
 from docling.document_converter import DocumentConverter
 import httpx
-from typing import Optional
+from typing import Dict, List, Optional
+
+from backend.services.output_writer import OutputWriter, safe_stem
+from backend.services.streaming import MEDIA_TYPES, STREAM_HEADERS, StreamProtocol, encode_event
 
 # Suppress warnings from external libraries
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -46,8 +49,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Development setting: Save outputs to folder (1=save, 0=don't save)
-OUTPUT_SAVING = 1
+# Save outputs to the output folder by default (1=save, 0=don't save);
+# each request can override this with ?save_outputs=
+OUTPUT_SAVING = int(os.getenv("CONVERTER_OUTPUT_SAVING", "1"))
+# Write gzip-compressed outputs (".gz") by default; override with ?compress_outputs=
+OUTPUT_COMPRESSION = os.getenv("CONVERTER_OUTPUT_COMPRESSION", "0") == "1"
+OUTPUT_DIR = os.getenv("CONVERTER_OUTPUT_DIR", "output")
+# Files waiting for the background writer before requests wait for it
+OUTPUT_QUEUE_SIZE = int(os.getenv("CONVERTER_OUTPUT_QUEUE_SIZE", "64"))
+
+output_writer = OutputWriter(OUTPUT_DIR, queue_size=OUTPUT_QUEUE_SIZE)
 
 # Initialize Docling converter
 logger.info("Initializing Docling DocumentConverter...")
@@ -73,25 +84,55 @@ async def root():
         "supported_formats": list(SUPPORTED_FORMATS),
         "endpoints": {
             "POST /convert": "Convert document to markdown/text",
-            "POST /convert-with-sentiment": "Convert document and analyze sentiment with HTML annotation",
+            "POST /convert-with-sentiment": (
+                "Convert document and analyze sentiment with HTML annotation "
+                "(stream=true relays results as NDJSON/SSE)"
+            ),
             "GET /health": "Health check endpoint"
         }
     }
 
 
+@app.on_event("shutdown")
+async def flush_outputs():
+    """Finish queued output writes"""
+    output_writer.close()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "document-converter"}
+    return {
+        "status": "healthy",
+        "service": "document-converter",
+        "outputs": {
+            "saving": OUTPUT_SAVING == 1,
+            "compression": OUTPUT_COMPRESSION,
+            **output_writer.stats()
+        }
+    }
+
+
+def resolve_output_options(save_outputs: Optional[bool], compress_outputs: Optional[bool]):
+    """Per-request output settings, falling back to the deployment defaults."""
+    save = OUTPUT_SAVING == 1 if save_outputs is None else save_outputs
+    compress = OUTPUT_COMPRESSION if compress_outputs is None else compress_outputs
+    return save, compress
 
 
 @app.post("/convert")
-async def convert_to_markdown(file: UploadFile = File(...)):
+async def convert_to_markdown(
+    file: UploadFile = File(...),
+    save_outputs: Optional[bool] = None,
+    compress_outputs: Optional[bool] = None
+):
     """
     Convert uploaded document to markdown format
 
     Args:
         file: Uploaded file in supported format
+        save_outputs: Save outputs for this request (default: CONVERTER_OUTPUT_SAVING)
+        compress_outputs: Gzip saved outputs (default: CONVERTER_OUTPUT_COMPRESSION)
 
     Returns:
         JSON response with markdown content
@@ -169,34 +210,16 @@ async def convert_to_markdown(file: UploadFile = File(...)):
             # No head tag, wrap content
             html_content = f"<!DOCTYPE html><html><head>{custom_css}</head><body>{html_content_raw}</body></html>"
 
-        # Save outputs if enabled
+        # Queue outputs for the background writer if enabled
+        save, compress = resolve_output_options(save_outputs, compress_outputs)
         saved_files = {}
-        if OUTPUT_SAVING == 1:
-            output_dir = Path("output")
-            output_dir.mkdir(exist_ok=True)
-
-            base_name = Path(file.filename).stem
-
-            # Save text
-            text_path = output_dir / f"{base_name}.txt"
-            with open(text_path, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-            saved_files["text"] = str(text_path)
-            logger.debug(f"Saved text output to {text_path}")
-
-            # Save markdown
-            md_path = output_dir / f"{base_name}.md"
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            saved_files["markdown"] = str(md_path)
-            logger.debug(f"Saved markdown output to {md_path}")
-
-            # Save HTML
-            html_path = output_dir / f"{base_name}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            saved_files["html"] = str(html_path)
-            logger.debug(f"Saved HTML output to {html_path}")
+        if save:
+            saved_files = await output_writer.submit(safe_stem(file.filename), {
+                "text": (".txt", text_content),
+                "markdown": (".md", markdown_content),
+                "html": (".html", html_content)
+            }, compress=compress)
+            logger.debug(f"Queued outputs: {saved_files}")
 
         response_data = {
             "success": True,
@@ -207,7 +230,7 @@ async def convert_to_markdown(file: UploadFile = File(...)):
             "html": html_content
         }
 
-        if OUTPUT_SAVING == 1:
+        if save:
             response_data["saved_files"] = saved_files
 
         logger.info(f"Successfully converted {file.filename}")
@@ -229,10 +252,96 @@ async def convert_to_markdown(file: UploadFile = File(...)):
                 pass
 
 
+async def save_sentiment_outputs(base_name: str, text_content: str, markdown_content: str,
+                                 sentiment_results: List[Dict], annotated_html: str,
+                                 compress: bool = False) -> Dict[str, str]:
+    """Queue text, markdown, sentiment JSON and annotated HTML for the background writer."""
+    files = {
+        "text": (".txt", text_content),
+        "markdown": (".md", markdown_content),
+        # Compact JSON: these files are read by tools, not people
+        "sentiment_json": (
+            "_sentiment.json",
+            json.dumps(sentiment_results, ensure_ascii=False, separators=(",", ":")),
+        ),
+    }
+    if annotated_html:
+        files["annotated_html"] = ("_sentiment.html", annotated_html)
+    return await output_writer.submit(base_name, files, compress=compress)
+
+
+async def relay_sentiment_stream(stream_url: str, payload: Dict, document: Dict,
+                                 stream_format: StreamProtocol, base_name: str,
+                                 save: bool = True, compress: bool = False):
+    """
+    Relay the sentiment service's NDJSON stream to the client.
+
+    Emits a "document" event with the converted content first, then every
+    sentiment event as it arrives. Results are collected along the way so
+    outputs can still be saved once the stream completes.
+    """
+    yield encode_event({"event": "document", **document}, stream_format)
+
+    sentiment_results: List[Dict] = []
+    annotated_html = ""
+    completed = False
+    try:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=120.0)) as client:
+            async with client.stream("POST", stream_url, json=payload) as response:
+                if response.status_code != 200:
+                    detail = (await response.aread()).decode("utf-8", errors="replace")
+                    logger.error(
+                        f"Sentiment stream failed with status {response.status_code}: {detail}"
+                    )
+                    yield encode_event(
+                        {"event": "error", "detail": f"Sentiment analysis failed: {detail}"},
+                        stream_format
+                    )
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                    except ValueError as e:
+                        logger.error(f"Malformed sentiment stream event: {line[:200]!r}")
+                        detail = f"Malformed event from sentiment API: {e}"
+                        yield encode_event({"event": "error", "detail": detail}, stream_format)
+                        return
+                    if event.get("event") == "batch":
+                        sentiment_results.extend(event.get("results", []))
+                    elif event.get("event") == "highlighted_html":
+                        annotated_html = event["highlighted_html"]
+                    elif event.get("event") == "done":
+                        completed = True
+                    yield encode_event(event, stream_format)
+
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP Error relaying sentiment stream: {str(e)}", exc_info=True)
+        yield encode_event(
+            {"event": "error", "detail": f"Error communicating with sentiment API: {str(e)}"},
+            stream_format
+        )
+        return
+
+    if completed and save:
+        saved_files = await save_sentiment_outputs(
+            base_name, document["text"], document["markdown"], sentiment_results, annotated_html,
+            compress,
+        )
+        yield encode_event({"event": "saved_files", "saved_files": saved_files}, stream_format)
+    logger.info(f"Relayed sentiment stream with {len(sentiment_results)} results")
+
+
 @app.post("/convert-with-sentiment")
 async def convert_with_sentiment_analysis(
     file: UploadFile = File(...),
-    sentiment_api_url: str = "http://localhost:8001/analyze"
+    sentiment_api_url: str = "http://localhost:8001/analyze",
+    stream: bool = False,
+    stream_format: StreamProtocol = "ndjson",
+    save_outputs: Optional[bool] = None,
+    compress_outputs: Optional[bool] = None
 ):
     """
     Convert document and analyze sentiment with HTML annotation
@@ -240,9 +349,14 @@ async def convert_with_sentiment_analysis(
     Args:
         file: Uploaded file in supported format
         sentiment_api_url: URL of sentiment analysis API (default: http://localhost:8001/analyze)
+        stream: Relay sentiment results as they are scored instead of one JSON response
+        stream_format: "ndjson" (default) or "sse" when streaming
+        save_outputs: Save outputs for this request (default: CONVERTER_OUTPUT_SAVING)
+        compress_outputs: Gzip saved outputs (default: CONVERTER_OUTPUT_COMPRESSION)
 
     Returns:
-        JSON response with markdown, text, sentiment analysis, and annotated HTML
+        JSON response with markdown, text, sentiment analysis, and annotated HTML,
+        or a stream of a "document" event followed by the sentiment service events
     """
     logger.info(f"Received conversion with sentiment analysis request for file: {file.filename}")
 
@@ -256,6 +370,7 @@ async def convert_with_sentiment_analysis(
             detail=f"Unsupported file format: {file_extension}. Supported formats: {', '.join(SUPPORTED_FORMATS)}"
         )
 
+    save, compress = resolve_output_options(save_outputs, compress_outputs)
     temp_file = None
     try:
         # Read file content
@@ -314,6 +429,29 @@ async def convert_with_sentiment_analysis(
         # Use markdown for better structure preservation, fallback to text if markdown is poor
         analysis_text = markdown_content if markdown_content and len(markdown_content) > len(text_content) * 0.5 else text_content
 
+        if stream:
+            stream_url = sentiment_api_url.rstrip("/") + "/stream"
+            logger.info(f"Relaying sentiment stream from {stream_url}")
+            document = {
+                "filename": file.filename,
+                "format": file_extension,
+                "markdown": markdown_content,
+                "text": text_content
+            }
+            return StreamingResponse(
+                relay_sentiment_stream(
+                    stream_url,
+                    {"text": analysis_text, "html": html_content},
+                    document,
+                    stream_format,
+                    safe_stem(file.filename),
+                    save,
+                    compress
+                ),
+                media_type=MEDIA_TYPES[stream_format],
+                headers=STREAM_HEADERS
+            )
+
         # Call sentiment analysis API with both text and HTML
         logger.info(f"Calling sentiment analysis API at {sentiment_api_url}")
         async with httpx.AsyncClient(timeout=30.0) as client:
@@ -338,36 +476,11 @@ async def convert_with_sentiment_analysis(
 
         # Save outputs if enabled
         saved_files = {}
-        if OUTPUT_SAVING == 1:
-            output_dir = Path("output")
-            output_dir.mkdir(exist_ok=True)
-
-            base_name = Path(file.filename).stem
-
-            # Save text
-            text_path = output_dir / f"{base_name}.txt"
-            with open(text_path, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-            saved_files["text"] = str(text_path)
-
-            # Save markdown
-            md_path = output_dir / f"{base_name}.md"
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            saved_files["markdown"] = str(md_path)
-
-            # Save sentiment results as JSON
-            sentiment_json_path = output_dir / f"{base_name}_sentiment.json"
-            with open(sentiment_json_path, 'w', encoding='utf-8') as f:
-                json.dump(sentiment_results, f, indent=2, ensure_ascii=False)
-            saved_files["sentiment_json"] = str(sentiment_json_path)
-
-            # Save annotated HTML if available
-            if annotated_html:
-                html_path = output_dir / f"{base_name}_sentiment.html"
-                with open(html_path, 'w', encoding='utf-8') as f:
-                    f.write(annotated_html)
-                saved_files["annotated_html"] = str(html_path)
+        if save:
+            saved_files = await save_sentiment_outputs(
+                safe_stem(file.filename), text_content, markdown_content, sentiment_results,
+                annotated_html, compress,
+            )
 
         response_data = {
             "success": True,
@@ -379,7 +492,7 @@ async def convert_with_sentiment_analysis(
             "annotated_html": annotated_html
         }
 
-        if OUTPUT_SAVING == 1:
+        if save:
             response_data["saved_files"] = saved_files
 
         logger.info(f"Successfully converted {file.filename} with sentiment analysis")
@@ -0,0 +1,73 @@
+"""
+Per-document entity index.
+
+Groups NER mentions by (normalized surface form, entity type). Each entry
+holds the mention count, all offsets as parallel ``starts``/``ends`` arrays,
+and max/mean score, so a 10-K with 300 mentions of "Apple Inc." yields one
+entry instead of 300 mention dicts.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List
+
+# Legal-form suffixes dropped when normalizing organisation names
+ORG_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "plc",
+    "sa", "ag", "nv",
+}
+
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_entity(word: str, entity_group: str) -> str:
+    """Normalized surface form: NFKC, casefolded, collapsed whitespace, no edge punctuation."""
+    form = unicodedata.normalize("NFKC", word).replace("##", "")
+    form = _WHITESPACE.sub(" ", _EDGE_PUNCTUATION.sub("", form)).casefold()
+    if entity_group == "ORG":
+        tokens = form.split(" ")
+        while len(tokens) > 1 and tokens[-1].rstrip(".,") in ORG_SUFFIXES:
+            tokens.pop()
+        form = _EDGE_PUNCTUATION.sub("", " ".join(tokens))
+    return form or word
+
+
+def build_entity_index(entities: List[Dict]) -> List[Dict]:
+    """
+    Build the entity index for one document.
+
+    Args:
+        entities: Mention dicts ("entity_group", "word", "start", "end", "score")
+
+    Returns:
+        Entries sorted by mention count (descending), then first offset. "text"
+        is the most frequent surface form of the entry.
+    """
+    groups: Dict[tuple, Dict] = {}
+    for entity in sorted(entities, key=lambda e: e["start"]):
+        key = (normalize_entity(entity["word"], entity["entity_group"]), entity["entity_group"])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"forms": Counter(), "starts": [], "ends": [], "scores": []}
+        group["forms"][entity["word"]] += 1
+        group["starts"].append(entity["start"])
+        group["ends"].append(entity["end"])
+        group["scores"].append(entity["score"])
+
+    index = [
+        {
+            "text": group["forms"].most_common(1)[0][0],
+            "normalized": normalized,
+            "entity_group": entity_group,
+            "count": len(group["starts"]),
+            "starts": group["starts"],
+            "ends": group["ends"],
+            "max_score": round(max(group["scores"]), 4),
+            "mean_score": round(sum(group["scores"]) / len(group["scores"]), 4),
+        }
+        for (normalized, entity_group), group in groups.items()
+    ]
+    index.sort(key=lambda entry: (-entry["count"], entry["starts"][0]))
+    return index
@@ -0,0 +1,209 @@
+"""
+Align extraction strings to their occurrences in the source text.
+
+LLM providers return extraction text, and only sometimes character offsets.
+A plain ``text.find`` maps every repeated value ("$1.2 billion", "the
+Company") to its first occurrence and rescans the text for each extraction.
+Instead, all extraction strings go into one Aho-Corasick automaton and the
+text is scanned once. Each extraction is then assigned to one occurrence:
+
+1. a provider interval that matches the text exactly is kept;
+2. an interval that doesn't match is used as a hint: the nearest occurrence wins;
+3. otherwise extractions are assumed to be in reading order, and each takes
+   the first unused occurrence at or after the previous extraction.
+
+Extractions with no exact occurrence are retried against a normalized view
+(NFKC, casefolded, whitespace runs collapsed) that maps back to the original
+offsets. Both passes are linear in text length plus the number of matches.
+"""
+
+import unicodedata
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+Interval = Tuple[int, int]
+
+
+class AhoCorasick:
+    """Multi-pattern exact string matcher."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        # Nearest state on the failure chain that ends a pattern (-1 if none)
+        self._out_link: List[int] = [-1]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._out_link.append(-1)
+                state = next_state
+            if pattern:
+                self._out[state].append(index)
+
+        # Breadth-first failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._out_link[child] = fail if self._out[fail] else self._out_link[fail]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (pattern_index, start, end) for every (possibly overlapping) match."""
+        goto, fail, out, out_link = self._goto, self._fail, self._out, self._out_link
+        lengths = [len(p) for p in self.patterns]
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            match_state = state if out[state] else out_link[state]
+            while match_state != -1:
+                for index in out[match_state]:
+                    yield index, position + 1 - lengths[index], position + 1
+                match_state = out_link[match_state]
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Build the fuzzy-matching view of ``text``.
+
+    Returns the normalized string and, for each of its characters, the index
+    of the original character it came from.
+    """
+    chars = []
+    offsets = []
+    in_space = False
+    for index, ch in enumerate(text):
+        if ch.isspace():
+            if not in_space:
+                chars.append(" ")
+                offsets.append(index)
+            in_space = True
+            continue
+        in_space = False
+        for norm_ch in unicodedata.normalize("NFKC", ch).casefold():
+            chars.append(norm_ch)
+            offsets.append(index)
+    return "".join(chars), offsets
+
+
+def _normalize(text: str) -> str:
+    return normalize_with_offsets(text)[0].strip()
+
+
+def _occurrences(text: str, patterns: List[str]) -> Dict[str, List[int]]:
+    """Start offsets of every occurrence of each pattern, in ascending order."""
+    starts: Dict[str, List[int]] = {pattern: [] for pattern in patterns}
+    for index, start, _ in AhoCorasick(patterns).finditer(text):
+        starts[patterns[index]].append(start)
+    return starts
+
+
+def _pick(occurrences: List[int], used: Set[int], hint: Optional[int], cursor: int) -> int:
+    """Choose one occurrence start; see the module docstring for the rules."""
+    if hint is not None:
+        i = bisect_left(occurrences, hint)
+        neighbours = occurrences[max(i - 1, 0):i + 1]
+        return min(neighbours, key=lambda start: abs(start - hint))
+
+    first = bisect_left(occurrences, cursor)
+    for start in occurrences[first:]:
+        if start not in used:
+            return start
+    for start in occurrences[:first]:
+        if start not in used:
+            return start
+    # More mentions than occurrences: reuse the nearest one in reading order
+    return occurrences[min(first, len(occurrences) - 1)]
+
+
+def align_extractions(text: str, extraction_texts: Sequence[str],
+                      intervals: Sequence[Optional[Interval]]) -> List[Optional[Interval]]:
+    """
+    Assign each extraction to an occurrence in ``text``.
+
+    Args:
+        text: Text the extractions came from
+        extraction_texts: Extraction strings, in the order the provider returned them
+        intervals: Provider (start, end) per extraction, or None when not given
+
+    Returns:
+        (start, end) per extraction, or None if it can't be found even fuzzily
+    """
+    aligned: List[Optional[Interval]] = [None] * len(extraction_texts)
+    hints: List[Optional[int]] = [None] * len(extraction_texts)
+    for i, (ext_text, interval) in enumerate(zip(extraction_texts, intervals)):
+        if interval is None:
+            continue
+        start, end = interval
+        if ext_text and text[start:end] == ext_text:
+            aligned[i] = (start, end)
+        else:
+            hints[i] = start
+
+    exact = sorted({t for i, t in enumerate(extraction_texts) if t and aligned[i] is None})
+    occurrences = _occurrences(text, exact) if exact else {}
+
+    used: Dict[str, Set[int]] = {}
+    cursor = 0
+    for i, ext_text in enumerate(extraction_texts):
+        if aligned[i] is not None:
+            cursor = aligned[i][0]
+            used.setdefault(ext_text, set()).add(cursor)
+            continue
+        if not occurrences.get(ext_text):
+            continue
+        start = _pick(occurrences[ext_text], used.setdefault(ext_text, set()), hints[i], cursor)
+        used[ext_text].add(start)
+        aligned[i] = (start, start + len(ext_text))
+        cursor = start
+
+    missing = [
+        i for i, ext_text in enumerate(extraction_texts)
+        if aligned[i] is None and ext_text.strip()
+    ]
+    if missing:
+        _align_fuzzy(text, extraction_texts, hints, aligned, missing)
+    return aligned
+
+
+def _align_fuzzy(text: str, extraction_texts: Sequence[str], hints: List[Optional[int]],
+                 aligned: List[Optional[Interval]], missing: List[int]):
+    """Second pass over the normalized view for extractions with no exact occurrence."""
+    norm_text, offsets = normalize_with_offsets(text)
+    norm_patterns = {i: _normalize(extraction_texts[i]) for i in missing}
+    occurrences = _occurrences(norm_text, sorted(set(p for p in norm_patterns.values() if p)))
+
+    used: Dict[str, Set[int]] = {}
+    for i in missing:
+        pattern = norm_patterns[i]
+        if not occurrences.get(pattern):
+            continue
+        # Cursor: position of the closest preceding aligned extraction
+        cursor_original = next(
+            (aligned[j][0] for j in range(i - 1, -1, -1) if aligned[j] is not None), 0
+        )
+        cursor = bisect_left(offsets, cursor_original)
+        hint = bisect_left(offsets, hints[i]) if hints[i] is not None else None
+        start = _pick(occurrences[pattern], used.setdefault(pattern, set()), hint, cursor)
+        used[pattern].add(start)
+        end = start + len(pattern)
+        aligned[i] = (offsets[start], offsets[end - 1] + 1)
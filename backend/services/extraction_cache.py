@@ -0,0 +1,151 @@
+"""
+Persistent on-disk cache for LangExtract results.
+
+Entries are JSON files keyed by a SHA-256 over everything that determines an
+extraction result: normalized text, prompt, canonicalized examples, model id
+and provider/chunking settings. Entries expire after a TTL and the oldest
+entries are evicted once the cache grows past its size cap.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.services.atomic_files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_json(value) -> str:
+    """Stable JSON encoding (sorted keys, no whitespace) for hashing."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class ExtractionCache:
+    """Size-capped, TTL-bounded JSON file cache (``ttl_seconds=None`` never expires)."""
+
+    def __init__(self, cache_dir: str, ttl_seconds: Optional[float], max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(f.stat().st_size for f in self._entries())
+
+    @staticmethod
+    def make_key(text: str, prompt: str, examples: List[Dict], model_id: str, **settings) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            text: Normalized document text
+            prompt: Normalized prompt description
+            examples: Examples as plain dicts (normalized)
+            model_id: Model identifier
+            **settings: Anything else that changes the result (provider, chunking)
+        """
+        digest = hashlib.sha256()
+        for part in (text, prompt, canonical_json(examples), model_id, canonical_json(settings)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entries(self):
+        return self.cache_dir.glob("*/*.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached value, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self._expired(stat.st_mtime, time.time()):
+                self._remove(path, stat.st_size)
+                raise FileNotFoundError
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict):
+        """Store a value atomically, then evict old entries if over the size cap."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            atomic_write(path, data)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {key[:12]}: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += len(data) - previous
+            over_cap = self._total_bytes > self.max_bytes
+        if over_cap:
+            self._evict()
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - mtime > self.ttl_seconds
+
+    def _remove(self, path: Path, size: int):
+        try:
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def _evict(self):
+        """Drop expired entries, then the oldest ones until under 90% of the cap."""
+        entries = []
+        now = time.time()
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self._expired(stat.st_mtime, now):
+                self._remove(path, stat.st_size)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if self._total_bytes <= target:
+                break
+            self._remove(path, size)
+            evicted += 1
+        if evicted:
+            logger.info(
+                f"Evicted {evicted} extraction cache entries (size cap {self.max_bytes} bytes)"
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
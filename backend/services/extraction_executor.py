@@ -0,0 +1,160 @@
+"""
+App-lifetime thread pool for blocking LLM calls, awaited through asyncio.
+
+One bounded pool is shared by all requests so concurrent extractions queue
+for a fixed number of worker threads instead of each request spawning its
+own pool. Calls wait for a free worker in priority order (interactive before
+batch, FIFO within a priority), so a large batch cannot starve interactive
+requests even when no rate limits are configured. A call's timeout starts
+once a worker picks it up, so time spent waiting its turn never counts
+against it. A request can give up immediately; work that has not started yet
+is cancelled and work already running finishes in the background without
+holding the request.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class MeteredExecutor:
+    """Bounded ThreadPoolExecutor with queueing and latency metrics."""
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "extraction"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        # Admission: free workers, and callers waiting for one as (priority, sequence, future)
+        self._free = max_workers
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    async def _admit(self, priority: int):
+        """Wait for a free worker; lower priority values are admitted first."""
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        admitted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), admitted))
+        try:
+            await admitted
+        except asyncio.CancelledError:
+            # Admitted just as the caller gave up: pass the worker on
+            if admitted.done() and not admitted.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        """Hand a finished worker to the next waiter (cancelled waiters are skipped)."""
+        while self._waiters:
+            _, _, admitted = heapq.heappop(self._waiters)
+            if not admitted.done():
+                admitted.set_result(None)
+                return
+        self._free += 1
+
+    async def run(self, fn: Callable, *args, priority: int = 0, timeout: Optional[float] = None):
+        """
+        Run ``fn(*args)`` on the pool and await the result.
+
+        Raises:
+            asyncio.TimeoutError: if the call runs longer than ``timeout``
+                seconds (it keeps running in the background)
+        """
+        submitted = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        try:
+            await self._admit(priority)
+        except asyncio.CancelledError:
+            with self._lock:
+                self.queued -= 1
+                self.cancelled += 1
+            raise
+        loop = asyncio.get_running_loop()
+        started = threading.Event()
+
+        def call():
+            started.set()
+            start = time.monotonic()
+            wait = start - submitted
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self._run_total += time.monotonic() - start
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                self._release()  # Event loop already closed: nothing is waiting on it
+
+        pool_future = self._executor.submit(call)
+        # Runs once the call finishes, or right away if it is cancelled before starting
+        pool_future.add_done_callback(release)
+        try:
+            # Admitted, so a worker is free: the timeout covers the call itself
+            return await asyncio.wait_for(asyncio.wrap_future(pool_future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+                if not started.is_set():
+                    self.queued -= 1
+            raise
+        except asyncio.CancelledError:
+            # Cancelling the wrapped future also cancels the pool task if it has not started
+            if not started.is_set():
+                with self._lock:
+                    self.queued -= 1
+                    self.cancelled += 1
+            raise
+
+    def stats(self) -> Dict:
+        with self._lock:
+            started = self.completed + self.failed + self.running
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "waiting_for_worker": len(self._waiters),
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "timed_out": self.timed_out,
+                "avg_queue_wait_seconds": self._wait_total / started if started else 0.0,
+                "max_queue_wait_seconds": self._wait_max,
+                "avg_run_seconds": self._run_total / finished if finished else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
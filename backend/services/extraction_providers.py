@@ -0,0 +1,260 @@
+"""
+Pluggable extraction providers for the LangExtract service.
+
+A provider turns (text, prompt, examples, model_id) into an annotated
+document: an object with ``text`` and ``extractions``, where each extraction
+has ``extraction_class``, ``extraction_text``, ``attributes`` and optionally
+``char_interval``. Available providers:
+
+- ``gemini``: the real LLM call through ``lx.extract``
+- ``stub``: deterministic regex extraction driven by the request's examples
+
+Either provider can be wrapped in ``ReplayProvider``. In record mode it saves
+every response to disk; in replay mode it serves the saved responses without
+calling the provider at all, so the rest of the pipeline can be benchmarked
+offline against realistic model output.
+"""
+
+import abc
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from backend.services.extraction_cache import ExtractionCache
+from backend.services.stub_models import StubAnnotatedDocument, StubExtraction, stub_extract
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODES = ("off", "record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no recording exists for a call."""
+
+
+class ProviderThrottledError(RuntimeError):
+    """Rate-limit response from a provider (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    status_code = 429
+
+
+def char_interval(ext) -> Optional[Tuple[int, int]]:
+    """Return (start, end) of an extraction's char_interval if the provider set one."""
+    interval = getattr(ext, "char_interval", None)
+    if interval is None:
+        return None
+    if isinstance(interval, dict):
+        start, end = interval.get("start_pos"), interval.get("end_pos")
+    else:
+        start, end = getattr(interval, "start_pos", None), getattr(interval, "end_pos", None)
+    if start is None or end is None:
+        return None
+    return int(start), int(end)
+
+
+def document_to_dict(document) -> Dict:
+    """Serialize an annotated document from any provider to plain JSON types."""
+    extractions = []
+    for ext in getattr(document, "extractions", None) or []:
+        ext_dict = {
+            "extraction_class": ext.extraction_class,
+            "extraction_text": ext.extraction_text,
+            "attributes": dict(ext.attributes or {}),
+        }
+        interval = char_interval(ext)
+        if interval is not None:
+            ext_dict["char_interval"] = {"start_pos": interval[0], "end_pos": interval[1]}
+        extractions.append(ext_dict)
+    return {"text": getattr(document, "text", "") or "", "extractions": extractions}
+
+
+def document_from_dict(data: Dict) -> StubAnnotatedDocument:
+    """Inverse of ``document_to_dict``."""
+    return StubAnnotatedDocument(
+        text=data["text"],
+        extractions=[StubExtraction(**ext) for ext in data["extractions"]],
+    )
+
+
+class ExtractionProvider(abc.ABC):
+    """
+    Base class for extraction providers.
+
+    ``prepare`` is called once per request with the normalized example dicts
+    and may compile them into whatever ``extract`` needs; ``extract`` is then
+    called once per chunk, possibly from several threads at a time.
+    """
+
+    name = "base"
+    requires_api_key = False
+    requires_langextract = False
+
+    def prepare(self, examples: List[Dict]):
+        return examples
+
+    @abc.abstractmethod
+    def extract(self, text: str, prompt: str, prepared_examples, model_id: str):
+        """Extract from one chunk of text; returns an annotated document."""
+
+
+class GeminiProvider(ExtractionProvider):
+    """LLM extraction through ``lx.extract`` (needs LANGEXTRACT_API_KEY)."""
+
+    name = "gemini"
+    requires_api_key = True
+    requires_langextract = True
+
+    def prepare(self, examples: List[Dict]) -> list:
+        import langextract as lx
+
+        return [
+            lx.data.ExampleData(
+                text=example["text"],
+                extractions=[
+                    lx.data.Extraction(
+                        extraction_class=ext["extraction_class"],
+                        extraction_text=ext["extraction_text"],
+                        attributes=ext["attributes"]
+                    )
+                    for ext in example["extractions"]
+                ]
+            )
+            for example in examples
+        ]
+
+    def extract(self, text: str, prompt: str, prepared_examples, model_id: str):
+        import langextract as lx
+
+        return lx.extract(
+            text_or_documents=text,
+            prompt_description=prompt,
+            examples=prepared_examples,
+            model_id=model_id,
+        )
+
+
+class StubProvider(ExtractionProvider):
+    """
+    Deterministic offline extraction from the request's examples (see ``stub_extract``).
+
+    With ``quota_rpm`` set, it simulates a provider quota: more than
+    ``quota_rpm`` calls in any 60 second window raise ProviderThrottledError.
+    """
+
+    name = "stub"
+
+    def __init__(self, quota_rpm: int = 0):
+        self.quota_rpm = quota_rpm
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def _check_quota(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] > 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.quota_rpm:
+                raise ProviderThrottledError(
+                    "429 RESOURCE_EXHAUSTED: simulated stub quota exceeded"
+                )
+            self._calls.append(now)
+
+    def prepare(self, examples: List[Dict]) -> List[StubAnnotatedDocument]:
+        return [document_from_dict(example) for example in examples]
+
+    def extract(
+        self, text: str, prompt: str, prepared_examples, model_id: str
+    ) -> StubAnnotatedDocument:
+        if self.quota_rpm:
+            self._check_quota()
+        return stub_extract(text, prepared_examples)
+
+
+class ReplayProvider(ExtractionProvider):
+    """
+    Record/replay wrapper around another provider.
+
+    Recordings are keyed by chunk text, prompt, examples, model id and the
+    wrapped provider's name, and stored as JSON files under ``replay_dir``.
+    """
+
+    def __init__(self, provider: ExtractionProvider, mode: str, replay_dir: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.provider = provider
+        self.mode = mode
+        self.name = provider.name
+        # Replay never needs credentials; recording calls the real provider
+        self.requires_api_key = provider.requires_api_key and mode == "record"
+        self.requires_langextract = provider.requires_langextract and mode == "record"
+        self.recordings = ExtractionCache(replay_dir, ttl_seconds=None, max_bytes=sys.maxsize)
+
+    def prepare(self, examples: List[Dict]) -> Tuple[List[Dict], object]:
+        inner = self.provider.prepare(examples) if self.mode == "record" else None
+        return examples, inner
+
+    def _key(self, text: str, prompt: str, examples: List[Dict], model_id: str) -> str:
+        return ExtractionCache.make_key(
+            text, prompt, examples, model_id, provider=self.provider.name
+        )
+
+    def extract(self, text: str, prompt: str, prepared_examples, model_id: str):
+        examples, inner = prepared_examples
+        key = self._key(text, prompt, examples, model_id)
+
+        if self.mode == "replay":
+            recorded = self.recordings.get(key)
+            if recorded is None:
+                raise ReplayMissError(
+                    f"No recorded {self.provider.name} response for this chunk (key {key[:12]}); "
+                    f"run with LANGEXTRACT_REPLAY_MODE=record first"
+                )
+            return document_from_dict(recorded)
+
+        document = self.provider.extract(text, prompt, inner, model_id)
+        self.recordings.put(key, document_to_dict(document))
+        return document
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, **self.recordings.stats()}
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "stub": StubProvider,
+}
+
+
+def create_provider(
+    name: str, replay_mode: str = "off", replay_dir: str = "", **options
+) -> ExtractionProvider:
+    """
+    Build the configured provider.
+
+    Args:
+        name: Key in PROVIDERS
+        replay_mode: "off", "record" or "replay"
+        replay_dir: Directory for recordings (record/replay modes)
+        **options: Provider constructor arguments (e.g. quota_rpm for the stub)
+
+    Raises:
+        ValueError: for an unknown provider name or replay mode
+    """
+    if name not in PROVIDERS:
+        raise ValueError(
+            f"Unknown extraction provider '{name}'. Choose one of: {', '.join(PROVIDERS)}"
+        )
+    if replay_mode not in REPLAY_MODES:
+        raise ValueError(
+            f"Unknown replay mode '{replay_mode}'. Choose one of: {', '.join(REPLAY_MODES)}"
+        )
+
+    provider = PROVIDERS[name](**options)
+    if replay_mode != "off":
+        provider = ReplayProvider(provider, replay_mode, replay_dir)
+        logger.info(
+            f"Extraction provider '{name}' in {replay_mode} mode (recordings in {replay_dir})"
+        )
+    return provider
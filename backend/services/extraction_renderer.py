@@ -0,0 +1,241 @@
+"""
+Single-pass HTML renderer for LangExtract results.
+
+Produces the same highlighted, navigable view as ``lx.visualize`` directly
+from in-memory extraction dicts, with no JSONL round trip and no HTML
+re-parsing. Every highlight carries ``data-extraction-index`` (the
+extraction's position in the response list, which the frontend uses for
+navigation) and ``data-idx`` (used by the embedded player script).
+"""
+
+import html
+import json
+from typing import Dict, List, Sequence
+
+# Same palette as lx.visualize so classes keep their familiar colours
+PALETTE = [
+    "#D2E3FC", "#C8E6C9", "#FEF0C3", "#F9DEDC", "#FFDDBE",
+    "#EADDFF", "#C4E9E4", "#FCE4EC", "#E8EAED", "#DDE8E8",
+]
+DEFAULT_COLOR = "#ffff8d"
+
+VISUALIZATION_CSS = """<style>
+.lx-highlight { position: relative; border-radius:3px; padding:1px 2px;}
+.lx-animated-wrapper { max-width: 100%; font-family: Arial, sans-serif; }
+.lx-controls {
+  background: #fafafa; border: 1px solid #90caf9; border-radius: 8px;
+  padding: 12px; margin-bottom: 16px;
+}
+.lx-button-row { display: flex; justify-content: center; gap: 8px; margin-bottom: 12px; }
+.lx-control-btn {
+  background: #4285f4; color: white; border: none; border-radius: 4px;
+  padding: 8px 16px; cursor: pointer; font-size: 13px; font-weight: 500;
+}
+.lx-control-btn:hover { background: #3367d6; }
+.lx-progress-slider { width: 100%; margin: 0; height: 6px; }
+.lx-status-text { text-align: center; font-size: 12px; color: #666; margin-top: 4px; }
+.lx-text-window {
+  font-family: monospace; white-space: pre-wrap; border: 1px solid #90caf9; padding: 12px;
+  max-height: 260px; overflow-y: auto; margin-bottom: 12px; line-height: 1.6;
+}
+.lx-attributes-panel {
+  background: #fafafa; border: 1px solid #90caf9; border-radius: 6px;
+  padding: 8px 10px; margin-top: 8px; font-size: 13px;
+}
+.lx-current-highlight {
+  text-decoration: underline; text-decoration-color: #ff4444;
+  text-decoration-thickness: 3px; font-weight: bold;
+}
+.lx-legend {
+  font-size: 12px; margin-bottom: 8px; padding-bottom: 8px; border-bottom: 1px solid #e0e0e0;
+}
+.lx-label {
+  display: inline-block; padding: 2px 4px; border-radius: 3px; margin-right: 4px; color: #000;
+}
+.lx-attr-key { font-weight: 600; color: #1565c0; }
+.lx-attr-value { font-weight: 400; opacity: 0.85; }
+</style>"""
+
+PLAYER_SCRIPT = """<script>
+(function() {
+  const extractions = %s;
+  let currentIndex = 0;
+  let timer = null;
+  function updateDisplay() {
+    const extraction = extractions[currentIndex];
+    if (!extraction) return;
+    document.getElementById('attributesContainer').innerHTML = extraction.attributesHtml;
+    document.getElementById('entityInfo').textContent =
+      (currentIndex + 1) + '/' + extractions.length;
+    document.getElementById('posInfo').textContent =
+      '[' + extraction.startPos + '-' + extraction.endPos + ']';
+    document.getElementById('progressSlider').value = currentIndex;
+    const previous = document.querySelector('.lx-text-window .lx-current-highlight');
+    if (previous) previous.classList.remove('lx-current-highlight');
+    const span = document.querySelector(
+      '.lx-text-window span[data-idx="' + extraction.index + '"]'
+    );
+    if (span) {
+      span.classList.add('lx-current-highlight');
+      span.scrollIntoView({block: 'center', behavior: 'smooth'});
+    }
+  }
+  window.nextExtraction = function() {
+    currentIndex = (currentIndex + 1) %% extractions.length;
+    updateDisplay();
+  };
+  window.prevExtraction = function() {
+    currentIndex = (currentIndex - 1 + extractions.length) %% extractions.length;
+    updateDisplay();
+  };
+  window.jumpToExtraction = function(index) { currentIndex = parseInt(index); updateDisplay(); };
+  window.playPause = function() {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
+    } else {
+      timer = setInterval(window.nextExtraction, 1000);
+    }
+    document.querySelector('.lx-control-btn').textContent = timer ? '⏸ Pause' : '▶️ Play';
+  };
+  updateDisplay();
+})();
+</script>"""
+
+
+def assign_colors(extractions: Sequence[Dict]) -> Dict[str, str]:
+    """Map each extraction class (sorted) to a palette colour."""
+    classes = sorted({e["extraction_class"] for e in extractions})
+    return {cls: PALETTE[i % len(PALETTE)] for i, cls in enumerate(classes)}
+
+
+def _format_attributes(attributes: Dict) -> str:
+    parts = [
+        f'<span class="lx-attr-key">{html.escape(str(key))}</span>: '
+        f'<span class="lx-attr-value">{html.escape(str(value))}</span>'
+        for key, value in (attributes or {}).items()
+        if value not in (None, "", "null")
+    ]
+    return "{" + ", ".join(parts) + "}"
+
+
+def _highlighted_text(text: str, spans: List[tuple], color_map: Dict[str, str]) -> str:
+    """
+    Escape ``text`` once, inserting a <span> per extraction.
+
+    ``spans`` holds (start, end, index, extraction_class). Nested spans nest;
+    spans that cross are split so the markup stays well formed.
+    """
+    events = []
+    for start, end, index, cls in spans:
+        # At the same offset: close before open, close inner first, open outer first
+        events.append((end, 0, -start, index, cls))
+        events.append((start, 1, -end, index, cls))
+    events.sort()
+
+    def open_tag(index: int, cls: str) -> str:
+        color = color_map.get(cls, DEFAULT_COLOR)
+        return (
+            f'<span class="lx-highlight" data-idx="{index}" data-extraction-index="{index}" '
+            f'style="background-color:{color};">'
+        )
+
+    parts = []
+    stack = []
+    cursor = 0
+    for position, kind, _, index, cls in events:
+        if position > cursor:
+            parts.append(html.escape(text[cursor:position]))
+            cursor = position
+        if kind == 1:
+            parts.append(open_tag(index, cls))
+            stack.append((index, cls))
+            continue
+        # Close everything opened after this span, then reopen it
+        reopen = []
+        while stack:
+            top = stack.pop()
+            parts.append("</span>")
+            if top[0] == index:
+                break
+            reopen.append(top)
+        for top in reversed(reopen):
+            parts.append(open_tag(*top))
+            stack.append(top)
+
+    parts.append(html.escape(text[cursor:]))
+    return "".join(parts)
+
+
+def render_extractions_html(text: str, extractions: Sequence[Dict]) -> str:
+    """
+    Render the highlighted visualization for ``extractions``.
+
+    Args:
+        text: Document text the offsets refer to
+        extractions: Extraction dicts as returned by /extract; those with
+            ``start_char``/``end_char`` (or ``char_interval``) are highlighted
+
+    Returns:
+        Self-contained HTML fragment (styles, highlighted text, player controls)
+    """
+    spans = []
+    for index, ext in enumerate(extractions):
+        if "start_char" in ext:
+            start, end = ext["start_char"], ext["end_char"]
+        elif ext.get("char_interval"):
+            start, end = ext["char_interval"]["start_pos"], ext["char_interval"]["end_pos"]
+        else:
+            continue
+        if start is not None and end is not None and start < end:
+            spans.append((start, end, index, ext["extraction_class"]))
+
+    if not spans:
+        return (
+            VISUALIZATION_CSS
+            + '<div class="lx-animated-wrapper"><p>No valid extractions to animate.</p></div>'
+        )
+
+    color_map = assign_colors([extractions[index] for _, _, index, _ in spans])
+    legend = " ".join(
+        f'<span class="lx-label" style="background-color:{color};">{html.escape(cls)}</span>'
+        for cls, color in color_map.items()
+    )
+
+    # Only what PLAYER_SCRIPT reads; the text itself is already in the text window
+    player_data = []
+    for start, end, index, cls in spans:
+        attributes_html = _format_attributes(extractions[index].get("attributes"))
+        player_data.append({
+            "index": index,
+            "startPos": start,
+            "endPos": end,
+            "attributesHtml": (
+                f"<div><strong>class:</strong> {html.escape(cls)}</div>"
+                f"<div><strong>attributes:</strong> {attributes_html}</div>"
+            ),
+        })
+
+    first_start, first_end = spans[0][0], spans[0][1]
+    # "</" would end the inline <script> early
+    script = PLAYER_SCRIPT % json.dumps(player_data, ensure_ascii=False).replace("</", "<\\/")
+    return "".join([
+        VISUALIZATION_CSS,
+        '<div class="lx-animated-wrapper">',
+        f'<div class="lx-attributes-panel"><div class="lx-legend">Highlights Legend: {legend}</div>'
+        '<div id="attributesContainer"></div></div>',
+        '<div class="lx-text-window" id="textWindow">',
+        _highlighted_text(text, spans, color_map),
+        '</div>',
+        '<div class="lx-controls"><div class="lx-button-row">'
+        '<button class="lx-control-btn" onclick="playPause()">▶️ Play</button>'
+        '<button class="lx-control-btn" onclick="prevExtraction()">⏮ Previous</button>'
+        '<button class="lx-control-btn" onclick="nextExtraction()">⏭ Next</button></div>',
+        '<div class="lx-progress-container">'
+        '<input type="range" id="progressSlider" class="lx-progress-slider" '
+        f'min="0" max="{len(spans) - 1}" value="0" onchange="jumpToExtraction(this.value)"></div>',
+        f'<div class="lx-status-text">Entity <span id="entityInfo">1/{len(spans)}</span> | '
+        f'Pos <span id="posInfo">[{first_start}-{first_end}]</span></div></div>',
+        '</div>',
+        script,
+    ])
@@ -0,0 +1,231 @@
+"""
+Fast sentiment tier: layer-truncated, distilled FinBERT and a two-stage cascade.
+
+The fast model is FinBERT with only its first N encoder layers kept (the
+embeddings and classifier head are reused). It is then distilled on local
+text against the full model's soft labels, so the head adapts to the
+shallower features. The result is saved with ``save_pretrained`` and
+loaded from disk with ``local_files_only``, so it needs no network.
+
+A source string of the form ``<model>#layers=N`` truncates at load time
+instead. That skips distillation, for a quick, less accurate tier.
+
+The cascade scores every sentence with the fast model. It re-scores only
+sentences whose top probability is below a threshold with the full model.
+
+Build a fast model (teacher weights from the local Hugging Face cache or a
+directory; the report compares speed and label agreement with the teacher):
+    python -m backend.services.fast_sentiment "filings/**/*.txt" --layers 4
+    python -m backend.services.fast_sentiment filings/ --teacher models/finbert --epochs 0
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.sentence_segmenter import segment_sentences
+from backend.services.sentiment_analysis import score_sentences
+
+TEACHER_MODEL = "ProsusAI/finbert"
+DEFAULT_OUTPUT = os.path.join("models", "finbert-fast")
+REPORT_FILE = "fast_sentiment.json"
+
+# "<source>#layers=N": keep only the first N encoder layers when loading
+LAYERS_SUFFIX = "#layers="
+
+
+def split_source(source: str) -> Tuple[str, Optional[int]]:
+    """("ProsusAI/finbert", 4) for "ProsusAI/finbert#layers=4"; (source, None) otherwise."""
+    path, _, layers = source.partition(LAYERS_SUFFIX)
+    return path, int(layers) if layers else None
+
+
+def load_classifier(source: str):
+    """
+    Load a (tokenizer, model) pair in eval mode.
+
+    Local directories load with ``local_files_only`` (no network access);
+    a ``#layers=N`` suffix truncates the encoder after loading.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    path, layers = split_source(source)
+    local = os.path.isdir(path)
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=local)
+    model = AutoModelForSequenceClassification.from_pretrained(path, local_files_only=local)
+    if layers:
+        truncate_layers(model, layers)
+    model.eval()
+    return tokenizer, model
+
+
+def truncate_layers(model, num_layers: int):
+    """Keep only the first num_layers encoder layers of a BERT-style classifier (in place)."""
+    import torch
+
+    encoder = getattr(model, model.base_model_prefix).encoder
+    if not 0 < num_layers <= len(encoder.layer):
+        raise ValueError(f"num_layers must be between 1 and {len(encoder.layer)}, got {num_layers}")
+    encoder.layer = torch.nn.ModuleList(list(encoder.layer)[:num_layers])
+    model.config.num_hidden_layers = num_layers
+    return model
+
+
+def cascade_scores(sentences: Sequence[str], score_fast: Callable[[List[str]], np.ndarray],
+                   score_full: Callable[[List[str]], np.ndarray], threshold: float):
+    """
+    Score with the fast model and re-score low-confidence sentences with the full one.
+
+    Returns:
+        (scores, escalated) where escalated[i] is True if sentence i was
+        re-scored because its fast top probability was below threshold
+    """
+    scores = score_fast(list(sentences))
+    escalated = scores.max(axis=1) < threshold
+    todo = np.flatnonzero(escalated).tolist()
+    if todo:
+        scores[todo] = score_full([sentences[i] for i in todo])
+    return scores, escalated
+
+
+def distill(student, teacher_scores: np.ndarray, tokenizer, sentences: Sequence[str], epochs: int,
+            batch_size: int, learning_rate: float, seed: int = 0) -> float:
+    """
+    Train the student to match the teacher's probabilities (KL divergence).
+
+    Returns:
+        Mean loss of the last epoch
+    """
+    import torch
+
+    torch.manual_seed(seed)
+    rng = random.Random(seed)
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate)
+    targets = torch.from_numpy(teacher_scores)
+    order = list(range(len(sentences)))
+    epoch_loss = 0.0
+    student.train()
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        losses = []
+        for batch_start in range(0, len(order), batch_size):
+            batch = order[batch_start:batch_start + batch_size]
+            inputs = tokenizer([sentences[i] for i in batch], return_tensors="pt", truncation=True,
+                               max_length=512, padding=True)
+            log_probs = torch.nn.functional.log_softmax(student(**inputs).logits, dim=-1)
+            loss = torch.nn.functional.kl_div(log_probs, targets[batch], reduction="batchmean")
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+        epoch_loss = float(np.mean(losses)) if losses else 0.0
+        print(f"Epoch {epoch + 1}/{epochs}: distillation loss {epoch_loss:.4f}")
+    student.eval()
+    return epoch_loss
+
+
+def evaluate(
+    tokenizer, teacher, student, sentences: Sequence[str], batch_size: int, threshold: float
+) -> dict:
+    """Speed and label agreement of the fast model and the cascade, relative to the teacher."""
+    started = time.perf_counter()
+    teacher_scores = score_sentences(sentences, tokenizer, teacher, batch_size)
+    teacher_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    student_scores = score_sentences(sentences, tokenizer, student, batch_size)
+    student_seconds = time.perf_counter() - started
+
+    escalated = student_scores.max(axis=1) < threshold
+    # Fast pass on everything plus the teacher on escalated sentences
+    cascade_seconds = student_seconds + teacher_seconds * float(escalated.mean())
+    cascade = np.where(escalated[:, None], teacher_scores, student_scores)
+    labels = teacher_scores.argmax(axis=1)
+    return {
+        "sentences": len(sentences),
+        "teacher_sentences_per_second": round(len(sentences) / teacher_seconds, 1),
+        "fast_sentences_per_second": round(len(sentences) / student_seconds, 1),
+        "fast_speedup": round(teacher_seconds / student_seconds, 2),
+        "fast_agreement": round(float((student_scores.argmax(axis=1) == labels).mean()), 4),
+        "cascade_threshold": threshold,
+        "cascade_escalation_fraction": round(float(escalated.mean()), 4),
+        "cascade_speedup": round(teacher_seconds / cascade_seconds, 2),
+        "cascade_agreement": round(float((cascade.argmax(axis=1) == labels).mean()), 4),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Build a layer-truncated, distilled FinBERT for the fast sentiment tier"
+    )
+    parser.add_argument("inputs", nargs="+",
+                        help="Text/markdown files, directories or glob patterns to distill on")
+    parser.add_argument("--teacher", default=TEACHER_MODEL,
+                        help="Full model name or local path (default: %(default)s)")
+    parser.add_argument("--layers", type=int, default=4,
+                        help="Encoder layers to keep (default: 4 of 12)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="Output directory (default: %(default)s)")
+    parser.add_argument("--epochs", type=int, default=2,
+                        help="Distillation epochs; 0 = truncate only (default: 2)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--max-sentences", type=int, default=20000,
+                        help="Sentences sampled from the corpus")
+    parser.add_argument("--eval-fraction", type=float, default=0.1,
+                        help="Held-out share for the report")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="Cascade confidence threshold for the report")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    from backend.services.sentiment_analysis import collect_files
+
+    args = parse_args(argv)
+    sentences = []
+    for path in collect_files(args.inputs):
+        text = Path(path).read_text(encoding="utf-8", errors="replace")
+        starts, ends = segment_sentences(text)
+        sentences.extend(text[s:e] for s, e in zip(starts.tolist(), ends.tolist()))
+    if not sentences:
+        raise SystemExit("No sentences found in the inputs")
+    random.Random(args.seed).shuffle(sentences)
+    sentences = sentences[:args.max_sentences]
+    held_out = max(1, int(len(sentences) * args.eval_fraction))
+    eval_sentences, train_sentences = sentences[:held_out], sentences[held_out:] or sentences
+    print(f"{len(train_sentences)} training and {len(eval_sentences)} held-out sentences")
+
+    tokenizer, teacher = load_classifier(args.teacher)
+    student = truncate_layers(copy.deepcopy(teacher), args.layers)
+    if args.epochs > 0:
+        print(f"Scoring training sentences with the teacher ({args.teacher})...")
+        teacher_scores = score_sentences(train_sentences, tokenizer, teacher, args.batch_size * 2)
+        distill(student, teacher_scores, tokenizer, train_sentences, args.epochs,
+                args.batch_size, args.learning_rate, args.seed)
+
+    report = evaluate(tokenizer, teacher, student, eval_sentences, args.batch_size, args.threshold)
+    report.update({"teacher": args.teacher, "layers": args.layers, "epochs": args.epochs})
+
+    output = Path(args.output)
+    student.save_pretrained(output)
+    tokenizer.save_pretrained(output)
+    (output / REPORT_FILE).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"\nFast model saved to: {output}")
+    print(f"Fast tier: {report['fast_speedup']}x faster, "
+          f"{report['fast_agreement']:.1%} label agreement")
+    print(f"Cascade at {args.threshold}: {report['cascade_escalation_fraction']:.1%} escalated, "
+          f"{report['cascade_speedup']}x faster, {report['cascade_agreement']:.1%} agreement")
+    print(f"Serve it with SENTIMENT_FAST_MODEL={output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Rule-based financial entities: MONEY, PERCENT and DATE (incl. fiscal periods).
+
+``dslim/bert-base-NER`` only emits PER/ORG/LOC/MISC. One compiled regex
+(one named group per type) finds currency amounts, percentages, calendar
+dates and fiscal periods in a single scan. ``merge_entities`` then combines
+them with the model's entities. Where spans overlap, the higher-priority
+type wins, then the longer span.
+"""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Sequence
+
+# Rule matches are exact pattern hits, not model probabilities
+RULE_SCORE = 1.0
+
+# Higher wins when spans overlap; unknown types rank lowest
+TYPE_PRIORITY = {
+    "MONEY": 3, "PERCENT": 3, "DATE": 3, "PER": 2, "ORG": 2, "LOC": 2, "TICKER": 2, "MISC": 1,
+}
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"(?:\s?(?:thousand|million|billion|trillion|mn|bn|tn|[kKmMbB])(?!\w))?"
+_SYMBOL = r"(?:US\$|C\$|A\$|HK\$|\$|€|£|¥)"
+_CODE = r"(?:USD|EUR|GBP|JPY|CHF|CAD|AUD|INR)"
+_MONTH = (r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+          r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?")
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_YEAR = r"(?:19|20)\d{2}"
+_ORDINAL = r"(?i:first|second|third|fourth)"
+
+_MONEY = "|".join([
+    rf"{_SYMBOL}\s?(?:{_NUMBER}){_SCALE}",                                 # $2.5 billion, €300k
+    rf"{_CODE}\s?(?:{_NUMBER}){_SCALE}",                                   # USD 2,500,000
+    rf"(?:{_NUMBER}){_SCALE}\s(?:{_CODE}|(?i:dollars|euros|pounds|yen))",  # 5 million dollars
+])
+_PERCENT = rf"[-+]?(?:{_NUMBER})\s?(?:%|(?i:percent|per cent|percentage points?|basis points?|bps))"
+_DATE = "|".join([
+    rf"{_MONTH}\s{_DAY},?\s{_YEAR}",                                # March 31, 2024
+    rf"{_DAY}\s{_MONTH},?\s{_YEAR}",                                # 31 March 2024
+    rf"{_MONTH}\s{_YEAR}",                                          # March 2024
+    rf"{_YEAR}-\d{{2}}-\d{{2}}",                                    # 2024-03-31
+    rf"\d{{1,2}}/\d{{1,2}}/{_YEAR}",                                # 03/31/2024
+    rf"(?:Q[1-4]|[1-4]Q|H[12])\s?(?:FY\s?)?'?(?:{_YEAR}|\d{{2}})",  # Q3 2024, 3Q24, H1 FY25
+    rf"FY\s?'?(?:{_YEAR}|\d{{2}})",                                 # FY2024, FY 25, FY'23
+    rf"(?i:fiscal)(?:\s(?i:year))?\s(?:{_YEAR}|'\d{{2}})",          # fiscal year 2024, fiscal '24
+    # third quarter of 2024
+    rf"{_ORDINAL}\s(?i:quarter|half)(?:(?:\s(?i:of))?\s(?:(?i:fiscal)\s)?{_YEAR})?",
+])
+
+FINANCIAL_PATTERN = re.compile(
+    rf"(?<![\w$€£¥])(?:(?P<MONEY>{_MONEY})|(?P<PERCENT>{_PERCENT})|(?P<DATE>{_DATE}))(?!\w)"
+)
+
+
+def find_financial_entities(text: str, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+    """MONEY/PERCENT/DATE entities in text[start:end], at document offsets."""
+    end = len(text) if end is None else end
+    return [
+        {
+            "entity_group": match.lastgroup,
+            "score": RULE_SCORE,
+            "word": match.group(),
+            "start": match.start(),
+            "end": match.end(),
+        }
+        for match in FINANCIAL_PATTERN.finditer(text, start, end)
+    ]
+
+
+def merge_entities(*sources: Sequence[Dict]) -> List[Dict]:
+    """
+    Merge entity lists, dropping any entity that overlaps a preferred one.
+
+    Preference: higher TYPE_PRIORITY, then longer span, then earlier start.
+
+    Returns:
+        Surviving entities sorted by start
+    """
+    candidates = sorted(
+        (entity for source in sources for entity in source),
+        key=lambda e: (-TYPE_PRIORITY.get(e["entity_group"], 0), e["start"] - e["end"], e["start"])
+    )
+    kept_starts: List[int] = []
+    kept: List[Dict] = []
+    for entity in candidates:
+        i = bisect.bisect_left(kept_starts, entity["start"])
+        # Kept spans never overlap, so only the neighbours can collide
+        if i > 0 and kept[i - 1]["end"] > entity["start"]:
+            continue
+        if i < len(kept) and kept[i]["start"] < entity["end"]:
+            continue
+        kept_starts.insert(i, entity["start"])
+        kept.insert(i, entity)
+    return kept
@@ -0,0 +1,349 @@
+"""
+Gazetteer matcher for listed company names (ORG) and tickers (TICKER).
+
+A user-supplied delimited file (columns like ``ticker``/``symbol`` and
+``name``/``company``/``security name``) is compiled into a word-token trie
+stored as flat numpy arrays:
+
+- ``vocab``: sorted 64-bit hashes of the case-folded tokens that occur in
+  any entry (a token's id is its position);
+- ``root_child``: the root's child per token id, dense, so candidate match
+  starts are found with vectorized lookups;
+- ``edge_offsets``/``edge_tokens``/``edge_targets``: deeper edges, grouped
+  per node and sorted by token id (binary search);
+- ``node_org``/``node_ticker``: the entry ending at each node, if any.
+
+The arrays are written once as ``.npy`` files next to a ``meta.json``, in a
+directory named after the index version and the source file's hash. They are
+then opened with ``mmap_mode="r"``, so worker processes share the index pages
+and startup does not rebuild it. Builds go to a private temporary directory
+that is renamed into place; when several workers build the same index at
+once, the first rename wins and the others use its result.
+
+Matching tokenizes a document once and takes leftmost-longest matches.
+Company names match case-insensitively but must start with a capital letter
+or digit. Tickers must match exactly and follow "$", "(" or an exchange
+prefix ("NASDAQ: AAPL"), unless bare tickers are allowed.
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.entity_index import ORG_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Matches are exact dictionary hits, not model probabilities
+GAZETTEER_SCORE = 1.0
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[.&'’\-][^\W_]+)*")
+_TICKER_CONTEXT = re.compile(
+    r"(?:\$|\(\s*|(?:NYSE(?: American)?|NASDAQ|Nasdaq|AMEX|LSE|TSX|OTC)\s*:\s*)$"
+)
+# Ticker entries store "<symbol>\x1f<company name>"
+_SEPARATOR = "\x1f"
+
+_TICKER_COLUMNS = ("ticker", "symbol")
+_NAME_COLUMNS = ("name", "company", "company name", "security name", "issuer")
+
+_ARRAYS = ("vocab", "root_child", "edge_offsets", "edge_tokens", "edge_targets",
+           "node_org", "node_ticker", "string_offsets", "strings")
+
+
+def token_hash(token: str) -> int:
+    """Stable 64-bit hash of a case-folded token."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _tokens(text: str) -> List[str]:
+    return [match.group().casefold() for match in TOKEN_PATTERN.finditer(text)]
+
+
+def read_gazetteer(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (kind, value) pairs: ("TICKER", "AAPL\\x1fApple Inc.") and ("ORG", "Apple Inc.")."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(65536)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",\t|;")
+        except csv.Error:
+            dialect = csv.excel  # Single column
+
+        reader = csv.DictReader(f, dialect=dialect)
+        columns = {name.strip().casefold(): name for name in reader.fieldnames or []}
+        ticker_column = next((columns[c] for c in _TICKER_COLUMNS if c in columns), None)
+        name_column = next((columns[c] for c in _NAME_COLUMNS if c in columns), None)
+        if ticker_column is None and name_column is None:
+            raise ValueError(f"Gazetteer {path} needs a ticker/symbol or name/company column")
+        for row in reader:
+            name = (row.get(name_column) or "").strip() if name_column else ""
+            ticker = (row.get(ticker_column) or "").strip() if ticker_column else ""
+            if ticker:
+                yield "TICKER", f"{ticker}{_SEPARATOR}{name or ticker}"
+            if name:
+                yield "ORG", name
+
+
+def _name_aliases(name: str) -> List[List[str]]:
+    """Token sequences a company name is matched by: as listed, and without legal suffixes."""
+    tokens = _tokens(name)
+    aliases = [tokens]
+    stripped = list(tokens)
+    while len(stripped) > 1 and stripped[-1] in ORG_SUFFIXES:
+        stripped.pop()
+    if stripped != tokens:
+        aliases.append(stripped)
+    return aliases
+
+
+def index_path(source_path: str, index_dir: str, source_sha256: Optional[str] = None) -> Path:
+    """Directory under index_dir holding the index of source_path's current contents."""
+    source_sha256 = source_sha256 or _file_hash(source_path)
+    return Path(index_dir) / f"v{INDEX_VERSION}-{source_sha256[:16]}"
+
+
+def build_index(source_path: str, index_dir: str) -> Dict:
+    """
+    Compile a gazetteer file into ``index_path(source_path, index_dir)``.
+
+    Returns:
+        The index metadata (also written to meta.json)
+    """
+    started = time.perf_counter()
+    source_sha256 = _file_hash(source_path)
+    strings: List[str] = []
+    sequences = []  # (token hashes, kind, string id)
+    for kind, value in read_gazetteer(source_path):
+        string_id = len(strings)
+        strings.append(value)
+        if kind == "TICKER":
+            aliases = [_tokens(value.split(_SEPARATOR, 1)[0])]
+        else:
+            aliases = _name_aliases(value)
+        for tokens in aliases:
+            if tokens:
+                sequences.append((tuple(token_hash(t) for t in tokens), kind, string_id))
+
+    vocab = np.unique(np.fromiter((h for seq, _, _ in sequences for h in seq), dtype=np.uint64))
+    token_ids = {int(h): i for i, h in enumerate(vocab.tolist())}
+
+    # Build the trie from lexicographically sorted sequences: each sequence
+    # shares a prefix with the previous one and adds nodes for the rest
+    parents, edge_tokens, children = [], [], []
+    node_org: Dict[int, int] = {}
+    node_ticker: Dict[int, int] = {}
+    path = [0]
+    previous: Tuple[int, ...] = ()
+    node_count = 1
+    ordered = sorted(
+        (tuple(token_ids[h] for h in seq), kind, sid) for seq, kind, sid in sequences
+    )
+    for seq, kind, string_id in ordered:
+        common = 0
+        while common < min(len(seq), len(previous)) and seq[common] == previous[common]:
+            common += 1
+        del path[common + 1:]
+        for token in seq[common:]:
+            parents.append(path[-1])
+            edge_tokens.append(token)
+            children.append(node_count)
+            path.append(node_count)
+            node_count += 1
+        # First entry wins when several end at the same node
+        (node_ticker if kind == "TICKER" else node_org).setdefault(path[-1], string_id)
+        previous = seq
+
+    parents_arr = np.asarray(parents, dtype=np.int32)
+    tokens_arr = np.asarray(edge_tokens, dtype=np.int32)
+    children_arr = np.asarray(children, dtype=np.int32)
+    order = np.lexsort((tokens_arr, parents_arr))
+    parents_arr = parents_arr[order]
+    tokens_arr = tokens_arr[order]
+    children_arr = children_arr[order]
+
+    root_child = np.full(len(vocab), -1, dtype=np.int32)
+    at_root = parents_arr == 0
+    root_child[tokens_arr[at_root]] = children_arr[at_root]
+
+    encoded = [s.encode("utf-8") for s in strings]
+    arrays = {
+        "vocab": vocab,
+        "root_child": root_child,
+        "edge_offsets": np.searchsorted(parents_arr, np.arange(node_count + 1)).astype(np.int64),
+        "edge_tokens": tokens_arr,
+        "edge_targets": children_arr,
+        "node_org": _node_array(node_org, node_count),
+        "node_ticker": _node_array(node_ticker, node_count),
+        "string_offsets": np.concatenate(
+            [[0], np.cumsum([len(b) for b in encoded], dtype=np.int64)]
+        ).astype(np.int64),
+        "strings": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    meta = {
+        "version": INDEX_VERSION,
+        "source": os.path.abspath(source_path),
+        "source_sha256": source_sha256,
+        "entries": len(strings),
+        "sequences": len(sequences),
+        "nodes": node_count,
+        "vocab": int(len(vocab)),
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+
+    # Write to a private temporary directory and rename it into place, so
+    # readers never see a half-built index and concurrent builds never collide
+    target = index_path(source_path, index_dir, source_sha256)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=target.parent))
+    try:
+        for name, array in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", array)
+        (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        try:
+            os.rename(tmp_dir, target)
+        except OSError:
+            # Another worker built the same index first: use theirs
+            if not (target / "meta.json").exists():
+                raise
+            return json.loads((target / "meta.json").read_text(encoding="utf-8"))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    _remove_stale_indexes(target)
+    return meta
+
+
+def _remove_stale_indexes(current: Path):
+    """Best-effort removal of older sources' or versions' indexes (mappings stay valid on POSIX)."""
+    for path in current.parent.glob("v*-*"):
+        if path != current and path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _node_array(values: Dict[int, int], node_count: int) -> np.ndarray:
+    array = np.full(node_count, -1, dtype=np.int32)
+    if values:
+        nodes = np.fromiter(values.keys(), dtype=np.int64)
+        array[nodes] = np.fromiter(values.values(), dtype=np.int64)
+    return array
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Gazetteer:
+    """Memory-mapped gazetteer index (see module docstring)."""
+
+    def __init__(self, index_dir: str, bare_tickers: bool = False):
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / "meta.json").read_text(encoding="utf-8"))
+        for name in _ARRAYS:
+            # Plain ndarray views of the mapping: same shared pages, without
+            # np.memmap's per-indexing subclass overhead
+            mapped = np.load(self.index_dir / f"{name}.npy", mmap_mode="r")
+            setattr(self, name, mapped.view(np.ndarray))
+        self.bare_tickers = bare_tickers
+
+    @classmethod
+    def open(cls, source_path: str, index_dir: str, bare_tickers: bool = False) -> "Gazetteer":
+        """Open the index for source_path, building it if missing or stale."""
+        path = index_path(source_path, index_dir)
+        if not (path / "meta.json").exists():
+            logger.info(f"Building gazetteer index for {source_path}...")
+            meta = build_index(source_path, index_dir)
+            logger.info(
+                f"Gazetteer index built: {meta['entries']} entries, {meta['nodes']} nodes "
+                f"in {meta['build_seconds']}s"
+            )
+        return cls(str(path), bare_tickers)
+
+    def _string(self, string_id: int) -> str:
+        start, end = self.string_offsets[string_id], self.string_offsets[string_id + 1]
+        return bytes(self.strings[start:end]).decode("utf-8")
+
+    def _child(self, node: int, token: int) -> int:
+        lo, hi = int(self.edge_offsets[node]), int(self.edge_offsets[node + 1])
+        k = lo + int(np.searchsorted(self.edge_tokens[lo:hi], token))
+        return int(self.edge_targets[k]) if k < hi and self.edge_tokens[k] == token else -1
+
+    def _accept(self, node: int, text: str, start: int, end: int) -> Optional[Tuple[str, str]]:
+        """(entity_group, canonical name) if an entry ending at node matches text[start:end]."""
+        ticker = int(self.node_ticker[node])
+        if ticker >= 0:
+            symbol, name = self._string(ticker).split(_SEPARATOR, 1)
+            if text[start:end] == symbol and (
+                self.bare_tickers or _TICKER_CONTEXT.search(text, max(0, start - 16), start)
+            ):
+                return "TICKER", name
+        org = int(self.node_org[node])
+        if org >= 0 and (text[start].isupper() or text[start].isdigit()):
+            return "ORG", self._string(org)
+        return None
+
+    def find(self, text: str, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """Leftmost-longest ORG/TICKER matches in text[start:end], at document offsets."""
+        matches = list(TOKEN_PATTERN.finditer(text, start, len(text) if end is None else end))
+        if not matches or not len(self.vocab):
+            return []
+        # Filings repeat a small vocabulary, so hash each distinct token once
+        token_ids: Dict[str, int] = {}
+        codes = np.fromiter(
+            (token_ids.setdefault(m.group().casefold(), len(token_ids)) for m in matches),
+            dtype=np.int64, count=len(matches)
+        )
+        hashes = np.fromiter(
+            (token_hash(t) for t in token_ids), dtype=np.uint64, count=len(token_ids)
+        )[codes]
+        positions = np.minimum(np.searchsorted(self.vocab, hashes), len(self.vocab) - 1)
+        ids = np.where(self.vocab[positions] == hashes, positions, -1)
+        first = np.where(ids >= 0, self.root_child[np.maximum(ids, 0)], -1)
+
+        entities = []
+        next_free = 0
+        ids_list = ids.tolist()
+        for i in np.flatnonzero(first >= 0).tolist():
+            if i < next_free:
+                continue
+            node, j, best = int(first[i]), i, None
+            while True:
+                accepted = self._accept(node, text, matches[i].start(), matches[j].end())
+                if accepted:
+                    best = (j, accepted)
+                j += 1
+                if j >= len(matches) or ids_list[j] < 0:
+                    break
+                node = self._child(node, ids_list[j])
+                if node < 0:
+                    break
+            if best:
+                j, (group, canonical) = best
+                entities.append({
+                    "entity_group": group,
+                    "score": GAZETTEER_SCORE,
+                    "word": text[matches[i].start():matches[j].end()],
+                    "start": matches[i].start(),
+                    "end": matches[j].end(),
+                    "canonical": canonical,
+                })
+                next_free = j + 1
+        return entities
+
+    def stats(self) -> Dict:
+        return {**self.meta, "bare_tickers": self.bare_tickers}
@@ -1,6 +1,72 @@
+"""
+Sentiment highlighting for HTML documents.
+
+``apply_highlights`` wraps each scored sentence in a coloured <span>, placed
+by the sentence's offsets in the analyzed text, which is mapped onto the HTML
+in one pass. The sentiment service and this script share it, along with the
+colour scheme in ``get_highlight_color``.
+
+Run as a script, it either highlights one results/HTML pair (the defaults
+below), or with ``--bulk DIR`` re-renders every stored ``*_sentiment.json`` +
+``*_sentiment.html`` pair (or their ``.gz`` versions) under DIR in parallel. Existing highlights are
+stripped first, so a changed colour scheme can be applied to old outputs.
+Pairs whose inputs and colour scheme are unchanged since the last run are
+skipped.
+
+Examples:
+    python -m backend.services.highlight_sentiment
+    python -m backend.services.highlight_sentiment --bulk output --workers 8
+"""
+
+import argparse
+import gzip
+import hashlib
+import html
+import itertools
 import json
+import multiprocessing
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 from bs4 import BeautifulSoup
 
+from backend.services.atomic_files import atomic_write
+
+# Bump when get_highlight_color or the highlight markup changes, so --bulk
+# re-renders pairs it would otherwise skip as unchanged
+HIGHLIGHT_VERSION = "3"
+
+# Records which input hashes each bulk-rendered pair was produced from
+MANIFEST_FILE = ".highlight_manifest.json"
+
+# Marks the spans apply_highlights adds, so strip_highlights removes only those
+# whatever colour format get_highlight_color returns
+HIGHLIGHT_ATTRIBUTE = "data-finsight-sentiment"
+
+_HIGHLIGHT_OPEN = re.compile(rf'<span\b[^>]*\s{HIGHLIGHT_ATTRIBUTE}(?=[\s=/>])[^>]*>')
+# Highlights rendered before HIGHLIGHT_VERSION 2 carry no marker
+_LEGACY_HIGHLIGHT_OPEN = re.compile(r'<span style="background-color: rgb\(\d+, \d+, \d+\);">')
+_SPAN_TAG = re.compile(r"<span\b[^>]*>|</span>")
+
+_HTML_TOKEN = re.compile(
+    r"(?P<comment><!--.*?(?:-->|$))"
+    r"|(?P<tag><(?P<closing>/)?(?P<name>[A-Za-z][\w-]*)?[^>]*>)"
+    r"|[^<]+|<",
+    re.S,
+)
+_ENTITY = re.compile(r"(?P<entity>&(?:#\d+|#[xX][\da-fA-F]+|[A-Za-z][A-Za-z\d]*);)|[^&]+|&")
+# Elements whose content is not visible text
+_RAW_TEXT_TAGS = {"script", "style", "title"}
+# Where the analyzed text and the HTML disagree, the next _RESYNC_ANCHOR
+# characters are looked for within _RESYNC_WINDOW characters of the HTML text
+_RESYNC_ANCHOR = 12
+_RESYNC_WINDOW = 512
+
+
 def get_highlight_color(sentiment_class, scores):
     """Get color based on sentiment and confidence score."""
     if sentiment_class == 'neutral':
@@ -20,47 +86,333 @@ def get_highlight_color(sentiment_class, scores):
 
     return None
 
-def main():
-    # Read sentiment analysis results
-    with open('output/sentiment_analysis_results.json', 'r', encoding='utf-8') as f:
-        sentiments = json.load(f)
 
-    # Read HTML file
-    with open('output/company_paragraphs_sample.html', 'r', encoding='utf-8') as f:
-        html_content = f.read()
+def html_text_map(html_str: str) -> Tuple[str, List[int], List[int], List[int]]:
+    """
+    The visible text of an HTML string, in one pass.
+
+    Returns:
+        (text, html_starts, html_ends, runs): for each text character, the
+        HTML range it came from (an entity is one character) and the index of
+        the tag-free text run holding it. Script, style and title content is
+        not visible text.
+    """
+    chars: List[str] = []
+    html_starts: List[int] = []
+    html_ends: List[int] = []
+    runs: List[int] = []
+    raw_tag = None
+    run = 0
+    for token in _HTML_TOKEN.finditer(html_str):
+        if token.group("tag") is not None:
+            name = (token.group("name") or "").lower()
+            if raw_tag is None and name in _RAW_TEXT_TAGS and not token.group("closing"):
+                raw_tag = name
+            elif raw_tag is not None and token.group("closing") and name == raw_tag:
+                raw_tag = None
+            continue
+        if raw_tag is not None or token.group("comment") is not None:
+            continue
+        run += 1
+        offset = token.start()
+        for piece in _ENTITY.finditer(token.group(0)):
+            piece_start = offset + piece.start()
+            if piece.group("entity"):
+                # An entity is one character spanning its whole reference
+                value = html.unescape(piece.group(0))
+                chars.extend(value)
+                html_starts.extend([piece_start] * len(value))
+                html_ends.extend([offset + piece.end()] * len(value))
+            else:
+                value = piece.group(0)
+                chars.extend(value)
+                html_starts.extend(range(piece_start, piece_start + len(value)))
+                html_ends.extend(range(piece_start + 1, piece_start + len(value) + 1))
+            runs.extend([run] * len(value))
+    return "".join(chars), html_starts, html_ends, runs
+
+
+def align_text(text: str, visible: str) -> np.ndarray:
+    """
+    Map each letter and digit of ``text`` to the same character of ``visible``.
+
+    Markup the other side lacks (Markdown syntax, whitespace, punctuation) is
+    ignored. Where the texts disagree, the next few characters of ``text`` are
+    looked for within a bounded window of ``visible``; characters with no
+    counterpart map to -1. Each step costs at most one bounded search, so the
+    alignment is linear in the text length.
+    """
+    text_mask = np.fromiter(map(str.isalnum, text), dtype=bool, count=len(text))
+    visible_mask = np.fromiter(map(str.isalnum, visible), dtype=bool, count=len(visible))
+    text_offsets, visible_offsets = np.flatnonzero(text_mask), np.flatnonzero(visible_mask)
+    source = "".join(itertools.compress(text, text_mask))
+    target = "".join(itertools.compress(visible, visible_mask))
+    mapping = np.full(len(text), -1, dtype=np.int64)
+    i = j = 0
+    while i < len(source) and j < len(target):
+        if source[i] == target[j]:
+            run = _common_prefix(source, i, target, j)
+            mapping[text_offsets[i:i + run]] = visible_offsets[j:j + run]
+            i += run
+            j += run
+            continue
+        found = target.find(source[i:i + _RESYNC_ANCHOR], j, j + _RESYNC_WINDOW)
+        if found >= 0:
+            j = found
+        else:
+            i += 1
+    return mapping
+
+
+def _common_prefix(a: str, i: int, b: str, j: int) -> int:
+    """Length of the common prefix of a[i:] and b[j:]."""
+    run = 0
+    step = 64
+    while True:
+        chunk = a[i + run:i + run + step]
+        if not chunk or chunk != b[j + run:j + run + step]:
+            break
+        run += len(chunk)
+    while i + run < len(a) and j + run < len(b) and a[i + run] == b[j + run]:
+        run += 1
+    return run
+
+
+def apply_highlights(html_str: str, text: str,
+                     spans: Iterable[Tuple[int, int, Optional[str]]]) -> str:
+    """
+    Wrap sentences in coloured spans by their offsets in the analyzed text.
+
+    The HTML is walked once to map ``text`` offsets onto it, so sentences that
+    cross inline tags or differ from the HTML in markup and whitespace are
+    still found. A highlight gets one span per tag-free text run it covers,
+    which keeps the output well formed.
+
+    Args:
+        html_str: HTML to highlight
+        text: Text the offsets refer to (may be Markdown or plain text of the HTML)
+        spans: (start, end, color) in ascending order; color None is not highlighted
+
+    Returns:
+        Highlighted HTML
+    """
+    visible, html_starts, html_ends, run_list = html_text_map(html_str)
+    runs = np.array(run_list, dtype=np.int64)
+    mapping = align_text(text, visible)
+    inserts: List[Tuple[int, str]] = []
+    last = -1
+    for start, end, color in spans:
+        if not color:
+            continue
+        mapped = mapping[start:end]
+        mapped = mapped[mapped > last]
+        if not len(mapped):
+            continue
+        first, last = int(mapped[0]), int(mapped[-1])
+        # Closing punctuation after the last letter belongs to the sentence
+        while last + 1 < len(visible):
+            following = visible[last + 1]
+            if following.isalnum() or following.isspace():
+                break
+            last += 1
+        # One span per text run: split where the run index changes
+        breaks = (first + np.flatnonzero(np.diff(runs[first:last + 1]))).tolist()
+        for piece_start, piece_end in zip([first] + [b + 1 for b in breaks], breaks + [last]):
+            if visible[piece_start:piece_end + 1].strip():
+                inserts.append((html_starts[piece_start],
+                                f'<span {HIGHLIGHT_ATTRIBUTE} style="background-color: {color};">'))
+                inserts.append((html_ends[piece_end], "</span>"))
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    parts = []
+    cursor = 0
+    for offset, markup in inserts:
+        parts.append(html_str[cursor:offset])
+        parts.append(markup)
+        cursor = offset
+    parts.append(html_str[cursor:])
+    return "".join(parts)
 
-    # Get all text from body
-    body = soup.find('body')
-    if not body:
-        body = soup
 
-    body_text = body.get_text()
+def strip_highlights(html_str: str) -> str:
+    """Remove spans added by ``apply_highlights``, keeping their content."""
+    parts = []
+    cursor = 0
+    stack = []  # True for our highlight spans
+    for match in _SPAN_TAG.finditer(html_str):
+        tag = match.group(0)
+        if tag == "</span>":
+            ours = stack.pop() if stack else False
+        else:
+            ours = bool(_HIGHLIGHT_OPEN.fullmatch(tag) or _LEGACY_HIGHLIGHT_OPEN.fullmatch(tag))
+            stack.append(ours)
+        if ours:
+            parts.append(html_str[cursor:match.start()])
+            cursor = match.end()
+    parts.append(html_str[cursor:])
+    return "".join(parts)
 
-    # Sort sentiments by position (start) in reverse to avoid position shifts
-    sentiments_sorted = sorted(sentiments, key=lambda x: x['position']['start'], reverse=True)
 
-    # Apply highlights
-    html_str = str(soup)
+def highlight_records(html_content: str, sentiments: List[Dict]) -> str:
+    """
+    Highlight HTML from per-sentence result records.
 
-    for sentiment in sentiments_sorted:
-        color = get_highlight_color(sentiment['class'], sentiment['confidence_scores'])
+    Records hold "sentence", "class", "position" and "confidence_scores".
+    """
+    ordered = sorted(sentiments, key=lambda x: x['position']['start'])
+    # Rebuild the analyzed text from its sentences; the gaps only held whitespace
+    text = [" "] * max((s['position']['end'] for s in ordered), default=0)
+    for s in ordered:
+        start = s['position']['start']
+        text[start:start + len(s['sentence'])] = s['sentence']
+    return apply_highlights(
+        str(BeautifulSoup(strip_highlights(html_content), 'html.parser')),
+        "".join(text),
+        ((s['position']['start'], s['position']['end'],
+          get_highlight_color(s['class'], s['confidence_scores'])) for s in ordered)
+    )
 
-        if color:  # Skip neutral
-            sentence = sentiment['sentence']
-            # Create highlighted version
-            highlighted = f'<span style="background-color: {color};">{sentence}</span>'
 
-            # Replace in HTML
-            html_str = html_str.replace(sentence, highlighted, 1)
+def load_results(path: str) -> List[Dict]:
+    """Read result records from a JSON list, or from the batch runner's JSONL rows."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if not path.endswith(".jsonl"):
+            return json.load(f)
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [
+        {
+            "sentence": row["sentence"],
+            "class": row["class"],
+            "position": {"start": row["start"], "end": row["end"]},
+            "confidence_scores": {
+                label: row[label] for label in ("positive", "negative", "neutral")
+            }
+        }
+        for row in rows
+    ]
+
+
+def find_pairs(root: str) -> List[Tuple[str, str]]:
+    """
+    Every <name>_sentiment.json under root that has a matching <name>_sentiment.html.
+
+    Gzip-compressed outputs pair ``_sentiment.json.gz`` with ``_sentiment.html.gz``.
+    """
+    pairs = []
+    for json_suffix, html_suffix in ((".json", ".html"), (".json.gz", ".html.gz")):
+        for json_path in Path(root).rglob(f"*_sentiment{json_suffix}"):
+            html_path = json_path.with_name(json_path.name[:-len(json_suffix)] + html_suffix)
+            if html_path.is_file():
+                pairs.append((str(json_path), str(html_path)))
+    return sorted(pairs)
+
+
+def _read(path: str) -> bytes:
+    data = Path(path).read_bytes()
+    return gzip.decompress(data) if path.endswith(".gz") else data
+
+
+def _pair_hash(results: bytes, html_bytes: bytes) -> str:
+    digest = hashlib.sha256(HIGHLIGHT_VERSION.encode())
+    for data in (results, html_bytes):
+        digest.update(len(data).to_bytes(8, "little") + data)
+    return digest.hexdigest()
+
+
+def rerender_pair(task: Tuple[str, str, Optional[str]]) -> Tuple[str, str, Optional[str]]:
+    """
+    Worker task: re-highlight one pair in place.
+
+    Returns:
+        (html_path, "rendered" | "skipped" | "failed", new hash or error)
+    """
+    json_path, html_path, known_hash = task
+    try:
+        results = _read(json_path)
+        html_bytes = _read(html_path)
+        if known_hash == _pair_hash(results, html_bytes):
+            return html_path, "skipped", known_hash
+        rendered = highlight_records(html_bytes.decode("utf-8"), json.loads(results))
+        rendered = rendered.encode("utf-8")
+        # mtime=0 keeps re-compressed output byte-identical across runs
+        compress = html_path.endswith(".gz")
+        atomic_write(html_path, gzip.compress(rendered, mtime=0) if compress else rendered)
+        return html_path, "rendered", _pair_hash(results, rendered)
+    except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+        # A well-formed file of the wrong shape raises TypeError; it fails this pair only
+        return html_path, "failed", str(e)
+
+
+def bulk_rerender(root: str, workers: int, force: bool = False) -> Dict[str, int]:
+    """Re-render every stored pair under root; returns counts per outcome."""
+    manifest_path = Path(root) / MANIFEST_FILE
+    manifest = {}
+    if manifest_path.exists() and not force:
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except ValueError:
+            print(f"Ignoring unreadable manifest {manifest_path}; re-rendering every pair")
+
+    pairs = find_pairs(root)
+    tasks = [(json_path, html_path, manifest.get(html_path)) for json_path, html_path in pairs]
+    counts = {"rendered": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+
+    workers = max(1, min(workers, len(tasks) or 1))
+    with multiprocessing.Pool(workers) as pool:
+        for html_path, outcome, value in pool.imap_unordered(rerender_pair, tasks, chunksize=16):
+            counts[outcome] += 1
+            if outcome == "failed":
+                print(f"Failed {html_path}: {value}")
+            else:
+                manifest[html_path] = value
+
+    atomic_write(manifest_path, json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+    elapsed = time.perf_counter() - started
+    print(f"Pairs: {len(tasks)} - rendered {counts['rendered']}, "
+          f"unchanged {counts['skipped']}, failed {counts['failed']}")
+    rate = len(tasks) / elapsed if elapsed else 0.0
+    print(f"Elapsed: {elapsed:.2f}s ({rate:.1f} files/sec with {workers} workers)")
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Highlight sentiment results in HTML")
+    parser.add_argument("--results", default="output/sentiment_analysis_results.jsonl",
+                        help="Sentiment results (.json list or batch runner .jsonl)")
+    parser.add_argument("--html", default="output/company_paragraphs_sample.html",
+                        help="HTML to highlight")
+    parser.add_argument("--output", default="output/company_paragraphs_highlighted.html",
+                        help="Highlighted HTML")
+    parser.add_argument("--bulk", metavar="DIR",
+                        help="Re-render every *_sentiment.json/.html pair (or their .gz) "
+                             "under DIR in place")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for --bulk")
+    parser.add_argument("--force", action="store_true",
+                        help="With --bulk, re-render unchanged pairs too")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.bulk:
+        bulk_rerender(args.bulk, args.workers, args.force)
+        return
+
+    # Read sentiment analysis results
+    sentiments = load_results(args.results)
+
+    # Read HTML file
+    with open(args.html, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+
+    html_str = highlight_records(html_content, sentiments)
 
     # Save to new file
-    output_file = 'output/company_paragraphs_highlighted.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with open(args.output, 'w', encoding='utf-8') as f:
         f.write(html_str)
 
-    print(f"Highlighted HTML saved to: {output_file}")
+    print(f"Highlighted HTML saved to: {args.output}")
     print(f"- Green highlighting: Positive sentiment (darker = higher confidence)")
     print(f"- Red highlighting: Negative sentiment (darker = higher confidence)")
     print(f"- No highlighting: Neutral sentiment")
@@ -0,0 +1,89 @@
+"""
+Incremental re-analysis of amended documents.
+
+The sentiment and NER services store each analysis under the SHA-256 of its
+text (``content_hash``). A later request can pass that hash as
+``previous_hash``. The new text is then split into segments (sentences for
+sentiment, paragraphs for NER). Segments whose text also occurs in the
+previous analysis reuse its results, re-anchored at their new offsets, and
+only the rest are re-scored. Sentence-level sentiment is context-free, so
+reuse is exact; NER reuse assumes entities do not depend on text outside
+their paragraph.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.services.extraction_cache import ExtractionCache
+
+logger = logging.getLogger(__name__)
+
+# Prior analyses are kept this long / up to this size per service
+STORE_TTL_SECONDS = float(os.getenv("FINSIGHT_ANALYSIS_STORE_TTL_HOURS", "720")) * 3600
+STORE_MAX_MB = float(os.getenv("FINSIGHT_ANALYSIS_STORE_MAX_MB", "200"))
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def content_hash(text: str) -> str:
+    """Hash identifying a document text; returned to clients as "content_hash"."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def open_store(name: str) -> Optional[ExtractionCache]:
+    """On-disk store of prior analyses for one service (None if unavailable)."""
+    store_dir = os.path.join("cache", "analyses", name)
+    try:
+        return ExtractionCache(store_dir, STORE_TTL_SECONDS, int(STORE_MAX_MB * 1024 * 1024))
+    except OSError as e:
+        logger.warning(f"Could not initialize analysis store at {store_dir}: {e}")
+        return None
+
+
+def match_segments(old_segments: Sequence[str], new_segments: Sequence[str]) -> List[Optional[int]]:
+    """For each new segment, the index of an identical previous segment, or None."""
+    index: Dict[str, int] = {}
+    for i, segment in enumerate(old_segments):
+        index.setdefault(segment, i)
+    return [index.get(segment) for segment in new_segments]
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of each non-blank paragraph, separated by blank lines."""
+    spans = []
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            spans.append((start, match.start()))
+        start = match.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+def entities_by_span(entities: List[Dict], spans: List[Tuple[int, int]]) -> List[List[Dict]]:
+    """Group entities (sorted by start) under the span that fully contains them."""
+    grouped: List[List[Dict]] = [[] for _ in spans]
+    span_starts = [start for start, _ in spans]
+    for entity in entities:
+        i = bisect.bisect_right(span_starts, entity["start"]) - 1
+        if i >= 0 and entity["end"] <= spans[i][1]:
+            grouped[i].append(entity)
+    return grouped
+
+
+def incremental_report(
+    previous_hash: str, found: bool, segment: str, reused: int, recomputed: int
+) -> Dict:
+    """The "incremental" block of a response."""
+    return {
+        "previous_hash": previous_hash,
+        "previous_found": found,
+        "segment": segment,
+        "reused": reused,
+        "recomputed": recomputed,
+    }
@@ -1,16 +1,30 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, ConfigDict
-from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Literal, Optional, Tuple
 import os
 import sys
 import io
 import json
+import time
+import asyncio
 import unicodedata
 import warnings
+from dataclasses import dataclass
 from pathlib import Path
 
+from backend.services.artifact_store import ArtifactStore
+from backend.services.extraction_alignment import align_extractions
+from backend.services.extraction_cache import ExtractionCache
+from backend.services.extraction_executor import MeteredExecutor
+from backend.services.extraction_providers import char_interval, create_provider
+from backend.services.extraction_renderer import render_extractions_html
+from backend.services.rate_limiter import (
+    PRIORITIES, RateLimitScheduler, estimate_tokens, is_throttle_error,
+)
+from backend.services.streaming import MEDIA_TYPES, STREAM_HEADERS, StreamProtocol, encode_event
+
 # Suppress warnings from external libraries
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 warnings.filterwarnings("ignore", message="Valid config keys have changed in V2")
@@ -72,6 +86,82 @@ API_KEY = os.getenv("LANGEXTRACT_API_KEY", "AIzaSyCJH2lOrks1C_faZxubvEYAIb2rw7yH
 if API_KEY and API_KEY != "":
     os.environ["LANGEXTRACT_API_KEY"] = API_KEY
 
+# Extraction provider: "gemini" (default) or "stub" for offline load testing / CI.
+# LANGEXTRACT_REPLAY_MODE=record saves every provider response under
+# LANGEXTRACT_REPLAY_DIR; =replay serves those recordings without calling the provider.
+LANGEXTRACT_PROVIDER = os.getenv("LANGEXTRACT_PROVIDER", "gemini").lower()
+REPLAY_MODE = os.getenv("LANGEXTRACT_REPLAY_MODE", "off").lower()
+REPLAY_DIR = os.getenv("LANGEXTRACT_REPLAY_DIR", os.path.join("cache", "langextract_replay"))
+# LANGEXTRACT_STUB_QUOTA_RPM makes the stub simulate provider throttling (429s)
+provider_options = (
+    {"quota_rpm": int(os.getenv("LANGEXTRACT_STUB_QUOTA_RPM", "0"))}
+    if LANGEXTRACT_PROVIDER == "stub" else {}
+)
+extraction_provider = create_provider(
+    LANGEXTRACT_PROVIDER, REPLAY_MODE, REPLAY_DIR, **provider_options
+)
+if LANGEXTRACT_PROVIDER == "stub":
+    logger.warning("LANGEXTRACT_PROVIDER=stub - extractions come from the offline stub provider")
+
+# Long inputs are split into overlapping chunks that are extracted concurrently
+CHUNK_SIZE = int(os.getenv("LANGEXTRACT_CHUNK_SIZE", "4000"))  # characters
+CHUNK_OVERLAP = int(os.getenv("LANGEXTRACT_CHUNK_OVERLAP", "200"))  # characters
+MAX_PARALLEL_CHUNKS = int(os.getenv("LANGEXTRACT_MAX_PARALLEL_CHUNKS", "4"))
+EXTRACTION_TIMEOUT = 30  # seconds per provider call, and for a whole interactive request
+
+# One bounded pool of worker threads shared by all requests; LLM calls beyond
+# this limit queue (see "executor" in /health)
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv("LANGEXTRACT_MAX_CONCURRENT_EXTRACTIONS", "8"))
+extraction_executor: Optional[MeteredExecutor] = None
+
+# Client-side rate limits per model id (0 = unlimited). LANGEXTRACT_MODEL_RATE_LIMITS
+# overrides them per model as "model=rpm:tpm,...". Throttle responses from the
+# provider are retried with jittered exponential backoff.
+RATE_LIMIT_RPM = float(os.getenv("LANGEXTRACT_RATE_LIMIT_RPM", "0"))
+RATE_LIMIT_TPM = float(os.getenv("LANGEXTRACT_RATE_LIMIT_TPM", "0"))
+THROTTLE_RETRIES = int(os.getenv("LANGEXTRACT_THROTTLE_RETRIES", "4"))
+THROTTLE_BACKOFF_BASE = 1.0  # seconds
+THROTTLE_BACKOFF_MAX = 20.0  # seconds
+rate_limiter = RateLimitScheduler(
+    RATE_LIMIT_RPM,
+    RATE_LIMIT_TPM,
+    RateLimitScheduler.parse_limits(os.getenv("LANGEXTRACT_MODEL_RATE_LIMITS", ""))
+)
+
+# Persistent extraction result cache (set LANGEXTRACT_CACHE_ENABLED=0 to disable)
+CACHE_ENABLED = os.getenv("LANGEXTRACT_CACHE_ENABLED", "1") == "1"
+CACHE_DIR = os.getenv("LANGEXTRACT_CACHE_DIR", os.path.join("cache", "langextract"))
+CACHE_TTL_SECONDS = float(os.getenv("LANGEXTRACT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MAX_MB = float(os.getenv("LANGEXTRACT_CACHE_MAX_MB", "500"))
+
+extraction_cache = None
+if CACHE_ENABLED:
+    try:
+        extraction_cache = ExtractionCache(
+            CACHE_DIR, CACHE_TTL_SECONDS, int(CACHE_MAX_MB * 1024 * 1024)
+        )
+        logger.info(
+            f"Extraction cache enabled at {CACHE_DIR} "
+            f"(TTL {CACHE_TTL_SECONDS:.0f}s, cap {CACHE_MAX_MB:.0f} MB)"
+        )
+    except OSError as e:
+        logger.warning(f"Could not initialize extraction cache at {CACHE_DIR}: {e}")
+
+# Save each result's extraction_results.jsonl / extraction_visualization.html as a
+# per-request artifact under output/langextract/<artifact_id>/ (written off the request path)
+SAVE_OUTPUTS = os.getenv("LANGEXTRACT_SAVE_OUTPUTS", "1") == "1"
+OUTPUT_DIR = os.path.join("output", "langextract")
+RESULTS_FILE = "extraction_results.jsonl"
+VISUALIZATION_FILE = "extraction_visualization.html"
+artifact_store = ArtifactStore(
+    OUTPUT_DIR,
+    max_artifacts=int(os.getenv("FINSIGHT_ARTIFACT_MAX_COUNT", "200")),
+    max_age_seconds=float(os.getenv("FINSIGHT_ARTIFACT_MAX_AGE_HOURS", "168")) * 3600
+)
+
+# Most recent visualization, served by /visualization even when files aren't saved
+latest_visualization: Optional[str] = None
+
 # Pre-load LangExtract to avoid loading plugins on every request
 if LANGEXTRACT_AVAILABLE:
     logger.info("Pre-loading LangExtract provider plugins...")
@@ -104,6 +194,251 @@ def normalize_unicode_text(text: str) -> str:
     return unicodedata.normalize('NFC', text)
 
 
+def split_into_chunks(
+    text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP
+) -> List[Tuple[int, int]]:
+    """
+    Split text into overlapping (start, end) character windows.
+
+    Chunks end at a paragraph break, sentence end or whitespace in the last
+    fifth of the window where possible, so extractions are rarely cut in half.
+    The overlap lets an extraction that straddles a boundary be found whole in
+    at least one chunk.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk length in characters
+        overlap: Characters shared by consecutive chunks
+
+    Returns:
+        List of (start, end) offsets covering the whole text
+    """
+    if len(text) <= chunk_size:
+        return [(0, len(text))]
+
+    overlap = min(overlap, chunk_size // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            window_floor = end - chunk_size // 5
+            for separator in ("\n\n", ". ", "\n", " "):
+                cut = text.rfind(separator, window_floor, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunks.append((start, end))
+        if end >= len(text):
+            break
+        # Start the next chunk inside the overlap, at a word boundary
+        next_start = max(end - overlap, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return chunks
+
+
+def merge_chunk_extractions(text: str, chunk_results: List[Tuple[int, object]]) -> List[Dict]:
+    """
+    Merge per-chunk extraction results into document-level extractions.
+
+    Each chunk's extractions are aligned to occurrences in the chunk text
+    (see ``align_extractions``), shifted by the chunk's start offset to global
+    character offsets, and duplicates found twice in an overlap region are
+    dropped.
+
+    Args:
+        text: Full normalized document text
+        chunk_results: (chunk_start, result) pairs, in chunk order
+
+    Returns:
+        Extraction dicts (with char_interval when a position is known), in text order
+    """
+    merged = []
+    seen = set()
+    for chunk_start, result in chunk_results:
+        chunk_text = result.text if hasattr(result, 'text') else ""
+        chunk_extractions = (
+            list(result.extractions)
+            if hasattr(result, 'extractions') and result.extractions else []
+        )
+        intervals = align_extractions(
+            chunk_text,
+            [ext.extraction_text or "" for ext in chunk_extractions],
+            [char_interval(ext) for ext in chunk_extractions]
+        )
+
+        for ext, interval in zip(chunk_extractions, intervals):
+            ext_dict = {
+                "extraction_class": ext.extraction_class,
+                "extraction_text": ext.extraction_text,
+                "attributes": ext.attributes
+            }
+
+            if interval is not None:
+                global_start, global_end = interval[0] + chunk_start, interval[1] + chunk_start
+                key = (ext.extraction_class, global_start, global_end)
+                # Use LangExtract's char_interval format with start_pos and end_pos
+                ext_dict["char_interval"] = {"start_pos": global_start, "end_pos": global_end}
+            else:
+                key = (ext.extraction_class, ext.extraction_text)
+
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(ext_dict)
+
+    merged.sort(
+        key=lambda e: e["char_interval"]["start_pos"] if "char_interval" in e else len(text)
+    )
+    return merged
+
+
+async def run_chunked_extraction(
+    normalized_text: str, normalized_prompt: str, prepared_examples, model_id: str,
+    prompt_tokens: int = 0, priority: str = "interactive",
+) -> Tuple[List[Dict], int, List[Dict]]:
+    """
+    Run the extraction provider over the text in concurrent overlapping chunks.
+
+    Chunks run on the shared extraction executor, at most MAX_PARALLEL_CHUNKS
+    at a time per request. Each call first waits for the model's rate limiter,
+    then for a free executor worker (both serve interactive before batch
+    priority), and is retried with backoff when the provider throttles.
+
+    Each provider call may run for EXTRACTION_TIMEOUT seconds, counted from
+    when it starts. An interactive request also stops waiting altogether at
+    EXTRACTION_TIMEOUT: chunks still queued are cancelled, chunks already
+    running finish in the background. Batch documents have no overall
+    deadline; they wait their turn behind interactive work.
+
+    Args:
+        prompt_tokens: Estimated tokens of prompt + examples sent with every chunk
+        priority: "interactive" or "batch"
+
+    Returns:
+        (merged extractions with global char_interval, chunk count, failed chunk descriptions)
+
+    Raises:
+        HTTPException: 504 if every chunk timed out, 429 if every chunk was throttled,
+            500 on API configuration errors
+        RuntimeError: if every chunk failed for another reason
+    """
+    chunks = split_into_chunks(normalized_text)
+
+    def run_extraction(chunk_index: int, chunk_start: int, chunk_end: int):
+        start_time = time.time()
+        chunk_text = normalized_text[chunk_start:chunk_end]
+        logger.info(
+            f"Running extraction for chunk {chunk_index + 1}/{len(chunks)} "
+            f"with {extraction_provider.name} provider, model {model_id}..."
+        )
+        result = extraction_provider.extract(
+            chunk_text, normalized_prompt, prepared_examples, model_id
+        )
+        elapsed_time = time.time() - start_time
+        logger.info(f"Chunk {chunk_index + 1} extraction completed in {elapsed_time:.2f} seconds")
+        return result
+
+    # Run chunk extractions concurrently
+    logger.info(
+        f"Starting extraction of {len(chunks)} chunk(s) "
+        f"with up to {MAX_PARALLEL_CHUNKS} in parallel "
+        f"and a {EXTRACTION_TIMEOUT}s per-call timeout..."
+    )
+    extraction_start = time.time()
+    chunk_slots = asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+
+    limiter = rate_limiter.limiter(model_id)
+
+    async def run_chunk(index: int, chunk_start: int, chunk_end: int):
+        tokens = prompt_tokens + estimate_tokens(normalized_text[chunk_start:chunk_end])
+        async with chunk_slots:
+            for attempt in range(THROTTLE_RETRIES + 1):
+                await limiter.acquire(tokens, PRIORITIES[priority])
+                try:
+                    return await extraction_executor.run(
+                        run_extraction, index, chunk_start, chunk_end,
+                        priority=PRIORITIES[priority], timeout=EXTRACTION_TIMEOUT
+                    )
+                except Exception as e:
+                    if not is_throttle_error(e) or attempt == THROTTLE_RETRIES:
+                        raise
+                    delay = await limiter.backoff(
+                        attempt, THROTTLE_BACKOFF_BASE, THROTTLE_BACKOFF_MAX
+                    )
+                    logger.warning(
+                        f"Chunk {index + 1} throttled by {model_id} (attempt {attempt + 1}), "
+                        f"pausing model for {delay:.2f}s: {e}"
+                    )
+
+    tasks = [
+        asyncio.create_task(run_chunk(index, chunk_start, chunk_end))
+        for index, (chunk_start, chunk_end) in enumerate(chunks)
+    ]
+    request_timeout = EXTRACTION_TIMEOUT if priority == "interactive" else None
+    _, pending = await asyncio.wait(tasks, timeout=request_timeout)
+    # Release the request now: drop queued chunks, don't wait for running ones
+    for task in pending:
+        task.cancel()
+
+    chunk_results = []
+    failed_chunks = []
+    throttled_chunks = 0
+    for index, (task, (chunk_start, chunk_end)) in enumerate(zip(tasks, chunks)):
+        if task in pending or isinstance(task.exception(), asyncio.TimeoutError):
+            error_msg = f"Timed out after {EXTRACTION_TIMEOUT} seconds"
+        elif task.exception() is not None:
+            error_msg = str(task.exception())
+            throttled_chunks += is_throttle_error(task.exception())
+        else:
+            chunk_results.append((chunk_start, task.result()))
+            continue
+        logger.error(f"Extraction failed for chunk {index + 1}/{len(chunks)}: {error_msg}")
+        failed_chunks.append(
+            {"index": index, "start": chunk_start, "end": chunk_end, "error": error_msg}
+        )
+
+    total_time = time.time() - extraction_start
+    logger.info(
+        f"Total extraction time (including overhead): {total_time:.2f}s, "
+        f"{len(chunk_results)}/{len(chunks)} chunk(s) succeeded"
+    )
+
+    if not chunk_results:
+        error_msg = failed_chunks[0]["error"]
+        if all(chunk["error"].startswith("Timed out") for chunk in failed_chunks):
+            raise HTTPException(
+                status_code=504,
+                detail=(
+                    f"Extraction timed out after {EXTRACTION_TIMEOUT} seconds. "
+                    "The Gemini API may be unavailable or the text is too long."
+                )
+            )
+        if throttled_chunks == len(failed_chunks):
+            raise HTTPException(
+                status_code=429,
+                detail=(
+                    f"The {model_id} rate limit was still exceeded after "
+                    f"{THROTTLE_RETRIES} retries. Try again later."
+                ),
+                headers={"Retry-After": str(int(THROTTLE_BACKOFF_MAX))}
+            )
+        # Catch specific API errors
+        if "invalid argument" in error_msg.lower() or "errno 22" in error_msg.lower():
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    "API configuration error. The Gemini API key may be invalid or expired. "
+                    "Please check your API key."
+                )
+            )
+        raise RuntimeError(error_msg)
+
+    # Merge chunk results with global positions in LangExtract's CharInterval format
+    return merge_chunk_extractions(normalized_text, chunk_results), len(chunks), failed_chunks
+
+
 class ExtractionAttribute(BaseModel):
     """Attributes for an extraction"""
     pass
@@ -128,6 +463,44 @@ class ExtractRequest(BaseModel):
     prompt_description: str
     examples: List[Example]
     model_id: str = "gemini-2.0-flash-exp"  # Using experimental flash model
+    use_cache: bool = True  # Set False to bypass the extraction cache
+    # Scheduling priority under rate limits
+    priority: Literal["interactive", "batch"] = "interactive"
+
+
+class BatchDocument(BaseModel):
+    """One document in a batch extraction"""
+    id: Optional[str] = None  # Echoed back in results; defaults to the list index
+    text: str
+
+
+class BatchExtractRequest(BaseModel):
+    """Request model for batch extraction: one prompt and example set, many documents"""
+    documents: List[BatchDocument]
+    prompt_description: str
+    examples: List[Example]
+    model_id: str = "gemini-2.0-flash-exp"
+    use_cache: bool = True
+    max_concurrency: int = Field(default=4, ge=1, le=32)  # Documents extracted at a time
+    include_html: bool = False  # Add each document's HTML visualization to its result
+
+
+@app.on_event("startup")
+async def start_executor():
+    """Create the shared extraction executor"""
+    global extraction_executor
+    extraction_executor = MeteredExecutor(
+        MAX_CONCURRENT_EXTRACTIONS, thread_name_prefix="langextract"
+    )
+    logger.info(f"Extraction executor started with {MAX_CONCURRENT_EXTRACTIONS} worker(s)")
+
+
+@app.on_event("shutdown")
+async def stop_executor():
+    """Cancel queued extractions, release the worker threads and flush artifact writes"""
+    if extraction_executor is not None:
+        extraction_executor.shutdown()
+    artifact_store.close()
 
 
 @app.get("/")
@@ -136,8 +509,14 @@ async def root():
     return {
         "message": "LangExtract Service",
         "model": "Gemini (via LangExtract)",
+        "provider": extraction_provider.name,
         "endpoints": {
             "POST /extract": "Extract structured information from text",
+            "POST /extract/batch": (
+                "Run one prompt over many documents, streaming per-document results (NDJSON or SSE)"
+            ),
+            "GET /visualization": "HTML visualization of the latest extraction",
+            "GET /visualization/{artifact_id}": "HTML visualization saved for one extraction",
             "GET /health": "Health check endpoint"
         }
     }
@@ -148,7 +527,165 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "service": "langextract"
+        "service": "langextract",
+        "cache": extraction_cache.stats() if extraction_cache else None,
+        "executor": extraction_executor.stats() if extraction_executor else None,
+        "provider": extraction_provider.name,
+        "replay": extraction_provider.stats() if REPLAY_MODE != "off" else None,
+        "rate_limits": rate_limiter.stats(),
+        "artifacts": artifact_store.stats()
+    }
+
+
+def save_extraction_artifact(
+    text: str, extractions: List[Dict], html_output: str
+) -> Tuple[str, Dict[str, str]]:
+    """Queue the JSONL results and HTML visualization as an artifact; returns (id, file paths)."""
+    results_jsonl = json.dumps(
+        {"text": text, "extractions": extractions}, ensure_ascii=False
+    ) + "\n"
+    artifact_id = artifact_store.save(
+        {RESULTS_FILE: results_jsonl, VISUALIZATION_FILE: html_output}
+    )
+    paths = artifact_store.paths(artifact_id, [RESULTS_FILE, VISUALIZATION_FILE])
+    return artifact_id, {"jsonl": paths[RESULTS_FILE], "html": paths[VISUALIZATION_FILE]}
+
+
+def check_provider_ready():
+    """Raise 503 if the configured provider can't run."""
+    # Check if LangExtract is available (only the Gemini provider calls it)
+    if extraction_provider.requires_langextract and not LANGEXTRACT_AVAILABLE:
+        logger.error(f"LangExtract not available: {LANGEXTRACT_ERROR}")
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                f"LangExtract service unavailable: {LANGEXTRACT_ERROR}. "
+                "On Windows, try: pip install python-magic-bin"
+            )
+        )
+
+    # Check if API key is configured (the stub provider and replay mode do not need one)
+    if extraction_provider.requires_api_key and (not API_KEY or API_KEY == ""):
+        logger.error("LangExtract API key not configured")
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                "LangExtract API key not configured. "
+                "Please set LANGEXTRACT_API_KEY environment variable."
+            )
+        )
+
+
+@dataclass
+class CompiledPrompt:
+    """Prompt and examples normalized and prepared once, reusable across documents."""
+    prompt: str
+    examples: List[Dict]  # normalized plain dicts (also the cache key input)
+    prepared_examples: object  # provider-specific form, e.g. lx.data.ExampleData
+    token_estimate: int  # prompt + examples, sent with every chunk
+
+
+def compile_prompt(prompt_description: str, examples: List[Example]) -> CompiledPrompt:
+    """Normalize the prompt and examples and convert them for the provider."""
+    logger.debug("Normalizing prompt and examples...")
+    normalized_examples = [
+        {
+            "text": normalize_unicode_text(example.text),
+            "extractions": [
+                {
+                    "extraction_class": normalize_unicode_text(ext.extraction_class),
+                    "extraction_text": normalize_unicode_text(ext.extraction_text),
+                    "attributes": {k: normalize_unicode_text(v) for k, v in ext.attributes.items()}
+                }
+                for ext in example.extractions
+            ]
+        }
+        for example in examples
+    ]
+    normalized_prompt = normalize_unicode_text(prompt_description)
+    return CompiledPrompt(
+        prompt=normalized_prompt,
+        examples=normalized_examples,
+        prepared_examples=extraction_provider.prepare(normalized_examples),
+        token_estimate=estimate_tokens(
+            normalized_prompt, json.dumps(normalized_examples, ensure_ascii=False)
+        )
+    )
+
+
+async def extract_document(
+    text: str, compiled: CompiledPrompt, model_id: str, use_cache: bool = True,
+    priority: str = "interactive",
+) -> Dict:
+    """
+    Extract from one document with a compiled prompt, using the result cache.
+
+    Returns:
+        Dict with the normalized "text", "extractions" (response format, with
+        start_char/end_char when known), "extractions_with_positions" (with
+        char_interval), "chunks", "failed_chunks" and "cache" status
+    """
+    # Normalize input text to handle Unicode characters properly
+    normalized_text = normalize_unicode_text(text)
+
+    # Serve identical (text, prompt, examples, model) requests from the cache
+    cache_key = None
+    cached = None
+    if extraction_cache is None:
+        cache_status = "disabled"
+    elif not use_cache:
+        cache_status = "bypass"
+    else:
+        cache_key = ExtractionCache.make_key(
+            normalized_text,
+            compiled.prompt,
+            compiled.examples,
+            model_id,
+            provider=LANGEXTRACT_PROVIDER,
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP
+        )
+        # Disk reads (and eviction scans on put) stay off the event loop
+        cached = await asyncio.to_thread(extraction_cache.get, cache_key)
+        cache_status = "hit" if cached is not None else "miss"
+    logger.info(f"Extraction cache: {cache_status}")
+
+    if cached is not None:
+        extractions_with_positions = cached["extractions"]
+        chunk_count = cached["chunks"]
+        failed_chunks = []
+    else:
+        extractions_with_positions, chunk_count, failed_chunks = await run_chunked_extraction(
+            normalized_text, compiled.prompt, compiled.prepared_examples, model_id,
+            prompt_tokens=compiled.token_estimate, priority=priority
+        )
+        # Only complete results are cached; partial ones should be retried
+        if cache_key is not None and not failed_chunks:
+            await asyncio.to_thread(
+                extraction_cache.put, cache_key,
+                {"extractions": extractions_with_positions, "chunks": chunk_count},
+            )
+
+    # Convert result to dictionary for JSON response
+    extractions = []
+    for ext_dict in extractions_with_positions:
+        extraction = {
+            "extraction_class": ext_dict["extraction_class"],
+            "extraction_text": ext_dict["extraction_text"],
+            "attributes": ext_dict["attributes"]
+        }
+        if "char_interval" in ext_dict:
+            extraction["start_char"] = ext_dict["char_interval"]["start_pos"]
+            extraction["end_char"] = ext_dict["char_interval"]["end_pos"]
+        extractions.append(extraction)
+
+    return {
+        "text": normalized_text,
+        "extractions": extractions,
+        "extractions_with_positions": extractions_with_positions,
+        "chunks": chunk_count,
+        "failed_chunks": failed_chunks,
+        "cache": cache_status
     }
 
 
@@ -163,198 +700,45 @@ async def extract_information(request: ExtractRequest):
     Returns:
         JSON response with extractions and HTML visualization
     """
+    global latest_visualization
     logger.info(f"Received extraction request for text of length {len(request.text)} with {len(request.examples)} examples")
 
     try:
-        # Check if LangExtract is available
-        if not LANGEXTRACT_AVAILABLE:
-            logger.error(f"LangExtract not available: {LANGEXTRACT_ERROR}")
-            raise HTTPException(
-                status_code=503,
-                detail=f"LangExtract service unavailable: {LANGEXTRACT_ERROR}. On Windows, try: pip install python-magic-bin"
-            )
+        check_provider_ready()
+        compiled = compile_prompt(request.prompt_description, request.examples)
+        result = await extract_document(
+            request.text, compiled, request.model_id, request.use_cache, request.priority
+        )
+        extractions = result["extractions"]
 
-        # Check if API key is configured
-        if not API_KEY or API_KEY == "":
-            logger.error("LangExtract API key not configured")
-            raise HTTPException(
-                status_code=503,
-                detail="LangExtract API key not configured. Please set LANGEXTRACT_API_KEY environment variable."
-            )
+        # Render the indexed HTML visualization in one pass from the offsets
+        html_output = await asyncio.to_thread(render_extractions_html, result["text"], extractions)
+        latest_visualization = html_output
 
-        # Normalize input text to handle Unicode characters properly
-        logger.debug("Normalizing input text and prompt...")
-        normalized_text = normalize_unicode_text(request.text)
-        normalized_prompt = normalize_unicode_text(request.prompt_description)
-
-        # Convert request examples to LangExtract format
-        logger.debug(f"Converting {len(request.examples)} examples to LangExtract format...")
-        lx_examples = []
-        for example in request.examples:
-            lx_extractions = [
-                lx.data.Extraction(
-                    extraction_class=normalize_unicode_text(ext.extraction_class),
-                    extraction_text=normalize_unicode_text(ext.extraction_text),
-                    attributes={k: normalize_unicode_text(v) for k, v in ext.attributes.items()}
-                )
-                for ext in example.extractions
-            ]
-
-            lx_examples.append(
-                lx.data.ExampleData(
-                    text=normalize_unicode_text(example.text),
-                    extractions=lx_extractions
-                )
+        artifact_id, saved_files = None, None
+        if SAVE_OUTPUTS:
+            artifact_id, saved_files = save_extraction_artifact(
+                result["text"], result["extractions_with_positions"], html_output
             )
-        logger.debug("Examples converted successfully")
-
-        # Run the extraction with normalized text and timeout handling
-        import asyncio
-        import time
-        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-
-        def run_extraction():
-            start_time = time.time()
-            logger.info(f"Running extraction with model {request.model_id}...")
-            result = lx.extract(
-                text_or_documents=normalized_text,
-                prompt_description=normalized_prompt,
-                examples=lx_examples,
-                model_id=request.model_id,
-            )
-            elapsed_time = time.time() - start_time
-            logger.info(f"Extraction completed in {elapsed_time:.2f} seconds")
-            return result
-
-        # Run extraction in thread pool with 30 second timeout
-        logger.info("Starting extraction in thread pool with 30s timeout...")
-        extraction_start = time.time()
-        with ThreadPoolExecutor() as executor:
-            future = executor.submit(run_extraction)
-            try:
-                result = future.result(timeout=30)
-                total_time = time.time() - extraction_start
-                logger.info(f"Total extraction time (including overhead): {total_time:.2f}s")
-            except FuturesTimeoutError:
-                logger.error("Extraction timed out after 30 seconds")
-                raise HTTPException(
-                    status_code=504,
-                    detail="Extraction timed out after 30 seconds. The Gemini API may be unavailable or the text is too long."
-                )
-            except Exception as e:
-                # Catch specific API errors
-                error_msg = str(e)
-                logger.error(f"Extraction failed: {error_msg}")
-                if "invalid argument" in error_msg.lower() or "errno 22" in error_msg.lower():
-                    raise HTTPException(
-                        status_code=500,
-                        detail="API configuration error. The Gemini API key may be invalid or expired. Please check your API key."
-                    )
-                raise
-
-        # Save results to JSONL file with explicit UTF-8 encoding
-        logger.info("Saving extraction results...")
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-
-        output_file = os.path.join(output_dir, "extraction_results.jsonl")
-
-        # Calculate positions using LangExtract's CharInterval format
-        text_for_search = result.text if hasattr(result, 'text') else ""
-        extractions_with_positions = []
-
-        for ext in (result.extractions if hasattr(result, 'extractions') else []):
-            ext_dict = {
-                "extraction_class": ext.extraction_class,
-                "extraction_text": ext.extraction_text,
-                "attributes": ext.attributes
-            }
-
-            # Try to find position in text and add char_interval
-            if text_for_search and ext.extraction_text:
-                start_pos = text_for_search.find(ext.extraction_text)
-                if start_pos != -1:
-                    # Use LangExtract's char_interval format with start_pos and end_pos
-                    ext_dict["char_interval"] = {
-                        "start_pos": start_pos,
-                        "end_pos": start_pos + len(ext.extraction_text)
-                    }
-
-            extractions_with_positions.append(ext_dict)
-
-        result_dict = {
-            "text": text_for_search,
-            "extractions": extractions_with_positions
-        }
-
-        with open(output_file, 'w', encoding='utf-8', errors='replace') as f:
-            json.dump(result_dict, f, ensure_ascii=False)
-            f.write('\n')
-        logger.info(f"Saved extraction results to {output_file} with {len(extractions_with_positions)} extractions")
-
-        # Generate HTML visualization
-        logger.info("Generating HTML visualization...")
-        html_content = lx.visualize(output_file)
-
-        # Handle both Jupyter and regular output
-        if hasattr(html_content, 'data'):
-            html_output = html_content.data
-        else:
-            html_output = html_content
-
-        # Add data-extraction-index attributes to HTML for navigation
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html_output, 'html.parser')
-
-        # Find all highlighted spans (LangExtract uses marks or specific classes)
-        # The exact selector depends on how lx.visualize() structures the HTML
-        highlighted_elements = soup.find_all('mark') or soup.find_all(class_=lambda x: x and 'highlight' in x.lower() if x else False)
-
-        # If we can't find marks, look for spans with background colors or specific attributes
-        if not highlighted_elements:
-            highlighted_elements = soup.find_all('span', style=lambda x: x and 'background' in x.lower() if x else False)
-
-        # Add index to each highlighted element
-        for index, element in enumerate(highlighted_elements):
-            element['data-extraction-index'] = str(index)
-
-        html_output = str(soup)
-
-        # Save HTML visualization
-        html_file = os.path.join(output_dir, "extraction_visualization.html")
-        with open(html_file, "w", encoding="utf-8") as f:
-            f.write(html_output)
-        logger.info(f"Saved HTML visualization to {html_file}")
-
-        # Convert result to dictionary for JSON response
-        extractions = []
-        if hasattr(result, 'extractions'):
-            for ext in result.extractions:
-                ext_dict = {
-                    "extraction_class": ext.extraction_class,
-                    "extraction_text": ext.extraction_text,
-                    "attributes": ext.attributes
-                }
-                if hasattr(ext, 'start_char'):
-                    ext_dict["start_char"] = ext.start_char
-                if hasattr(ext, 'end_char'):
-                    ext_dict["end_char"] = ext.end_char
-                extractions.append(ext_dict)
 
         logger.info(f"Extraction completed successfully with {len(extractions)} extractions")
         return JSONResponse(
             status_code=200,
             content={
                 "success": True,
+                "partial": bool(result["failed_chunks"]),
+                "chunks": result["chunks"],
+                "cache": result["cache"],
+                "failed_chunks": result["failed_chunks"],
                 "extractions": extractions,
                 "html_visualization": html_output,
-                "saved_files": {
-                    "jsonl": output_file,
-                    "html": html_file
-                }
+                "artifact_id": artifact_id,
+                "saved_files": saved_files
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during extraction: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -363,6 +747,113 @@ async def extract_information(request: ExtractRequest):
         )
 
 
+@app.post("/extract/batch")
+async def extract_batch(request: BatchExtractRequest, stream_format: StreamProtocol = "ndjson"):
+    """
+    Run one prompt and example set over many documents, streaming results.
+
+    The prompt and examples are normalized and converted once for the whole
+    batch. Up to ``max_concurrency`` documents are extracted at a time (their
+    chunks share the service-wide extraction executor), and each document's
+    result is streamed as soon as it finishes, so events can arrive out of
+    input order. Events:
+
+        start     - {"documents"}
+        document  - {"index", "id", "success": true, "partial", "chunks", "cache",
+                     "failed_chunks", "extractions"[, "html_visualization"][, "artifact_id"]}
+                    or {"index", "id", "success": false, "status_code", "detail"}
+        done      - {"documents", "succeeded", "failed", "elapsed_seconds"}
+
+    Args:
+        request: BatchExtractRequest with documents, prompt, examples, and model_id
+        stream_format: "ndjson" (default) or "sse"
+    """
+    logger.info(
+        f"Received batch extraction request for {len(request.documents)} documents "
+        f"with {len(request.examples)} examples"
+    )
+    check_provider_ready()
+    try:
+        compiled = compile_prompt(request.prompt_description, request.examples)
+    except Exception as e:
+        logger.error(f"Error compiling batch prompt: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error preparing examples: {str(e)}")
+
+    document_slots = asyncio.Semaphore(request.max_concurrency)
+
+    async def process(index: int, document: BatchDocument) -> Dict:
+        doc_id = document.id if document.id is not None else str(index)
+        async with document_slots:
+            try:
+                result = await extract_document(
+                    document.text, compiled, request.model_id, request.use_cache, priority="batch"
+                )
+                event = {
+                    "event": "document",
+                    "index": index,
+                    "id": doc_id,
+                    "success": True,
+                    "partial": bool(result["failed_chunks"]),
+                    "chunks": result["chunks"],
+                    "cache": result["cache"],
+                    "failed_chunks": result["failed_chunks"],
+                    "extractions": result["extractions"]
+                }
+                if request.include_html or SAVE_OUTPUTS:
+                    html_output = await asyncio.to_thread(
+                        render_extractions_html, result["text"], result["extractions"]
+                    )
+                    if request.include_html:
+                        event["html_visualization"] = html_output
+                    if SAVE_OUTPUTS:
+                        event["artifact_id"], _ = save_extraction_artifact(
+                            result["text"], result["extractions_with_positions"], html_output
+                        )
+                return event
+            except HTTPException as e:
+                status_code, detail = e.status_code, e.detail
+            except Exception as e:
+                logger.error(
+                    f"Batch extraction failed for document {doc_id}: {str(e)}", exc_info=True
+                )
+                status_code, detail = 500, f"Error during extraction: {str(e)}"
+            return {"event": "document", "index": index, "id": doc_id, "success": False,
+                    "status_code": status_code, "detail": detail}
+
+    async def event_stream():
+        started = time.time()
+        yield encode_event({"event": "start", "documents": len(request.documents)}, stream_format)
+        tasks = [
+            asyncio.create_task(process(index, document))
+            for index, document in enumerate(request.documents)
+        ]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event = await next_done
+                succeeded += event["success"]
+                yield encode_event(event, stream_format)
+        finally:
+            # Client went away: stop documents that haven't finished
+            for task in tasks:
+                task.cancel()
+        elapsed = time.time() - started
+        logger.info(
+            f"Batch extraction finished: {succeeded}/{len(tasks)} documents in {elapsed:.2f}s"
+        )
+        yield encode_event({
+            "event": "done",
+            "documents": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
+            "elapsed_seconds": round(elapsed, 3)
+        }, stream_format)
+
+    return StreamingResponse(
+        event_stream(), media_type=MEDIA_TYPES[stream_format], headers=STREAM_HEADERS
+    )
+
+
 @app.get("/visualization")
 async def get_visualization():
     """
@@ -371,16 +862,26 @@ async def get_visualization():
     Returns:
         HTML visualization of the last extraction
     """
-    html_file = os.path.join("output", "extraction_visualization.html")
-
-    if not os.path.exists(html_file):
+    if latest_visualization is None:
         raise HTTPException(
             status_code=404,
             detail="No visualization found. Run an extraction first."
         )
+    return HTMLResponse(content=latest_visualization)
 
-    with open(html_file, "r", encoding="utf-8") as f:
-        html_content = f.read()
 
-    return HTMLResponse(content=html_content)
+@app.get("/visualization/{artifact_id}")
+async def get_artifact_visualization(artifact_id: str):
+    """
+    Get the HTML visualization saved for one extraction
 
+    Args:
+        artifact_id: "artifact_id" from an /extract or /extract/batch result
+    """
+    html_content = await asyncio.to_thread(artifact_store.read, artifact_id, VISUALIZATION_FILE)
+    if html_content is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No visualization found for artifact '{artifact_id}'. It may have expired."
+        )
+    return HTMLResponse(content=html_content.decode("utf-8"))
@@ -0,0 +1,306 @@
+"""
+Registry of named models shared by the sentiment and NER services.
+
+Models are declared as ``name=source`` pairs (a Hugging Face id or a local
+path) and loaded on first use by a service-supplied loader. Loaded models
+are kept in LRU order. Once their estimated parameter memory exceeds the
+budget, the least recently used idle models are unloaded. The default model
+and models with requests in flight are never evicted.
+
+Requests resolve a model name once, then hold the model with ``use()`` for
+each forward pass. ``set_default()`` loads the new model before swapping the
+default name under the lock. Requests that already resolved the old default
+finish on it, and new requests see the new one. Nothing waits on the swap
+except the load itself.
+
+Per-model call latency (mean/p50/p95 over the last LATENCY_WINDOW calls) and
+throughput are reported by ``stats()``.
+
+``model_router()`` adds the shared ``GET /models`` and ``POST /models/default``
+endpoints to a service. The default can only be switched to a model the
+service was configured with: the endpoint is unauthenticated, so it never
+takes a source to load.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ConfigDict
+
+logger = logging.getLogger(__name__)
+
+# Recent calls per model used for latency percentiles
+LATENCY_WINDOW = 1000
+
+
+def parse_model_specs(value: str, default_name: str, default_source: str) -> Dict[str, str]:
+    """
+    Parse "name=source,name2=source2" into {name: source}.
+
+    The default model is always included; a bare "source" entry is named after
+    its last path component.
+    """
+    specs = {default_name: default_source}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, source = item.rpartition("=")
+        if not name:
+            name = source.rstrip("/").rsplit("/", 1)[-1]
+        specs[name.strip()] = source.strip()
+    return specs
+
+
+def model_bytes(obj: Any) -> int:
+    """Parameter and buffer bytes of a model, pipeline or (tokenizer, model) pair; 0 if unknown."""
+    if isinstance(obj, (tuple, list)):
+        return sum(model_bytes(item) for item in obj)
+    if hasattr(obj, "model") and not hasattr(obj, "parameters"):
+        return model_bytes(obj.model)  # transformers pipeline
+    total = 0
+    for attr in ("parameters", "buffers"):
+        if callable(getattr(obj, attr, None)):
+            total += sum(t.numel() * t.element_size() for t in getattr(obj, attr)())
+    return total
+
+
+class _Entry:
+    def __init__(self, source: str):
+        self.source = source
+        self.model = None
+        self.bytes = 0
+        self.in_use = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.calls = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        # Serializes loads of this model without blocking other models
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Lazily loaded, LRU-evicted named models with an atomically swappable default."""
+
+    def __init__(self, specs: Dict[str, str], default: str, loader: Callable[[str], Any],
+                 memory_budget_bytes: int = 0, size_of: Callable[[Any], int] = model_bytes):
+        """
+        Args:
+            specs: {name: source}
+            default: Name of the default model (must be in specs)
+            loader: Loads a model object from a source
+            memory_budget_bytes: Evict idle models beyond this (0 = no limit)
+            size_of: Estimated memory of a loaded model
+        """
+        if default not in specs:
+            raise KeyError(f"Unknown model '{default}'")
+        self.loader = loader
+        self.size_of = size_of
+        self.memory_budget_bytes = memory_budget_bytes
+        self.default = default
+        self._entries: Dict[str, _Entry] = {name: _Entry(source) for name, source in specs.items()}
+        self._loaded: "OrderedDict[str, _Entry]" = OrderedDict()  # LRU order, oldest first
+        self._lock = threading.Lock()
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        """The model name a request should use (None = the current default)."""
+        with self._lock:
+            name = name or self.default
+            if name not in self._entries:
+                raise KeyError(f"Unknown model '{name}'. Available: {', '.join(self._entries)}")
+            return name
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def register(self, name: str, source: str):
+        """Add a model (or point an unloaded one at a new source)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.model is not None and entry.source != source:
+                raise ValueError(
+                    f"Model '{name}' is loaded from {entry.source}; register it under a new name"
+                )
+            if entry is None:
+                self._entries[name] = _Entry(source)
+            else:
+                entry.source = source
+
+    def load(self, name: Optional[str] = None) -> str:
+        """Load a model if needed and return its name."""
+        name = self.resolve(name)
+        entry = self._entries[name]
+        with entry.load_lock:
+            if entry.model is None:
+                logger.info(f"Loading model '{name}' from {entry.source}...")
+                started = time.perf_counter()
+                model = self.loader(entry.source)
+                size = self.size_of(model)
+                with self._lock:
+                    entry.model = model
+                    entry.bytes = size
+                    entry.loads += 1
+                    entry.load_seconds += time.perf_counter() - started
+                    self._loaded[name] = entry
+                logger.info(
+                    f"Model '{name}' loaded ({size / 1024 / 1024:.0f} MB) "
+                    f"in {entry.load_seconds:.1f}s"
+                )
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+            self._evict(keep=name)
+        return name
+
+    def set_default(self, name: str):
+        """Load a model and make it the default for new requests."""
+        name = self.load(name)
+        with self._lock:
+            previous, self.default = self.default, name
+            self._evict()
+        if previous != name:
+            logger.info(f"Default model switched from '{previous}' to '{name}'")
+
+    @contextmanager
+    def use(self, name: Optional[str] = None, items: int = 1) -> Iterator[Any]:
+        """Hold a model for one call (not evictable meanwhile) and record its latency."""
+        while True:
+            name = self.load(name)
+            entry = self._entries[name]
+            with self._lock:
+                # Evicted between load() and here: load again
+                if entry.model is not None:
+                    entry.in_use += 1
+                    model = entry.model
+                    self._loaded.move_to_end(name)
+                    break
+        started = time.perf_counter()
+        try:
+            yield model
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry.in_use -= 1
+                entry.calls += 1
+                entry.items += items
+                entry.busy_seconds += elapsed
+                entry.latencies.append(elapsed)
+                self._evict()
+
+    def record_items(self, name: str, items: int):
+        """Add to a model's item count when it is only known inside ``use``."""
+        with self._lock:
+            self._entries[name].items += items
+
+    def _evict(self, keep: Optional[str] = None):
+        """Unload least recently used idle models while over budget (caller holds the lock)."""
+        if self.memory_budget_bytes <= 0:
+            return
+        used = sum(entry.bytes for entry in self._loaded.values())
+        for name in list(self._loaded):
+            if used <= self.memory_budget_bytes:
+                break
+            entry = self._loaded[name]
+            if name in (self.default, keep) or entry.in_use:
+                continue
+            used -= entry.bytes
+            entry.model = None
+            entry.bytes = 0
+            entry.evictions += 1
+            del self._loaded[name]
+            logger.info(
+                f"Evicted model '{name}' "
+                f"(memory budget {self.memory_budget_bytes / 1024 / 1024:.0f} MB)"
+            )
+
+    def is_loaded(self, name: Optional[str] = None) -> bool:
+        with self._lock:
+            entry = self._entries.get(name or self.default)
+            return entry is not None and entry.model is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = {}
+            for name, entry in self._entries.items():
+                latencies = np.asarray(entry.latencies) * 1000
+                models[name] = {
+                    "source": entry.source,
+                    "loaded": entry.model is not None,
+                    "memory_mb": round(entry.bytes / 1024 / 1024, 1),
+                    "in_use": entry.in_use,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                    "load_seconds": round(entry.load_seconds, 3),
+                    "calls": entry.calls,
+                    "items": entry.items,
+                    "items_per_second": (
+                        round(entry.items / entry.busy_seconds, 1) if entry.busy_seconds else None
+                    ),
+                    "latency_ms": {
+                        "mean": round(float(latencies.mean()), 2),
+                        "p50": round(float(np.percentile(latencies, 50)), 2),
+                        "p95": round(float(np.percentile(latencies, 95)), 2),
+                    } if len(latencies) else None,
+                }
+            return {
+                "default": self.default,
+                "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 1),
+                "memory_used_mb": round(
+                    sum(e.bytes for e in self._loaded.values()) / 1024 / 1024, 1
+                ),
+                "models": models,
+            }
+
+
+class DefaultModelRequest(BaseModel):
+    """Switch the default to a registered model"""
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+
+
+def model_router(registry: ModelRegistry) -> APIRouter:
+    """Router with ``GET /models`` and ``POST /models/default`` for a service's registry."""
+    router = APIRouter()
+
+    @router.get("/models")
+    async def list_models():
+        """Registered models with load state, memory and latency stats"""
+        return registry.stats()
+
+    @router.post("/models/default")
+    async def set_default_model(request: DefaultModelRequest):
+        """
+        Load a registered model and make it the default for new requests.
+
+        Requests already running finish on the model they started with.
+        """
+        if request.name not in registry:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Unknown model '{request.name}'. "
+                    f"Available: {', '.join(registry.stats()['models'])}"
+                )
+            )
+        try:
+            await asyncio.to_thread(registry.set_default, request.name)
+        except Exception as e:
+            logger.error(f"Failed to load model '{request.name}': {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500, detail=f"Failed to load model '{request.name}': {str(e)}"
+            )
+        return registry.stats()
+
+    return router
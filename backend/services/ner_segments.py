@@ -0,0 +1,152 @@
+"""
+Sentence-segmented, batched NER.
+
+Instead of one long (and silently truncated) sequence, the text is split at
+the same sentence boundaries the sentiment service uses. Consecutive
+sentences are packed into segments of up to ``max_tokens`` tokens, counted
+with the pipeline's own tokenizer, so each segment keeps some context and
+fits the model's 512-token window however number-dense the text is.
+Pipelines without a tokenizer (the offline stub) pack up to ``max_chars``
+characters instead. The segments go through the token-classification
+pipeline in length-sorted batches, so each batch pads only to its longest
+member. Entities are then shifted back to document offsets.
+"""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.services.sentence_segmenter import segment_sentences
+
+_LAST_SPACE = re.compile(r"\s\S*$")
+
+
+def _split_long(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """Split an overlong sentence at whitespace into pieces of at most max_chars."""
+    pieces = []
+    while end - start > max_chars:
+        window = text[start:start + max_chars]
+        cut = _LAST_SPACE.search(window)
+        split = start + (cut.start() if cut and cut.start() > 0 else max_chars)
+        pieces.append((start, split))
+        start = split
+    pieces.append((start, end))
+    return pieces
+
+
+def _split_long_tokens(
+    text: str, start: int, token_starts: List[int], max_tokens: int
+) -> List[Tuple[int, int]]:
+    """
+    Cut points of an overlong sentence so each piece has at most max_tokens tokens.
+
+    Args:
+        token_starts: Document offset of each token of the sentence starting at ``start``
+
+    Returns:
+        (piece end, tokens in the piece) for every piece but the last
+    """
+    cuts = []
+    first = 0
+    while len(token_starts) - first > max_tokens:
+        limit = token_starts[first + max_tokens]
+        cut = _LAST_SPACE.search(text, start, limit)
+        split = cut.start() if cut and cut.start() > start else limit
+        tokens = bisect.bisect_left(token_starts, split) - first
+        if tokens <= 0:
+            split, tokens = limit, max_tokens
+        cuts.append((split, tokens))
+        start, first = split, first + tokens
+    return cuts
+
+
+def _token_pieces(text: str, sentences: List[Tuple[int, int]], tokenizer,
+                  max_tokens: int) -> List[Tuple[int, int, int]]:
+    """(start, end, token count) pieces of the sentences, none over max_tokens."""
+    encoded = tokenizer(
+        [text[s:e] for s, e in sentences], add_special_tokens=False, return_offsets_mapping=True
+    )
+    pieces = []
+    for (sentence_start, sentence_end), offsets in zip(sentences, encoded["offset_mapping"]):
+        token_starts = [sentence_start + token_start for token_start, _ in offsets]
+        piece_start, used = sentence_start, 0
+        for split, tokens in _split_long_tokens(text, sentence_start, token_starts, max_tokens):
+            pieces.append((piece_start, split, tokens))
+            piece_start, used = split, used + tokens
+        pieces.append((piece_start, sentence_end, len(token_starts) - used))
+    return pieces
+
+
+def pack_segments(text: str, start: int, end: int, max_chars: int, tokenizer=None,
+                  max_tokens: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Segments of ``text[start:end]``: whole sentences packed up to max_tokens
+    tokens of ``tokenizer``, or up to max_chars characters without one.
+
+    Returns:
+        (start, end) document offsets of each segment
+    """
+    starts, ends = segment_sentences(text[start:end])
+    sentences = list(zip((starts + start).tolist(), (ends + start).tolist()))
+    if tokenizer is not None and max_tokens and sentences:
+        # Cost of a run of pieces: their token counts (whitespace between sentences has no tokens)
+        limit = max_tokens
+        pieces = []
+        total = 0
+        for piece_start, piece_end, tokens in _token_pieces(text, sentences, tokenizer, max_tokens):
+            pieces.append((piece_start, piece_end, total, total + tokens))
+            total += tokens
+    else:
+        # Cost of a run of pieces: the characters it spans
+        limit = max_chars
+        pieces = [
+            (piece_start, piece_end, piece_start, piece_end)
+            for sentence_start, sentence_end in sentences
+            for piece_start, piece_end in _split_long(text, sentence_start, sentence_end, max_chars)
+        ]
+
+    segments: List[Tuple[int, int]] = []
+    current = None
+    for piece_start, piece_end, cost_start, cost_end in pieces:
+        if current and cost_end - current[2] <= limit:
+            current = (current[0], piece_end, current[2])
+            continue
+        if current:
+            segments.append(current[:2])
+        current = (piece_start, piece_end, cost_start)
+    if current:
+        segments.append(current[:2])
+    return segments
+
+
+def run_segments(
+    pipeline, text: str, segments: Sequence[Tuple[int, int]], batch_size: int
+) -> List[Dict]:
+    """
+    Run ``pipeline`` over segments in length-sorted batches.
+
+    Returns:
+        Entity dicts (JSON-safe, document offsets) sorted by start
+    """
+    order = sorted(range(len(segments)), key=lambda i: segments[i][1] - segments[i][0])
+    entities = []
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        outputs = pipeline(
+            [text[segments[i][0]:segments[i][1]] for i in batch], batch_size=len(batch)
+        )
+        for i, found in zip(batch, outputs):
+            offset = segments[i][0]
+            # Convert numpy float32 to Python float for JSON serialization
+            entities.extend(
+                {
+                    "entity_group": entity["entity_group"],
+                    "score": float(entity["score"]),
+                    "word": entity["word"],
+                    "start": int(entity["start"]) + offset,
+                    "end": int(entity["end"]) + offset
+                }
+                for entity in found
+            )
+    entities.sort(key=lambda entity: entity["start"])
+    return entities
@@ -2,14 +2,26 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional, Sequence, Tuple
 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
 import os
 import logging
 import sys
 import warnings
+import asyncio
+import time
 from pathlib import Path
 
+from backend.services.artifact_store import ArtifactStore
+from backend.services.entity_index import build_entity_index
+from backend.services.financial_patterns import find_financial_entities, merge_entities
+from backend.services.gazetteer import Gazetteer
+from backend.services.incremental_analysis import (
+    content_hash, entities_by_span, incremental_report, match_segments, open_store, split_paragraphs
+)
+from backend.services.model_registry import ModelRegistry, model_router, parse_model_specs
+from backend.services.ner_segments import pack_segments, run_segments
+
 # Suppress warnings from external libraries
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", message=".*resume_download.*")
@@ -43,16 +55,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global NER pipeline
-ner_pipeline = None
-
 # Financial NER model - using a popular financial NER model
 MODEL_NAME = "dslim/bert-base-NER"  # General NER model (works for financial text)
 
+# Use a deterministic offline stub pipeline instead of BERT (load testing / CI)
+STUB_MODELS = os.getenv("FINSIGHT_STUB_MODELS", "0") == "1"
+
+# Named models ("name=hf-id-or-path,..."), loaded on first use and selectable
+# per request with "model"; MODEL_NAME is registered as "bert-base-ner"
+NER_DEFAULT_MODEL = os.getenv("NER_DEFAULT_MODEL", "bert-base-ner")
+NER_MODELS = parse_model_specs(os.getenv("NER_MODELS", ""), "bert-base-ner", MODEL_NAME)
+# Idle models beyond this much parameter memory are unloaded, least recently used
+# first (0 = no limit)
+NER_MODEL_MEMORY_MB = float(os.getenv("NER_MODEL_MEMORY_MB", "2048"))
+
+# "sentence": pack whole sentences into segments and run them in batches
+# (latency linear in document length); "document": the whole text as one
+# sequence, truncated by the model. Requests can override with "mode".
+NER_MODE = os.getenv("NER_MODE", "sentence")
+# Segment size in tokens of the model's tokenizer (well inside BERT's 512)
+NER_SEGMENT_MAX_TOKENS = int(os.getenv("NER_SEGMENT_MAX_TOKENS", "256"))
+# Segment size in characters, for pipelines without a tokenizer (the offline stub)
+NER_SEGMENT_MAX_CHARS = int(os.getenv("NER_SEGMENT_MAX_CHARS", "1000"))
+# Segments per forward pass
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+
+# Add regex-based MONEY/PERCENT/DATE entities, which the BERT model never emits
+NER_FINANCIAL_RULES = os.getenv("NER_FINANCIAL_RULES", "1") == "1"
+
+# Optional gazetteer of listed companies and tickers (delimited file with
+# ticker/symbol and name/company columns), matched as ORG/TICKER entities.
+# Compiled once into a memory-mapped index under NER_GAZETTEER_INDEX_DIR.
+NER_GAZETTEER = os.getenv("NER_GAZETTEER", "")
+NER_GAZETTEER_INDEX_DIR = os.getenv("NER_GAZETTEER_INDEX_DIR", os.path.join("cache", "gazetteer"))
+# Match tickers anywhere, not only after "$", "(" or "NASDAQ:"-style prefixes
+NER_GAZETTEER_BARE_TICKERS = os.getenv("NER_GAZETTEER_BARE_TICKERS", "0") == "1"
+gazetteer = None
+
+# Cumulative time spent in the model vs the rule and gazetteer passes (reported by /health)
+ner_timings = {"requests": 0, "model_seconds": 0.0, "rules_seconds": 0.0, "gazetteer_seconds": 0.0}
+
+# Each result's highlighted HTML is saved as its own artifact under
+# output/ner/<artifact_id>/ (written off the request path, pruned by count/age)
+RESULTS_FILE = "ner_results.html"
+artifact_store = ArtifactStore(
+    os.path.join("output", "ner"),
+    max_artifacts=int(os.getenv("FINSIGHT_ARTIFACT_MAX_COUNT", "200")),
+    max_age_seconds=float(os.getenv("FINSIGHT_ARTIFACT_MAX_AGE_HOURS", "168")) * 3600
+)
+
+# Previous results by content hash, for incremental re-analysis of amended documents
+analysis_store = open_store("ner")
+
+
+def load_ner_pipeline(source: str):
+    """Build a token-classification pipeline for the registry."""
+    if STUB_MODELS:
+        from backend.services.stub_models import StubNERPipeline
+        return StubNERPipeline()
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    model = AutoModelForTokenClassification.from_pretrained(source)
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+
+
+models = ModelRegistry(
+    NER_MODELS, NER_DEFAULT_MODEL, load_ner_pipeline,
+    memory_budget_bytes=int(NER_MODEL_MEMORY_MB * 1024 * 1024)
+)
+app.include_router(model_router(models))
+
 
 class NERRequest(BaseModel):
     """Request model for NER"""
     text: str
+    # "content_hash" of an earlier result: only paragraphs not in it are re-run
+    previous_hash: Optional[str] = None
+    # Defaults to NER_MODE
+    mode: Optional[Literal["sentence", "document"]] = None
+    # "mentions": every mention in "entities" plus "highlighted_html"; "index":
+    # one "entity_index" entry per distinct entity and no HTML (much smaller,
+    # the HTML marks every mention); "both"
+    output: Literal["mentions", "index", "both"] = "both"
+    # Registered model name (defaults to the current default model)
+    model: Optional[str] = None
 
 
 class Entity(BaseModel):
@@ -72,34 +157,52 @@ class NERResponse(BaseModel):
 
 @app.on_event("startup")
 async def load_model():
-    """Load NER model on startup"""
-    global ner_pipeline
-    logger.info(f"Starting NER model loading from {MODEL_NAME}...")
-    try:
-        logger.info("Loading tokenizer...")
-        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        logger.info("Tokenizer loaded successfully")
-
-        logger.info("Loading model...")
-        model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
-        logger.info("Model loaded successfully")
+    """Load the default NER model on startup"""
+    if STUB_MODELS:
+        logger.warning("FINSIGHT_STUB_MODELS=1 - using offline stub NER pipeline")
 
-        logger.info("Creating NER pipeline...")
-        ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    logger.info(f"Starting default NER model loading ({models.default})...")
+    try:
+        await asyncio.to_thread(models.load)
         logger.info("NER model loaded successfully!")
     except Exception as e:
         logger.error(f"Failed to load NER model: {str(e)}", exc_info=True)
         raise
 
 
+@app.on_event("startup")
+async def load_gazetteer():
+    """Open (building if needed) the gazetteer index"""
+    global gazetteer
+    if not NER_GAZETTEER:
+        return
+    try:
+        gazetteer = await asyncio.to_thread(
+            Gazetteer.open, NER_GAZETTEER, NER_GAZETTEER_INDEX_DIR, NER_GAZETTEER_BARE_TICKERS
+        )
+        logger.info(f"Gazetteer loaded: {gazetteer.meta['entries']} entries from {NER_GAZETTEER}")
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load gazetteer {NER_GAZETTEER}: {e}")
+
+
+@app.on_event("shutdown")
+async def flush_artifacts():
+    """Finish queued artifact writes"""
+    artifact_store.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
     return {
         "message": "Financial NER Service",
-        "model": MODEL_NAME,
+        "model": models.default,
         "endpoints": {
             "POST /recognize": "Recognize financial entities in text",
+            "GET /visualization": "Highlighted HTML of the latest result",
+            "GET /visualization/{artifact_id}": "Highlighted HTML saved for one result",
+            "GET /models": "Registered models, load state and per-model latency",
+            "POST /models/default": "Switch the default model without a restart",
             "GET /health": "Health check endpoint"
         }
     }
@@ -108,11 +211,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    model_loaded = ner_pipeline is not None
+    model_loaded = models.is_loaded()
     return {
         "status": "healthy" if model_loaded else "unhealthy",
         "service": "financial-ner",
-        "model_loaded": model_loaded
+        "model_loaded": model_loaded,
+        "default_model": models.default,
+        "artifacts": artifact_store.stats(),
+        "timings": ner_timings,
+        "gazetteer": gazetteer.stats() if gazetteer else None,
+        "analysis_store": analysis_store.stats() if analysis_store else None
     }
 
 
@@ -123,6 +231,7 @@ def get_entity_color(entity_type: str) -> str:
         "ORG": "#ADD8E6",      # Organization - Light Blue
         "LOC": "#90EE90",      # Location - Light Green
         "MISC": "#FFE4B5",     # Miscellaneous - Moccasin
+        "TICKER": "#87CEFA",   # Ticker - Light Sky Blue
         "CARDINAL": "#DDA0DD", # Numbers - Plum
         "DATE": "#F0E68C",     # Date - Khaki
         "MONEY": "#98FB98",    # Money - Pale Green
@@ -197,6 +306,96 @@ def highlight_entities_in_html(text: str, entities: List[Dict]) -> str:
     return html_output
 
 
+def recognize_spans(
+    text: str, spans: Sequence[Tuple[int, int]], mode: str, model_name: str
+) -> List[Dict]:
+    """Entities found in the given (start, end) spans of text, at document offsets."""
+    started = time.perf_counter()
+    with models.use(model_name, items=0) as ner_pipeline:
+        if mode == "sentence":
+            # Packed by the loaded pipeline's own tokenizer (none for the stub), so
+            # no segment is truncated
+            tokenizer = getattr(ner_pipeline, "tokenizer", None)
+            segments = [
+                segment
+                for start, end in spans
+                for segment in pack_segments(text, start, end, NER_SEGMENT_MAX_CHARS,
+                                             tokenizer, NER_SEGMENT_MAX_TOKENS)
+            ]
+        else:
+            segments = [(start, end) for start, end in spans if end > start]
+        models.record_items(model_name, len(segments))
+        entities = run_segments(ner_pipeline, text, segments, NER_BATCH_SIZE)
+    model_done = time.perf_counter()
+    rule_entities = []
+    if NER_FINANCIAL_RULES:
+        rule_entities = [
+            entity for start, end in spans for entity in find_financial_entities(text, start, end)
+        ]
+    rules_done = time.perf_counter()
+    gazetteer_entities = []
+    if gazetteer is not None:
+        gazetteer_entities = [
+            entity for start, end in spans for entity in gazetteer.find(text, start, end)
+        ]
+    # Gazetteer entities come before the model's so they win ties (same span and type)
+    entities = merge_entities(rule_entities, gazetteer_entities, entities)
+    ner_timings["requests"] += 1
+    ner_timings["model_seconds"] += model_done - started
+    ner_timings["rules_seconds"] += rules_done - model_done
+    ner_timings["gazetteer_seconds"] += time.perf_counter() - rules_done
+    return entities
+
+
+def recognize_incrementally(text: str, previous_hash: str, previous: Optional[Dict], mode: str,
+                            model_name: str):
+    """
+    Run NER only on paragraphs that are not in a previous result by the same model.
+
+    Entities of unchanged paragraphs are copied from the previous result and
+    shifted to the paragraph's new position.
+
+    Args:
+        previous: The stored result for previous_hash (None if not found)
+
+    Returns:
+        (entities, "incremental" report)
+    """
+    paragraphs = split_paragraphs(text)
+    if previous is not None and previous.get("model", NER_DEFAULT_MODEL) != model_name:
+        logger.warning(f"Previous NER result {previous_hash} used model '{previous.get('model')}'")
+        previous = None
+    if previous is None:
+        logger.warning(f"Previous NER result {previous_hash} not usable; running on the full text")
+        entities = recognize_spans(text, [(0, len(text))], mode, model_name)
+        return entities, incremental_report(previous_hash, False, "paragraph", 0, len(paragraphs))
+
+    old_text = previous["text"]
+    old_paragraphs = split_paragraphs(old_text)
+    old_entities = entities_by_span(previous["entities"], old_paragraphs)
+    matches = match_segments(
+        [old_text[start:end] for start, end in old_paragraphs],
+        [text[start:end] for start, end in paragraphs]
+    )
+
+    todo = [idx for idx, match in enumerate(matches) if match is None]
+    entities = []
+    if todo:
+        entities = recognize_spans(text, [paragraphs[idx] for idx in todo], mode, model_name)
+    for idx, match in enumerate(matches):
+        if match is not None:
+            shift = paragraphs[idx][0] - old_paragraphs[match][0]
+            entities.extend(
+                {**entity, "start": entity["start"] + shift, "end": entity["end"] + shift}
+                for entity in old_entities[match]
+            )
+    entities.sort(key=lambda entity: entity["start"])
+    report = incremental_report(
+        previous_hash, True, "paragraph", len(paragraphs) - len(todo), len(todo)
+    )
+    return entities, report
+
+
 @app.post("/recognize")
 async def recognize_entities(request: NERRequest):
     """
@@ -210,53 +409,69 @@ async def recognize_entities(request: NERRequest):
     """
     logger.info(f"Received NER request for text of length {len(request.text)}")
 
-    if not ner_pipeline:
-        logger.error("NER model not loaded yet")
-        raise HTTPException(
-            status_code=503,
-            detail="NER model not loaded. Please wait for service to initialize."
-        )
+    try:
+        model_name = models.resolve(request.model)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e).strip("'\""))
 
     try:
-        # Run NER
-        logger.info("Running NER pipeline...")
-        entities = ner_pipeline(request.text)
-        logger.info(f"Found {len(entities)} entities")
-
-        # Convert numpy float32 to Python float for JSON serialization
-        entities_json = []
-        for entity in entities:
-            entities_json.append({
-                "entity_group": entity["entity_group"],
-                "score": float(entity["score"]),
-                "word": entity["word"],
-                "start": int(entity["start"]),
-                "end": int(entity["end"])
-            })
-        logger.debug(f"Converted {len(entities_json)} entities to JSON format")
+        # Models load lazily; keep a first load off the event loop
+        await asyncio.to_thread(models.load, model_name)
+
+        # Run NER (only on changed paragraphs when a previous result is referenced)
+        logger.info(f"Running NER pipeline ({model_name})...")
+        mode = request.mode or NER_MODE
+        incremental = None
+        if request.previous_hash:
+            # Reading the previous result is a disk read: off the event loop
+            previous = None
+            if analysis_store is not None:
+                previous = await asyncio.to_thread(analysis_store.get, request.previous_hash)
+            entities_json, incremental = recognize_incrementally(
+                request.text, request.previous_hash, previous, mode, model_name
+            )
+            logger.info(
+                f"Incremental NER: {incremental['reused']} paragraphs reused, "
+                f"{incremental['recomputed']} re-run"
+            )
+        else:
+            entities_json = recognize_spans(
+                request.text, [(0, len(request.text))], mode, model_name
+            )
+        logger.info(f"Found {len(entities_json)} entities")
+
+        # Store the result for later incremental requests (a disk write: off the event loop)
+        analysis_hash = content_hash(request.text)
+        if analysis_store is not None:
+            await asyncio.to_thread(
+                analysis_store.put, analysis_hash,
+                {"text": request.text, "model": model_name, "entities": entities_json},
+            )
 
         # Generate highlighted HTML
         logger.info("Generating highlighted HTML...")
-        highlighted_html = highlight_entities_in_html(request.text, entities)
-
-        # Save HTML to output folder
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-
-        html_file = os.path.join(output_dir, "ner_results.html")
-        with open(html_file, "w", encoding="utf-8") as f:
-            f.write(highlighted_html)
-        logger.info(f"Saved NER results to {html_file}")
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "entities": entities_json,
-                "highlighted_html": highlighted_html,
-                "saved_file": html_file
-            }
-        )
+        highlighted_html = highlight_entities_in_html(request.text, entities_json)
+
+        # Save HTML as a per-request artifact (written in the background)
+        artifact_id = artifact_store.save({RESULTS_FILE: highlighted_html})
+        html_file = artifact_store.paths(artifact_id, [RESULTS_FILE])[RESULTS_FILE]
+        logger.info(f"Queued NER results artifact {artifact_id}")
+
+        content = {
+            "success": True,
+            "artifact_id": artifact_id,
+            "saved_file": html_file,
+            "mode": mode,
+            "model": model_name,
+            "content_hash": analysis_hash,
+            "incremental": incremental
+        }
+        if request.output in ("mentions", "both"):
+            content["entities"] = entities_json
+            content["highlighted_html"] = highlighted_html
+        if request.output in ("index", "both"):
+            content["entity_index"] = build_entity_index(entities_json)
+        return JSONResponse(status_code=200, content=content)
 
     except Exception as e:
         logger.error(f"Error during NER: {str(e)}", exc_info=True)
@@ -274,15 +489,26 @@ async def get_visualization():
     Returns:
         HTML visualization of the last NER result
     """
-    html_file = os.path.join("output", "ner_results.html")
-
-    if not os.path.exists(html_file):
+    if artifact_store.latest_id is None:
         raise HTTPException(
             status_code=404,
             detail="No visualization found. Run NER first."
         )
+    return await get_artifact_visualization(artifact_store.latest_id)
 
-    with open(html_file, "r", encoding="utf-8") as f:
-        html_content = f.read()
 
-    return HTMLResponse(content=html_content)
+@app.get("/visualization/{artifact_id}")
+async def get_artifact_visualization(artifact_id: str):
+    """
+    Get the HTML visualization saved for one NER result
+
+    Args:
+        artifact_id: "artifact_id" from a /recognize response
+    """
+    html_content = await asyncio.to_thread(artifact_store.read, artifact_id, RESULTS_FILE)
+    if html_content is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No visualization found for artifact '{artifact_id}'. It may have expired."
+        )
+    return HTMLResponse(content=html_content.decode("utf-8"))
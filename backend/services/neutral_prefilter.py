@@ -0,0 +1,217 @@
+"""
+Neutral pre-filter: a hashed n-gram logistic model that skips FinBERT for
+sentences it is confident are neutral.
+
+Most filing sentences are neutral and never highlighted. The pre-filter
+predicts P(FinBERT says neutral) from hashed word unigrams and bigrams. It
+is trained offline on FinBERT's own labels, taken from the batch runner's
+JSONL output (``backend/services/sentiment_analysis.py``). Sentences above
+the skip threshold are labelled neutral without running FinBERT.
+
+Thresholds are set by recall. A share of held-out training rows is kept
+aside, and the model file stores the predicted P(neutral) of its
+non-neutral sentences. ``threshold(recall)`` is the quantile that keeps at
+least that fraction of non-neutral sentences going to FinBERT. For example,
+recall 0.99 means at most 1% of would-be positive/negative sentences are
+skipped.
+
+Examples:
+    python -m backend.services.sentiment_analysis "filings/**/*.txt" --output output/finbert.jsonl
+    python -m backend.services.neutral_prefilter output/finbert.jsonl --output prefilter.npz
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_OUTPUT = "models/neutral_prefilter.npz"
+
+# Hashed feature space (2^18 float32 weights = 1 MB)
+NUM_FEATURES = 1 << 18
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|\d+(?:[.,]\d+)*|[%$€£]")
+_NUMBER_PATTERN = re.compile(r"\d")
+
+
+def _tokens(sentence: str) -> List[str]:
+    # Numbers collapse to one token: their value says little about polarity
+    return [
+        "0" if _NUMBER_PATTERN.match(t) else t for t in _TOKEN_PATTERN.findall(sentence.lower())
+    ]
+
+
+def featurize(sentence: str, num_features: int = NUM_FEATURES) -> np.ndarray:
+    """Sorted unique hashed unigram/bigram ids of a sentence."""
+    tokens = _tokens(sentence)
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return np.unique(np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) % num_features for gram in grams),
+        dtype=np.int64, count=len(grams),
+    ))
+
+
+def read_scored_rows(paths: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+    """Sentences and FinBERT neutral labels from sentiment batch JSONL output."""
+    sentences, neutral = [], []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    sentences.append(row["sentence"])
+                    neutral.append(row["class"] == "neutral")
+    return sentences, np.asarray(neutral, dtype=bool)
+
+
+class NeutralPrefilter:
+    """Logistic model over hashed n-grams predicting P(neutral)."""
+
+    def __init__(
+        self, weights: np.ndarray, bias: float, calibration: np.ndarray,
+        meta: Optional[Dict] = None,
+    ):
+        """
+        Args:
+            weights: Per-feature weights (NUM_FEATURES,)
+            bias: Intercept
+            calibration: Sorted P(neutral) of held-out non-neutral sentences
+            meta: Training report
+        """
+        self.weights = weights
+        self.bias = bias
+        self.calibration = np.sort(calibration)
+        self.meta = meta or {}
+
+    def _logits(self, features: Sequence[np.ndarray]) -> np.ndarray:
+        lengths = np.fromiter((len(f) for f in features), dtype=np.int64, count=len(features))
+        ids = np.concatenate(features) if len(features) else np.zeros(0, dtype=np.int64)
+        # Sum each sentence's weights in one pass; empty sentences get just the bias
+        sums = np.zeros(len(features), dtype=np.float64)
+        nonempty = lengths > 0
+        if ids.size:
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[nonempty]
+            sums[nonempty] = np.add.reduceat(self.weights[ids], offsets)
+        return sums / np.sqrt(np.maximum(lengths, 1)) + self.bias
+
+    def predict(self, sentences: Sequence[str]) -> np.ndarray:
+        """P(neutral) per sentence."""
+        num_features = len(self.weights)
+        return 1.0 / (1.0 + np.exp(-self._logits([featurize(s, num_features) for s in sentences])))
+
+    def threshold(self, recall: float) -> float:
+        """
+        Skip threshold keeping at least ``recall`` of non-neutral sentences.
+
+        Sentences are skipped when P(neutral) > threshold.
+        """
+        if not len(self.calibration):
+            return 1.0
+        return float(np.quantile(self.calibration, recall, method="higher"))
+
+    @classmethod
+    def train(
+        cls, sentences: Sequence[str], neutral: np.ndarray, epochs: int = 5,
+        learning_rate: float = 0.5, l2: float = 1e-6, holdout: float = 0.2, seed: int = 0,
+        num_features: int = NUM_FEATURES,
+    ) -> "NeutralPrefilter":
+        """Fit with AdaGrad SGD on log loss; a held-out share calibrates the thresholds."""
+        rng = random.Random(seed)
+        order = list(range(len(sentences)))
+        rng.shuffle(order)
+        held_out = int(len(order) * holdout)
+        calibration_idx, train_idx = order[:held_out], order[held_out:]
+
+        started = time.perf_counter()
+        features = [featurize(s, num_features) for s in sentences]
+        weights = np.zeros(num_features, dtype=np.float32)
+        squared = np.full(num_features, 1e-6, dtype=np.float32)
+        bias, bias_squared = 0.0, 1e-6
+        for _ in range(epochs):
+            rng.shuffle(train_idx)
+            for i in train_idx:
+                ids = features[i]
+                scale = 1.0 / np.sqrt(max(len(ids), 1))
+                logit = float(weights[ids].sum()) * scale + bias
+                error = 1.0 / (1.0 + np.exp(-logit)) - float(neutral[i])
+                grad = error * scale + l2 * weights[ids]
+                squared[ids] += grad * grad
+                weights[ids] -= learning_rate * grad / np.sqrt(squared[ids])
+                bias_squared += error * error
+                bias -= learning_rate * error / np.sqrt(bias_squared)
+
+        model = cls(weights, bias, np.zeros(0))
+        if calibration_idx:
+            probs = 1.0 / (1.0 + np.exp(-model._logits([features[i] for i in calibration_idx])))
+            labels = neutral[calibration_idx]
+            model.calibration = np.sort(probs[~labels]).astype(np.float32)
+        model.meta = {
+            "train_sentences": len(train_idx),
+            "calibration_sentences": len(calibration_idx),
+            "neutral_fraction": round(float(neutral.mean()), 4) if len(neutral) else 0.0,
+            "epochs": epochs,
+            "train_seconds": round(time.perf_counter() - started, 2),
+        }
+        return model
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=np.float64(self.bias),
+                            calibration=self.calibration, meta=np.array(json.dumps(self.meta)))
+
+    @classmethod
+    def load(cls, path: str) -> "NeutralPrefilter":
+        with np.load(path) as data:
+            return cls(
+                data["weights"], float(data["bias"]), data["calibration"],
+                json.loads(str(data["meta"])),
+            )
+
+    def stats(self) -> Dict:
+        return {**self.meta, "calibration_non_neutral": int(len(self.calibration))}
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Train the neutral pre-filter on FinBERT-labelled sentences"
+    )
+    parser.add_argument("inputs", nargs="+",
+                        help="JSONL output of backend.services.sentiment_analysis")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="Model file (default: %(default)s)")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="Share kept for threshold calibration")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    from pathlib import Path
+
+    args = parse_args(argv)
+    sentences, neutral = read_scored_rows(args.inputs)
+    if not sentences:
+        raise SystemExit("No scored sentences found in the inputs")
+    print(f"Training on {len(sentences)} sentences ({neutral.mean():.1%} neutral)...")
+    model = NeutralPrefilter.train(
+        sentences, neutral, epochs=args.epochs, learning_rate=args.learning_rate,
+        holdout=args.holdout, seed=args.seed,
+    )
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.output)
+
+    print(f"Model saved to: {args.output} ({model.meta['train_seconds']}s)")
+    for recall in (0.95, 0.98, 0.99, 0.995):
+        print(f"Recall {recall}: skip when P(neutral) > {model.threshold(recall):.4f}")
+    print(f"Serve it with SENTIMENT_PREFILTER_MODEL={args.output}; "
+          f"evaluate with scripts/evaluate_neutral_prefilter.py")
+
+
+if __name__ == "__main__":
+    main()
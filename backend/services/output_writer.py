@@ -0,0 +1,114 @@
+"""
+Background writer for converter output files.
+
+Each set of files saved together is named ``<stem>_<content hash><suffix>``,
+with one hash over the whole set. Uploads with the same name never clobber
+each other, identical content is written once, and files produced from one
+document share a prefix (e.g. ``x_<hash>_sentiment.json`` and
+``x_<hash>_sentiment.html``). Writes
+go through a bounded ``BackgroundWriter`` queue. A full queue applies
+backpressure to the producer (off the event loop) instead of growing without
+limit. Files can optionally be gzip-compressed.
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+from backend.services.atomic_files import BackgroundWriter, atomic_write
+
+logger = logging.getLogger(__name__)
+
+Content = Union[str, bytes]
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def safe_stem(filename: str) -> str:
+    """Filesystem-safe stem of an uploaded file name."""
+    stem = _UNSAFE_CHARS.sub("_", Path(filename or "document").stem).strip("._")
+    return stem[:80] or "document"
+
+
+class OutputWriter:
+    """Bounded-queue background writer with content-hash file names."""
+
+    def __init__(self, output_dir: str, queue_size: int = 64):
+        self.output_dir = Path(output_dir)
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self._writer = BackgroundWriter("output-writer", queue_size)
+
+    def plan(
+        self, stem: str, files: Dict[str, Tuple[str, Content]], compress: bool = False
+    ) -> Tuple[Dict[str, str], list]:
+        """
+        Work out file names without touching the disk.
+
+        Args:
+            stem: Base name (see ``safe_stem``)
+            files: {key: (suffix, content)}, e.g. {"text": (".txt", text)}
+            compress: gzip each file and add ".gz"
+
+        Returns:
+            ({key: path}, [(path, bytes, compress), ...] to hand to the writer)
+        """
+        encoded = {
+            key: (suffix, content.encode("utf-8") if isinstance(content, str) else content)
+            for key, (suffix, content) in files.items()
+        }
+        digest = hashlib.sha256()
+        for key in sorted(encoded):
+            suffix, data = encoded[key]
+            digest.update(suffix.encode("utf-8") + b"\0" + data + b"\0")
+        prefix = f"{stem}_{digest.hexdigest()[:12]}"
+
+        paths = {}
+        jobs = []
+        for key, (suffix, data) in encoded.items():
+            path = self.output_dir / f"{prefix}{suffix}{'.gz' if compress else ''}"
+            paths[key] = str(path)
+            jobs.append((path, data, compress))
+        return paths, jobs
+
+    async def submit(
+        self, stem: str, files: Dict[str, Tuple[str, Content]], compress: bool = False
+    ) -> Dict[str, str]:
+        """Queue files for writing and return their future paths."""
+        paths, jobs = self.plan(stem, files, compress)
+        for job in jobs:
+            await self._writer.submit_async(self._write, *job)
+        return paths
+
+    def _write(self, path: Path, data: bytes, compress: bool):
+        if path.exists():
+            # Content-hash name: an existing file already has this content
+            self.skipped += 1
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = gzip.compress(data, compresslevel=6) if compress else data
+            atomic_write(path, payload)
+            self.written += 1
+            self.bytes_written += len(payload)
+        except OSError as e:
+            self.failed += 1
+            logger.error(f"Could not write output file {path}: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._writer.pending(),
+            "written": self.written,
+            "skipped_existing": self.skipped,
+            "failed": self.failed,
+            "bytes_written": self.bytes_written,
+        }
+
+    def close(self):
+        """Write everything still queued, then stop the thread."""
+        self._writer.close()
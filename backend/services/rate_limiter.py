@@ -0,0 +1,195 @@
+"""
+Client-side rate limiting for LLM provider calls.
+
+Each model id gets a ``ModelLimiter`` with two token buckets: requests per
+minute and (estimated) tokens per minute. Callers ``await acquire(...)``
+before every provider call. Waiters are served in priority order, so
+interactive requests jump ahead of batch ones, and FIFO within a priority.
+Unlimited models admit every caller at once; priority then comes from the
+extraction executor, which hands out free workers in the same order.
+When the provider still answers with a throttle error, ``backoff`` pauses
+the whole model for a jittered, exponentially growing delay. Queue wait
+times and throttle counts are kept for /health.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Dict, Optional
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# Substrings of provider errors that mean "slow down" rather than "failed"
+THROTTLE_MARKERS = (
+    "429", "resource_exhausted", "resource exhausted", "rate limit", "quota", "too many requests",
+)
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """True if a provider exception is a rate-limit / quota response."""
+    for attr in ("status_code", "code", "status"):
+        if getattr(error, attr, None) == 429:
+            return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough LLM token estimate (~4 characters per token)."""
+    return max(1, sum(len(text) for text in texts) // 4)
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``rate_per_minute``; a rate of 0 means unlimited."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # Requests bigger than the bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.rate:
+            self.level -= min(amount, self.capacity)
+
+
+class ModelLimiter:
+    """Priority-ordered RPM/TPM limiter for one model id."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 request_burst: Optional[float] = None, token_burst: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute, request_burst)
+        self.tokens = TokenBucket(tokens_per_minute, token_burst)
+        self.paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._changed: Optional[asyncio.Condition] = None
+        # Metrics
+        self.granted = 0
+        self.throttled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    async def acquire(self, tokens: int, priority: int = PRIORITIES["interactive"]) -> float:
+        """
+        Wait for a request slot and ``tokens`` of token budget.
+
+        Returns:
+            Seconds spent waiting
+        """
+        changed = self._condition()
+        entry = (priority, next(self._sequence))
+        heapq.heappush(self._waiters, entry)
+        started = time.monotonic()
+        try:
+            async with changed:
+                while True:
+                    now = time.monotonic()
+                    delay = None
+                    if self._waiters[0] == entry:
+                        delay = max(
+                            self.paused_until - now,
+                            self.requests.delay_for(1, now),
+                            self.tokens.delay_for(tokens, now),
+                        )
+                        if delay <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            break
+                    try:
+                        # Woken early when the queue head changes or a pause is set
+                        await asyncio.wait_for(changed.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            async with changed:
+                changed.notify_all()
+
+        waited = time.monotonic() - started
+        self.granted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return waited
+
+    async def backoff(self, attempt: int, base_delay: float, max_delay: float) -> float:
+        """
+        Pause every caller of this model after a throttle response.
+
+        Uses "full jitter" exponential backoff: a random delay up to
+        ``base_delay * 2**attempt`` (capped at ``max_delay``).
+
+        Returns:
+            The pause in seconds
+        """
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        changed = self._condition()
+        async with changed:
+            changed.notify_all()
+        return delay
+
+    def stats(self) -> Dict:
+        return {
+            "queued": len(self._waiters),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "avg_queue_wait_seconds": self._wait_total / self.granted if self.granted else 0.0,
+            "max_queue_wait_seconds": self._wait_max,
+            "paused_for_seconds": max(0.0, self.paused_until - time.monotonic()),
+        }
+
+
+class RateLimitScheduler:
+    """Per-model limiters, created on first use from configured or default limits."""
+
+    def __init__(
+        self, default_rpm: float, default_tpm: float,
+        model_limits: Optional[Dict[str, tuple]] = None,
+    ):
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.model_limits = model_limits or {}
+        self.limiters: Dict[str, ModelLimiter] = {}
+
+    @staticmethod
+    def parse_limits(spec: str) -> Dict[str, tuple]:
+        """Parse "model=rpm:tpm,other-model=rpm:tpm" into {model: (rpm, tpm)}."""
+        limits = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            model_id, _, values = item.partition("=")
+            rpm, _, tpm = values.partition(":")
+            limits[model_id.strip()] = (float(rpm or 0), float(tpm or 0))
+        return limits
+
+    def limiter(self, model_id: str) -> ModelLimiter:
+        if model_id not in self.limiters:
+            rpm, tpm = self.model_limits.get(model_id, (self.default_rpm, self.default_tpm))
+            self.limiters[model_id] = ModelLimiter(rpm, tpm)
+        return self.limiters[model_id]
+
+    def stats(self) -> Dict:
+        return {model_id: limiter.stats() for model_id, limiter in self.limiters.items()}
@@ -0,0 +1,151 @@
+"""
+Sentence segmentation for financial documents.
+
+Shared by the sentiment service and the offline sentiment script. Boundaries
+are found in a single ``finditer`` pass, so offsets come straight from the
+match positions (no ``text.find`` re-scan) and the cost stays linear in the
+text length.
+
+Handled specially:
+    - abbreviations common in filings ("Inc.", "U.S.", "No.", "approx.")
+    - decimals and amounts ("$3.5 bn", "1.2x") - a period only ends a
+      sentence when followed by whitespace
+    - markdown structure: blank lines, headings, bullets and table rows each
+      start a new segment; bullet/heading markers are excluded from the span
+      and table separator rows are dropped
+"""
+
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+# Lowercased tokens (without their final period) that do not end a sentence
+FINANCIAL_ABBREVIATIONS = frozenset({
+    # Corporate forms
+    "inc", "corp", "co", "ltd", "llc", "plc", "l.p", "n.v", "s.a", "ag", "bros", "hldgs",
+    # Places
+    "u.s", "u.k", "u.s.a", "e.u", "n.y",
+    # Titles
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st",
+    # Filing and numeric shorthand
+    "no", "nos", "vs", "v", "approx", "est", "fig", "ref", "sec", "art", "para",
+    "e.g", "i.e", "cf", "al", "pp", "vol", "avg",
+    # Months
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+# One pass over the text finds every candidate boundary:
+#   para    - one or more blank lines
+#   line    - line break before a markdown table row, heading or bullet
+#   newline - any other line break (a boundary only after a table row)
+#   punct   - sentence punctuation, optional closing quotes/brackets, whitespace
+# Line alternatives start at the "\n" itself, never at the spaces before it:
+# a pattern that starts with [ \t]* is retried at every position of a long
+# run of spaces, which makes the scan quadratic. Trailing spaces are trimmed
+# from each segment afterwards.
+_BOUNDARY_PATTERN = re.compile(
+    r"""
+      (?P<para>\n(?:[ \t]*\n)+)
+    | (?P<line>\n(?=[ \t]*(?:\||\#{1,6}[ \t]|[-*+•][ \t]|\d{1,3}[.)][ \t])))
+    | (?P<newline>\n)
+    | (?P<punct>[.!?]+)[\"'”’)\]]*(?P<space>\s+)
+    """,
+    re.VERBOSE,
+)
+
+# Leading whitespace plus an optional bullet, numbered-list or heading marker
+_LEADING_PATTERN = re.compile(r"\s*(?:(?:[-*+•]|\d{1,3}[.)]|\#{1,6})[ \t]+)?\s*")
+
+_ALNUM_PATTERN = re.compile(r"\w")
+
+# How far back to look for the token before a period (keeps the pass linear)
+_TOKEN_LOOKBACK = 24
+
+
+def _is_abbreviation(text: str, period_pos: int) -> bool:
+    """Check whether the period at ``period_pos`` closes an abbreviation, initial or list marker."""
+    window = text[max(0, period_pos - _TOKEN_LOOKBACK):period_pos]
+    parts = window.rsplit(None, 1)
+    if not parts:
+        return False
+    raw_token = parts[-1]
+    token = raw_token.lstrip("(\"'“‘[").lower()
+    if not token:
+        return False
+    # Numbered list markers ("1. First item") at the start of a line
+    token_start = period_pos - len(raw_token)
+    if token.isdigit() and (token_start == 0 or text[token_start - 1] == "\n"):
+        return True
+    # Single-letter initials such as "J. P. Morgan"
+    if len(token) == 1 and token.isalpha():
+        return True
+    return token in FINANCIAL_ABBREVIATIONS
+
+
+def _ends_table_row(text: str, newline_pos: int) -> bool:
+    """Check whether the line ending at ``newline_pos`` ends with "|" (ignoring trailing spaces)."""
+    pos = newline_pos - 1
+    while pos >= 0 and text[pos] in " \t":
+        pos -= 1
+    return pos >= 0 and text[pos] == "|"
+
+
+def _is_soft_boundary(text: str, match: "re.Match[str]") -> bool:
+    """Decide whether a punctuation candidate really ends a sentence."""
+    space = match.group("space")
+    # Paragraph breaks always end a sentence
+    if space.count("\n") >= 2:
+        return True
+
+    next_pos = match.end()
+    if next_pos < len(text) and text[next_pos].islower():
+        # "approx. three", "Apple Inc. reported" - sentences rarely start lowercase
+        return False
+
+    punct = match.group("punct")
+    if punct == "." and _is_abbreviation(text, match.start("punct")):
+        return False
+    return True
+
+
+def segment_sentences(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split text into sentences.
+
+    Args:
+        text: Plain text or markdown
+
+    Returns:
+        Tuple of (starts, ends) int64 arrays with the character offsets of each
+        sentence in ``text``; ``text[starts[i]:ends[i]]`` is the i-th sentence
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+
+    def add_segment(start: int, end: int):
+        start = _LEADING_PATTERN.match(text, start, end).end()
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        # Drop empty segments and markdown table separators like |---|---|
+        if end > start and _ALNUM_PATTERN.search(text, start, end):
+            starts.append(start)
+            ends.append(end)
+
+    segment_start = 0
+    for match in _BOUNDARY_PATTERN.finditer(text):
+        if match.group("punct") is not None:
+            if not _is_soft_boundary(text, match):
+                continue
+            boundary = match.start("space")
+        elif match.group("newline") is not None:
+            if not _ends_table_row(text, match.start()):
+                continue
+            boundary = match.start()
+        else:
+            boundary = match.start()
+        add_segment(segment_start, boundary)
+        segment_start = match.end()
+    add_segment(segment_start, len(text))
+
+    return np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
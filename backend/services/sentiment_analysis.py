@@ -1,96 +1,342 @@
-import os
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+"""
+Offline FinBERT sentiment batch runner.
+
+Scores every sentence of a corpus of text/markdown files (directories, globs
+or single files). Files are spread over a pool of worker processes. Each
+worker loads the model once and scores sentences in length-sorted batches.
+Results stream to a JSONL file or a directory of Parquet part files, one row
+per sentence. A checkpoint file lists finished files, so an interrupted run
+can be resumed with the same command; JSONL rows written after the last
+checkpointed file (a crash between the two writes) are dropped on resume and
+their file is analyzed again.
+
+Examples:
+    python -m backend.services.sentiment_analysis "filings/**/*.txt" --workers 8
+    python -m backend.services.sentiment_analysis filings/ --output output/filings.parquet
+"""
+
+import argparse
+import glob
 import json
-import re
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
 
-def split_into_sentences(text):
-    """Split text into sentences and return with character positions."""
-    sentences_with_positions = []
-    current_pos = 0
+from backend.services.atomic_files import atomic_write
+from backend.services.sentence_segmenter import segment_sentences
 
-    # Split sentences using regex
-    sentence_pattern = r'(?<=[.!?])\s+'
-    sentences = re.split(sentence_pattern, text)
+MODEL_NAME = "ProsusAI/finbert"
 
-    for sentence in sentences:
-        if sentence.strip():
-            # Find the actual position in original text
-            start_pos = text.find(sentence, current_pos)
-            end_pos = start_pos + len(sentence)
+# FinBERT labels: positive, negative, neutral
+LABELS = ['positive', 'negative', 'neutral']
 
-            sentences_with_positions.append({
-                'text': sentence,
-                'start': start_pos,
-                'end': end_pos
-            })
+TEXT_EXTENSIONS = {'.txt', '.md', '.markdown'}
 
-            current_pos = end_pos
+DEFAULT_INPUT = "output/company_paragraphs_sample.txt"
+DEFAULT_OUTPUT = "output/sentiment_analysis_results.jsonl"
+
+# Loaded once per worker process by init_worker
+tokenizer = None
+model = None
+batch_size = 32
 
-    return sentences_with_positions
 
 def analyze_sentiment(text, tokenizer, model):
-    """Analyze sentiment using FinBERT model."""
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512, padding=True)
+    """Analyze sentiment of one text using FinBERT model."""
+    scores = score_batch([text], tokenizer, model)[0].tolist()
+    return LABELS[scores.index(max(scores))], scores
+
+
+def score_batch(texts: List[str], tokenizer, model) -> np.ndarray:
+    """Return softmax scores (len(texts), 3) for one batch."""
+    import torch
 
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, max_length=512, padding=True)
     with torch.no_grad():
         outputs = model(**inputs)
+    return torch.nn.functional.softmax(outputs.logits, dim=-1).numpy()
+
+
+def score_sentences(sentences: List[str], tokenizer, model, size: int) -> np.ndarray:
+    """
+    Score sentences in batches of ``size``.
+
+    Sentences are batched in length order, so each batch pads to similar
+    lengths; scores come back in the original order.
+    """
+    scores = np.zeros((len(sentences), len(LABELS)), dtype=np.float32)
+    order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+    for batch_start in range(0, len(order), size):
+        batch = order[batch_start:batch_start + size]
+        scores[batch] = score_batch([sentences[i] for i in batch], tokenizer, model)
+    return scores
+
+
+def collect_files(inputs: Iterable[str]) -> List[str]:
+    """Expand directories (recursively) and glob patterns into a sorted list of text files."""
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = (str(p) for p in Path(item).rglob("*"))
+        elif glob.has_magic(item):
+            matches = glob.iglob(item, recursive=True)
+        else:
+            matches = [item]
+        for path in matches:
+            if Path(path).suffix.lower() in TEXT_EXTENSIONS and os.path.isfile(path):
+                files.add(os.path.abspath(path))
+    return sorted(files)
+
+
+def init_worker(model_name: str, size: int, stub: bool):
+    """Load the model once per worker process (one intra-op thread per process)."""
+    global tokenizer, model, batch_size
+    import torch
+
+    torch.set_num_threads(1)
+    batch_size = size
+    if stub:
+        from backend.services.stub_models import StubSentimentModel, StubSentimentTokenizer
+        tokenizer, model = StubSentimentTokenizer(), StubSentimentModel()
+        return
+    from backend.services.fast_sentiment import load_classifier
+    tokenizer, model = load_classifier(model_name)
+
+
+def analyze_file(path: str) -> Dict:
+    """Worker task: score every sentence of one file."""
+    started = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {"file": path, "rows": [], "seconds": 0.0, "error": str(e)}
+
+    starts, ends = segment_sentences(text)
+    sentences = [text[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+    if sentences:
+        scores = score_sentences(sentences, tokenizer, model, batch_size)
+    else:
+        scores = np.zeros((0, 3))
+    classes = scores.argmax(axis=1) if len(sentences) else []
+
+    rows = [
+        {
+            "file": path,
+            "sentence_index": i,
+            "start": int(starts[i]),
+            "end": int(ends[i]),
+            "sentence": sentences[i],
+            "class": LABELS[classes[i]],
+            "positive": float(scores[i, 0]),
+            "negative": float(scores[i, 1]),
+            "neutral": float(scores[i, 2]),
+        }
+        for i in range(len(sentences))
+    ]
+    return {"file": path, "rows": rows, "seconds": time.perf_counter() - started, "error": None}
+
+
+class JsonlSink:
+    """
+    Appends rows to a JSONL file; every finished file is durable immediately.
+
+    Rows are written before their file is checkpointed, so after a crash the
+    file can end with rows (possibly a cut-off line) of a file the checkpoint
+    does not list. Opening the sink truncates those, so the re-analyzed file
+    is not written twice.
+    """
+
+    def __init__(self, path: str, done: Set[str] = frozenset()):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(path):
+            self._drop_unconfirmed(path, done)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _drop_unconfirmed(path: str, done: Set[str]):
+        # Files are written and checkpointed in the same order, so unconfirmed
+        # rows are always a suffix: keep everything up to the last confirmed row
+        keep = offset = dropped = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                offset += len(line)
+                try:
+                    confirmed = line.endswith(b"\n") and json.loads(line)["file"] in done
+                except (ValueError, KeyError, TypeError):
+                    confirmed = False
+                if confirmed:
+                    keep, dropped = offset, 0
+                else:
+                    dropped += 1
+        if keep < offset:
+            print(f"Dropping {dropped} unconfirmed rows from {path}", file=sys.stderr)
+            with open(path, 'r+b') as f:
+                f.truncate(keep)
+
+    def write(self, rows: List[Dict]) -> bool:
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.file.flush()
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    Writes rows to ``<path>/part-<run>-<n>.parquet``, rolling to a new part every
+    ``files_per_part`` files. A Parquet file is only readable once closed, so
+    ``write`` returns True (safe to checkpoint) only when a part is closed.
+    """
+
+    def __init__(self, path: str, files_per_part: int):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install 'finsight[parquet]'")
+        self.directory = Path(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.files_per_part = files_per_part
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.part = 0
+        self.rows: List[Dict] = []
+        self.files = 0
+
+    def write(self, rows: List[Dict]) -> bool:
+        self.rows.extend(rows)
+        self.files += 1
+        if self.files >= self.files_per_part:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.files:
+            path = self.directory / f"part-{self.run_id}-{self.part:05d}.parquet"
+            # Serialized in memory, then renamed into place: a crash never leaves a
+            # truncated part for readers (the resumed run rewrites its rows)
+            buffer = pa.BufferOutputStream()
+            pq.write_table(pa.Table.from_pylist(self.rows), buffer)
+            atomic_write(path, buffer.getvalue().to_pybytes())
+            self.part += 1
+        self.rows, self.files = [], 0
+
+    def close(self):
+        self.flush()
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Finished files; a last line cut off by a crash is truncated away."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r+b') as f:
+        data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            f.truncate(len(complete))
+    return {line for line in complete.decode('utf-8').split("\n") if line.strip()}
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Score sentence sentiment for a corpus of text/markdown files"
+    )
+    parser.add_argument("inputs", nargs="*", default=[DEFAULT_INPUT],
+                        help="Files, directories or glob patterns")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="Output .jsonl file, or a .parquet directory of part files "
+                             "(default: %(default)s)")
+    parser.add_argument("--checkpoint",
+                        help="Finished-files list for resuming (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Sentences per inference batch (default: 32)")
+    parser.add_argument("--files-per-part", type=int, default=200,
+                        help="Files per Parquet part (default: 200)")
+    parser.add_argument("--model", default=MODEL_NAME,
+                        help="Hugging Face model name, local path or <model>#layers=N")
+    parser.add_argument("--stub", action="store_true",
+                        default=os.getenv("FINSIGHT_STUB_MODELS", "0") == "1",
+                        help="Use the offline stub model (also FINSIGHT_STUB_MODELS=1)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    checkpoint_path = args.checkpoint or args.output.rstrip("/\\") + ".checkpoint"
+
+    files = collect_files(args.inputs)
+    done = load_checkpoint(checkpoint_path)
+    pending = [path for path in files if path not in done]
+    print(f"Found {len(files)} files, {len(files) - len(pending)} already done, "
+          f"{len(pending)} to analyze")
+    if not pending:
+        return
+
+    parquet = args.output.endswith(".parquet")
+    if parquet:
+        sink = ParquetSink(args.output, args.files_per_part)
+    else:
+        sink = JsonlSink(args.output, done)
+    checkpoint = open(checkpoint_path, 'a', encoding='utf-8')
+    unconfirmed: List[str] = []  # Written to a Parquet part that is not closed yet
+
+    workers = max(1, min(args.workers, len(pending)))
+    sentences = 0
+    worker_seconds = 0.0
+    failed = 0
+    started = time.perf_counter()
+    pool = multiprocessing.Pool(
+        workers, initializer=init_worker, initargs=(args.model, args.batch_size, args.stub)
+    )
+    try:
+        for finished, result in enumerate(pool.imap_unordered(analyze_file, pending), start=1):
+            if result["error"]:
+                failed += 1
+                print(f"Skipping {result['file']}: {result['error']}", file=sys.stderr)
+                continue
+            sentences += len(result["rows"])
+            worker_seconds += result["seconds"]
+            unconfirmed.append(result["file"])
+            if sink.write(result["rows"]):
+                checkpoint.write("".join(f"{path}\n" for path in unconfirmed))
+                checkpoint.flush()
+                unconfirmed = []
+            if finished % 100 == 0 or finished == len(pending):
+                elapsed = time.perf_counter() - started
+                print(f"{finished}/{len(pending)} files, {sentences} sentences, "
+                      f"{sentences / elapsed:.1f} sentences/sec")
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        sink.close()
+        # The last Parquet part is closed now, so its files are done too
+        checkpoint.write("".join(f"{path}\n" for path in unconfirmed))
+        checkpoint.close()
+
+    elapsed = time.perf_counter() - started
+    print("\nSentiment analysis completed!")
+    print(f"Results saved to: {args.output}")
+    print(f"Files analyzed: {len(pending) - failed} ({failed} failed)")
+    print(f"Total sentences analyzed: {sentences}")
+    print(f"Wall time: {elapsed:.1f}s with {workers} workers")
+    per_core_second = sentences / worker_seconds if worker_seconds else 0.0
+    print(f"Throughput: {sentences / elapsed:.1f} sentences/sec, "
+          f"{sentences / elapsed / workers:.1f} sentences/sec per core "
+          f"({per_core_second:.1f} per core-second of inference)")
 
-    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-    sentiment_score = predictions[0].tolist()
-
-    # FinBERT labels: positive, negative, neutral
-    labels = ['positive', 'negative', 'neutral']
-    sentiment_class = labels[sentiment_score.index(max(sentiment_score))]
-
-    return sentiment_class, sentiment_score
-
-def main():
-    # Load FinBERT model and tokenizer
-    print("Loading FinBERT model...")
-    model_name = "ProsusAI/finbert"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSequenceClassification.from_pretrained(model_name)
-
-    # Read input file
-    input_file = "output/company_paragraphs_sample.txt"
-    print(f"Reading file: {input_file}")
-
-    with open(input_file, 'r', encoding='utf-8') as f:
-        text = f.read()
-
-    # Split into sentences
-    sentences = split_into_sentences(text)
-    print(f"Found {len(sentences)} sentences")
-
-    # Analyze sentiment for each sentence
-    results = []
-    for idx, sentence_data in enumerate(sentences, start=1):
-        print(f"Processing sentence {idx}/{len(sentences)}")
-        sentiment_class, scores = analyze_sentiment(sentence_data['text'], tokenizer, model)
-
-        results.append({
-            "sentence": sentence_data['text'],
-            "class": sentiment_class,
-            "position": {
-                "start": sentence_data['start'],
-                "end": sentence_data['end']
-            },
-            "confidence_scores": {
-                "positive": scores[0],
-                "negative": scores[1],
-                "neutral": scores[2]
-            }
-        })
-
-    # Save results
-    output_file = "output/sentiment_analysis_results.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-
-    print(f"\nSentiment analysis completed!")
-    print(f"Results saved to: {output_file}")
-    print(f"Total sentences analyzed: {len(results)}")
 
 if __name__ == "__main__":
     main()
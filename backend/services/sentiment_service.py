@@ -1,17 +1,28 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List, Dict
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Literal, NamedTuple
 import torch
-import re
+import numpy as np
+import os
+import asyncio
 import logging
 import sys
 import warnings
 from bs4 import BeautifulSoup
 from pathlib import Path
 
+from backend.services.fast_sentiment import cascade_scores, load_classifier
+from backend.services.highlight_sentiment import apply_highlights, get_highlight_color
+from backend.services.incremental_analysis import (
+    content_hash, incremental_report, match_segments, open_store,
+)
+from backend.services.model_registry import ModelRegistry, model_router, parse_model_specs
+from backend.services.neutral_prefilter import NeutralPrefilter
+from backend.services.sentence_segmenter import segment_sentences
+from backend.services.streaming import MEDIA_TYPES, STREAM_HEADERS, StreamProtocol, encode_event
+
 # Suppress warnings from external libraries
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", message=".*resume_download.*")
@@ -45,14 +56,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global model and tokenizer (loaded once at startup)
-model = None
-tokenizer = None
+# Use deterministic offline stub models instead of FinBERT (load testing / CI)
+STUB_MODELS = os.getenv("FINSIGHT_STUB_MODELS", "0") == "1"
+
+# Named models ("name=hf-id-or-path,..."), loaded on first use and selectable
+# per request with "model". Each must use FinBERT's label order (LABELS).
+DEFAULT_MODEL_NAME = os.getenv("SENTIMENT_DEFAULT_MODEL", "finbert")
+SENTIMENT_MODELS = parse_model_specs(
+    os.getenv("SENTIMENT_MODELS", ""), "finbert", "ProsusAI/finbert"
+)
+# Fast tier ("tier": "fast" or "cascade"): a local distilled model directory
+# (see backend/services/fast_sentiment.py) or "<model>#layers=N" to truncate at load
+FAST_MODEL_NAME = "fast"
+SENTIMENT_FAST_MODEL = os.getenv("SENTIMENT_FAST_MODEL", "")
+if SENTIMENT_FAST_MODEL:
+    SENTIMENT_MODELS[FAST_MODEL_NAME] = SENTIMENT_FAST_MODEL
+# Cascade: sentences whose fast top probability is below this go to the full model
+SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0.8"))
+# Neutral pre-filter (python -m backend.services.neutral_prefilter): sentences it
+# is confident are neutral skip the model. SENTIMENT_PREFILTER=1 enables it by
+# default; requests override with "prefilter". The skip threshold keeps at least
+# SENTIMENT_PREFILTER_RECALL of non-neutral sentences (per request: "prefilter_recall").
+SENTIMENT_PREFILTER_MODEL = os.getenv("SENTIMENT_PREFILTER_MODEL", "")
+SENTIMENT_PREFILTER = os.getenv("SENTIMENT_PREFILTER", "0") == "1"
+SENTIMENT_PREFILTER_RECALL = float(os.getenv("SENTIMENT_PREFILTER_RECALL", "0.99"))
+prefilter = None
+# Idle models beyond this much parameter memory are unloaded, least recently used
+# first (0 = no limit)
+SENTIMENT_MODEL_MEMORY_MB = float(os.getenv("SENTIMENT_MODEL_MEMORY_MB", "2048"))
+
+# FinBERT labels, in the order of the model's output logits (class ids 0, 1, 2)
+LABELS = ['positive', 'negative', 'neutral']
+
+# Sentences per forward pass
+BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+
+# Previous analyses by content hash, for incremental re-analysis of amended documents
+analysis_store = open_store("sentiment")
+
+
+def load_sentiment_model(source: str):
+    """Load a (tokenizer, model) pair for the registry (local directories load offline)."""
+    if STUB_MODELS:
+        from backend.services.stub_models import StubSentimentModel, StubSentimentTokenizer
+        return StubSentimentTokenizer(), StubSentimentModel()
+    return load_classifier(source)
+
+
+models = ModelRegistry(
+    SENTIMENT_MODELS, DEFAULT_MODEL_NAME, load_sentiment_model,
+    memory_budget_bytes=int(SENTIMENT_MODEL_MEMORY_MB * 1024 * 1024)
+)
+app.include_router(model_router(models))
 
 
 class SentimentRequest(BaseModel):
     text: str
     html: Optional[str] = None
+    # "records": one dict per sentence; "columnar": parallel arrays, no sentence text
+    format: Literal["records", "columnar"] = "records"
+    # "content_hash" of an earlier analysis: only sentences not in it are re-scored
+    previous_hash: Optional[str] = None
+    # Registered model name (defaults to the current default model); with
+    # "cascade" it is the model low-confidence sentences escalate to. Not
+    # allowed with "fast", which always uses the fast model
+    model: Optional[str] = None
+    # "full": score with "model"; "fast": the fast model only; "cascade": the
+    # fast model, then "model" for sentences below cascade_threshold
+    tier: Literal["full", "fast", "cascade"] = "full"
+    # Defaults to SENTIMENT_CASCADE_THRESHOLD
+    cascade_threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    # Skip sentences the neutral pre-filter is confident about (defaults to SENTIMENT_PREFILTER)
+    prefilter: Optional[bool] = None
+    # Defaults to SENTIMENT_PREFILTER_RECALL
+    prefilter_recall: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+
+class ScoringPlan(NamedTuple):
+    """Models a request is scored with"""
+    model: str
+    escalate_to: Optional[str] = None  # Cascade second stage
+    threshold: float = 0.0
+    prefilter_threshold: Optional[float] = None  # Skip sentences with P(neutral) above this
+
+    @property
+    def label(self) -> str:
+        """Reported as "model" and recorded with stored analyses"""
+        label = self.model
+        if self.escalate_to:
+            label = f"{self.model}>{self.escalate_to}@{self.threshold:g}"
+        if self.prefilter_threshold is not None:
+            label += f"+prefilter@{self.prefilter_threshold:.4g}"
+        return label
 
 
 class SentimentResult(BaseModel):
@@ -65,38 +160,70 @@ class SentimentResult(BaseModel):
         fields = {'class_': 'class'}
 
 
+class SentimentColumns(BaseModel):
+    """Columnar sentiment results: row i describes text[starts[i]:ends[i]]"""
+    labels: List[str]
+    starts: List[int]
+    ends: List[int]
+    class_ids: List[int]
+    scores: List[List[float]]
+    prefiltered: Optional[List[bool]] = None  # Labelled neutral by the pre-filter, not scored
+
+
 class SentimentResponse(BaseModel):
-    sentiment_results: List[Dict]
+    sentiment_results: Optional[List[Dict]] = None
+    sentiment_columns: Optional[SentimentColumns] = None
     highlighted_html: Optional[str] = None
+    content_hash: Optional[str] = None
+    incremental: Optional[Dict] = None
+    model: Optional[str] = None
+    cascade: Optional[Dict] = None
+    prefilter: Optional[Dict] = None
 
 
 @app.on_event("startup")
 async def load_model():
-    """Load FinBERT model on startup"""
-    global model, tokenizer
-    logger.info("Starting FinBERT model loading...")
-    model_name = "ProsusAI/finbert"
-    try:
-        logger.info(f"Loading tokenizer from {model_name}...")
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
-        logger.info("Tokenizer loaded successfully")
+    """Load the default sentiment model on startup"""
+    if STUB_MODELS:
+        logger.warning(
+            "FINSIGHT_STUB_MODELS=1 - using offline stub sentiment model instead of FinBERT"
+        )
 
-        logger.info(f"Loading model from {model_name}...")
-        model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        logger.info("FinBERT model loaded successfully!")
+    logger.info(f"Starting default model loading ({models.default})...")
+    try:
+        await asyncio.to_thread(models.load)
+        logger.info("Default sentiment model loaded successfully!")
     except Exception as e:
-        logger.error(f"Failed to load FinBERT model: {str(e)}", exc_info=True)
+        logger.error(f"Failed to load sentiment model: {str(e)}", exc_info=True)
         raise
 
 
+@app.on_event("startup")
+async def load_prefilter():
+    """Load the neutral pre-filter, if configured"""
+    global prefilter
+    if not SENTIMENT_PREFILTER_MODEL:
+        return
+    try:
+        prefilter = await asyncio.to_thread(NeutralPrefilter.load, SENTIMENT_PREFILTER_MODEL)
+        logger.info(f"Neutral pre-filter loaded from {SENTIMENT_PREFILTER_MODEL}")
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Could not load neutral pre-filter {SENTIMENT_PREFILTER_MODEL}: {e}")
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
     return {
         "message": "Sentiment Analysis Service",
-        "model": "FinBERT (ProsusAI/finbert)",
+        "model": models.default,
         "endpoints": {
             "POST /analyze": "Analyze sentiment of text and optionally highlight HTML",
+            "POST /analyze/stream": (
+                "Stream sentiment results in batches (NDJSON or SSE), then highlighted HTML"
+            ),
+            "GET /models": "Registered models, load state and per-model latency",
+            "POST /models/default": "Switch the default model without a restart",
             "GET /health": "Health check endpoint"
         }
     }
@@ -105,102 +232,284 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    model_loaded = model is not None and tokenizer is not None
+    model_loaded = models.is_loaded()
     return {
         "status": "healthy" if model_loaded else "unhealthy",
         "service": "sentiment-analysis",
-        "model_loaded": model_loaded
+        "model_loaded": model_loaded,
+        "default_model": models.default,
+        "prefilter": prefilter.stats() if prefilter else None,
+        "analysis_store": analysis_store.stats() if analysis_store else None
     }
 
 
-def split_into_sentences(text: str) -> List[Dict]:
-    """Split text into sentences and return with character positions."""
-    sentences_with_positions = []
-    current_pos = 0
+def resolve_model(name: Optional[str]) -> str:
+    """Registered model name for a request, or a 400 if unknown."""
+    try:
+        return models.resolve(name)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e).strip("'\""))
 
-    # Split sentences using regex
-    sentence_pattern = r'(?<=[.!?])\s+'
-    sentences = re.split(sentence_pattern, text)
 
-    for sentence in sentences:
-        if sentence.strip():
-            # Find the actual position in original text
-            start_pos = text.find(sentence, current_pos)
-            end_pos = start_pos + len(sentence)
+def resolve_plan(request: SentimentRequest) -> ScoringPlan:
+    """
+    Scoring plan for a request's tier and pre-filter options.
 
-            sentences_with_positions.append({
-                'text': sentence,
-                'start': start_pos,
-                'end': end_pos
-            })
+    Raises a 400 if a model is unknown or given with the fast tier, or the
+    fast tier or pre-filter is not configured.
+    """
+    prefilter_threshold = None
+    if request.prefilter or (request.prefilter is None and SENTIMENT_PREFILTER and prefilter):
+        if prefilter is None:
+            raise HTTPException(
+                status_code=400,
+                detail="The neutral pre-filter is not loaded. Set SENTIMENT_PREFILTER_MODEL."
+            )
+        recall = request.prefilter_recall
+        if recall is None:
+            recall = SENTIMENT_PREFILTER_RECALL
+        prefilter_threshold = prefilter.threshold(recall)
+
+    if request.tier == "full":
+        return ScoringPlan(resolve_model(request.model), prefilter_threshold=prefilter_threshold)
+    if FAST_MODEL_NAME not in models:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"The {request.tier} tier needs a fast model. "
+                f"Set SENTIMENT_FAST_MODEL or register '{FAST_MODEL_NAME}'."
+            )
+        )
+    if request.tier == "fast":
+        if request.model:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"The fast tier always uses the '{FAST_MODEL_NAME}' model; "
+                    "omit \"model\" or use tier \"full\"."
+                )
+            )
+        return ScoringPlan(FAST_MODEL_NAME, prefilter_threshold=prefilter_threshold)
+    threshold = request.cascade_threshold
+    if threshold is None:
+        threshold = SENTIMENT_CASCADE_THRESHOLD
+    return ScoringPlan(
+        FAST_MODEL_NAME, resolve_model(request.model), threshold, prefilter_threshold
+    )
 
-            current_pos = end_pos
 
-    return sentences_with_positions
+def load_plan(plan: ScoringPlan):
+    """Load every model of a plan (models load lazily)."""
+    for name in (plan.model, plan.escalate_to):
+        if name:
+            models.load(name)
 
 
-def analyze_sentiment(text: str) -> tuple:
-    """Analyze sentiment using FinBERT model."""
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512, padding=True)
+def score_with_plan(sentences: List[str], plan: ScoringPlan):
+    """
+    Score sentences with a plan's model or cascade, after the optional pre-filter.
+
+    Returns:
+        (scores, escalated, prefiltered) - escalated[i] is True if sentence i
+        went to the cascade's second stage, prefiltered[i] if it was labelled
+        neutral by the pre-filter without scoring
+    """
+    scores = np.empty((len(sentences), len(LABELS)), dtype=np.float32)
+    escalated = np.zeros(len(sentences), dtype=bool)
+    prefiltered = np.zeros(len(sentences), dtype=bool)
+    if plan.prefilter_threshold is not None:
+        p_neutral = prefilter.predict(sentences)
+        prefiltered = p_neutral > plan.prefilter_threshold
+        # Neutral must stay the top score even when the threshold is low, so it
+        # gets at least half; the rest is split evenly and the row sums to 1
+        neutral = np.maximum(p_neutral[prefiltered], 0.5)
+        scores[prefiltered] = np.stack([(1 - neutral) / 2, (1 - neutral) / 2, neutral], axis=1)
+
+    todo = np.flatnonzero(~prefiltered).tolist()
+    if not todo:
+        return scores, escalated, prefiltered
+    remaining = [sentences[idx] for idx in todo]
+    if plan.escalate_to is None:
+        scores[todo] = score_sentences(remaining, plan.model)
+    else:
+        scores[todo], escalated[todo] = cascade_scores(
+            remaining,
+            lambda batch: score_sentences(batch, plan.model),
+            lambda batch: score_sentences(batch, plan.escalate_to),
+            plan.threshold
+        )
+    return scores, escalated, prefiltered
 
-    with torch.no_grad():
-        outputs = model(**inputs)
 
-    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-    sentiment_score = predictions[0].tolist()
+def cascade_report(plan: ScoringPlan, scored: int, escalated: int) -> Optional[Dict]:
+    """"cascade" response field (None unless the request used the cascade)."""
+    if plan.escalate_to is None:
+        return None
+    return {
+        "fast_model": plan.model,
+        "full_model": plan.escalate_to,
+        "threshold": plan.threshold,
+        "scored": scored,
+        "escalated": escalated,
+        "escalation_fraction": round(escalated / scored, 4) if scored else 0.0
+    }
 
-    # FinBERT labels: positive, negative, neutral
-    labels = ['positive', 'negative', 'neutral']
-    sentiment_class = labels[sentiment_score.index(max(sentiment_score))]
 
-    return sentiment_class, {
-        'positive': sentiment_score[0],
-        'negative': sentiment_score[1],
-        'neutral': sentiment_score[2]
+def prefilter_report(plan: ScoringPlan, checked: int, skipped: int) -> Optional[Dict]:
+    """"prefilter" response field (None unless the pre-filter ran)."""
+    if plan.prefilter_threshold is None:
+        return None
+    return {
+        "threshold": round(plan.prefilter_threshold, 6),
+        "checked": checked,
+        "prefiltered": skipped,
+        "prefiltered_fraction": round(skipped / checked, 4) if checked else 0.0
     }
 
 
-def get_highlight_color(sentiment_class: str, scores: Dict[str, float]) -> Optional[str]:
-    """Get color based on sentiment and confidence score."""
-    if sentiment_class == 'neutral':
-        return None  # Skip neutral sentences
+def score_batch(batch: List[str], model_name: Optional[str] = None) -> np.ndarray:
+    """Run one forward pass; returns softmax probabilities in LABELS order."""
+    with models.use(model_name, items=len(batch)) as (tokenizer, model):
+        inputs = tokenizer(
+            batch, return_tensors="pt", truncation=True, max_length=512, padding=True
+        )
 
-    if sentiment_class == 'positive':
-        # Green intensity based on confidence score (0.0 to 1.0)
-        # Higher confidence = darker green (lower R and B values)
-        base_lightness = 255 - int(scores['positive'] * 155)  # Range: 255 to 100
-        return f'rgb({base_lightness}, 255, {base_lightness})'
+        with torch.no_grad():
+            outputs = model(**inputs)
 
-    elif sentiment_class == 'negative':
-        # Red intensity based on confidence score
-        # Higher confidence = darker red (lower G and B values)
-        base_lightness = 255 - int(scores['negative'] * 155)  # Range: 255 to 100
-        return f'rgb(255, {base_lightness}, {base_lightness})'
+    return torch.nn.functional.softmax(outputs.logits, dim=-1).numpy()
 
-    return None
 
+def score_sentences(sentences: List[str], model_name: Optional[str] = None) -> np.ndarray:
+    """
+    Score sentences in batches with a registered model (default if None).
+
+    Returns:
+        float32 array of shape (len(sentences), 3) with softmax probabilities
+        in LABELS order
+    """
+    scores = np.empty((len(sentences), len(LABELS)), dtype=np.float32)
+    for batch_start in range(0, len(sentences), BATCH_SIZE):
+        batch = sentences[batch_start:batch_start + BATCH_SIZE]
+        scores[batch_start:batch_start + len(batch)] = score_batch(batch, model_name)
+    return scores
+
+
+def analyze_sentiment(text: str) -> tuple:
+    """Analyze sentiment of a single text using FinBERT model."""
+    sentiment_score = score_sentences([text])[0].tolist()
+    sentiment_class = LABELS[sentiment_score.index(max(sentiment_score))]
+    return sentiment_class, dict(zip(LABELS, sentiment_score))
 
-def highlight_html(html_content: str, sentiment_results: List[Dict]) -> str:
-    """Apply sentiment highlighting to HTML content."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    html_str = str(soup)
 
-    # Sort sentiments by position (start) in reverse to avoid position shifts
-    sentiments_sorted = sorted(sentiment_results, key=lambda x: x['position']['start'], reverse=True)
+def reuse_previous_scores(previous_hash: Optional[str], sentences: List[str], model_name: str):
+    """
+    Prefill scores for sentences that also occur in a previous analysis by the same model.
 
-    # Apply highlights
-    for sentiment in sentiments_sorted:
-        color = get_highlight_color(sentiment['class'], sentiment['confidence_scores'])
+    Returns:
+        (scores with reused rows filled in, prefiltered flags of reused rows,
+        indices still to score, "incremental" report or None when no
+        previous_hash was given)
+    """
+    scores = np.empty((len(sentences), len(LABELS)), dtype=np.float32)
+    prefiltered = np.zeros(len(sentences), dtype=bool)
+    todo = list(range(len(sentences)))
+    if not previous_hash:
+        return scores, prefiltered, todo, None
+
+    previous = analysis_store.get(previous_hash) if analysis_store else None
+    if previous and previous.get("model", DEFAULT_MODEL_NAME) != model_name:
+        logger.warning(
+            f"Previous analysis {previous_hash} used model '{previous.get('model')}'; "
+            "re-scoring all sentences"
+        )
+        previous = None
+    if previous:
+        old_text = previous["text"]
+        old_sentences = [
+            old_text[start:end] for start, end in zip(previous["starts"], previous["ends"])
+        ]
+        old_prefiltered = set(previous.get("prefiltered", []))
+        todo = []
+        for idx, match in enumerate(match_segments(old_sentences, sentences)):
+            if match is None:
+                todo.append(idx)
+            else:
+                scores[idx] = previous["scores"][match]
+                prefiltered[idx] = match in old_prefiltered
+    else:
+        logger.warning(f"Previous analysis {previous_hash} not found; re-scoring all sentences")
+    report = incremental_report(
+        previous_hash, previous is not None, "sentence", len(sentences) - len(todo), len(todo)
+    )
+    return scores, prefiltered, todo, report
+
+
+def save_analysis(text: str, starts: np.ndarray, ends: np.ndarray, scores: np.ndarray,
+                  model_name: str, prefiltered: np.ndarray) -> str:
+    """Store an analysis for later incremental requests and return its content hash."""
+    key = content_hash(text)
+    if analysis_store is not None:
+        analysis_store.put(key, {
+            "text": text,
+            "model": model_name,
+            "starts": starts.tolist(),
+            "ends": ends.tolist(),
+            "scores": scores.tolist(),
+            "prefiltered": np.flatnonzero(prefiltered).tolist()
+        })
+    return key
+
+
+def to_records(text: str, starts: np.ndarray, ends: np.ndarray, scores: np.ndarray,
+               prefiltered: Optional[np.ndarray] = None) -> List[Dict]:
+    """Expand columnar results into the per-sentence dict format ("prefiltered" only when given)."""
+    class_ids = scores.argmax(axis=1).tolist()
+    results = []
+    rows = zip(starts.tolist(), ends.tolist(), class_ids, scores.tolist())
+    for i, (start, end, class_id, row) in enumerate(rows):
+        record = {
+            "sentence": text[start:end],
+            "class": LABELS[class_id],
+            "position": {
+                "start": start,
+                "end": end
+            },
+            "confidence_scores": dict(zip(LABELS, row))
+        }
+        if prefiltered is not None:
+            record["prefiltered"] = bool(prefiltered[i])
+        results.append(record)
+    return results
+
+
+def columns_batch(starts: np.ndarray, ends: np.ndarray, scores: np.ndarray,
+                  prefiltered: Optional[np.ndarray] = None) -> Dict:
+    """Columnar payload for a slice of results."""
+    columns = {
+        "starts": starts.tolist(),
+        "ends": ends.tolist(),
+        "class_ids": scores.argmax(axis=1).tolist(),
+        "scores": scores.tolist()
+    }
+    if prefiltered is not None:
+        columns["prefiltered"] = prefiltered.tolist()
+    return columns
 
-        if color:  # Skip neutral
-            sentence = sentiment['sentence']
-            # Create highlighted version
-            highlighted = f'<span style="background-color: {color};">{sentence}</span>'
 
-            # Replace in HTML
-            html_str = html_str.replace(sentence, highlighted, 1)
+def highlight_html(html_content: str, text: str, starts: np.ndarray, ends: np.ndarray,
+                   scores: np.ndarray) -> str:
+    """Apply sentiment highlighting to HTML content."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    html_str = str(soup)
 
-    return html_str
+    class_ids = scores.argmax(axis=1).tolist()
+    order = np.argsort(starts, kind="stable").tolist()
+    return apply_highlights(html_str, text, (
+        (int(starts[idx]), int(ends[idx]),
+         get_highlight_color(LABELS[class_ids[idx]], dict(zip(LABELS, scores[idx].tolist()))))
+        for idx in order
+    ))
 
 
 @app.post("/analyze", response_model=SentimentResponse)
@@ -209,61 +518,80 @@ async def analyze_sentiment_endpoint(request: SentimentRequest):
     Analyze sentiment of provided text and optionally highlight HTML.
 
     Args:
-        request: SentimentRequest with text and optional html
+        request: SentimentRequest with text, optional html and response format
 
     Returns:
-        SentimentResponse with sentiment results and highlighted HTML
+        SentimentResponse with sentiment results (per-sentence records or
+        columnar arrays) and highlighted HTML
     """
     logger.info(f"Received sentiment analysis request for text of length {len(request.text)}")
 
-    if not model or not tokenizer:
-        logger.error("Model not loaded yet")
-        raise HTTPException(
-            status_code=503,
-            detail="Model not loaded. Please wait for service to initialize."
-        )
+    plan = resolve_plan(request)
 
     try:
+        # Models load lazily; keep a first load off the event loop
+        await asyncio.to_thread(load_plan, plan)
+
         # Split text into sentences
         logger.debug("Splitting text into sentences...")
-        sentences = split_into_sentences(request.text)
-        logger.info(f"Found {len(sentences)} sentences to analyze")
+        starts, ends = segment_sentences(request.text)
+        logger.info(f"Found {len(starts)} sentences to analyze")
 
-        if not sentences:
+        if len(starts) == 0:
             logger.warning("No sentences found in the provided text")
             raise HTTPException(
                 status_code=400,
                 detail="No sentences found in the provided text."
             )
 
-        # Analyze sentiment for each sentence
-        results = []
-        for idx, sentence_data in enumerate(sentences):
-            logger.debug(f"Analyzing sentence {idx+1}/{len(sentences)}")
-            sentiment_class, scores = analyze_sentiment(sentence_data['text'])
-
-            results.append({
-                "sentence": sentence_data['text'],
-                "class": sentiment_class,
-                "position": {
-                    "start": sentence_data['start'],
-                    "end": sentence_data['end']
-                },
-                "confidence_scores": scores
-            })
-
-        logger.info(f"Sentiment analysis completed for {len(results)} sentences")
+        # Analyze sentiment in batches, reusing a previous analysis where the text is unchanged
+        sentences = [request.text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+        # Reading the previous analysis is a disk read: off the event loop
+        scores, prefiltered, todo, incremental = await asyncio.to_thread(
+            reuse_previous_scores, request.previous_hash, sentences, plan.label
+        )
+        escalated = 0
+        if todo:
+            scores[todo], escalated_mask, prefiltered[todo] = score_with_plan(
+                [sentences[idx] for idx in todo], plan
+            )
+            escalated = int(escalated_mask.sum())
+        skipped = int(prefiltered[todo].sum())
+        logger.info(f"Sentiment analysis completed for {len(sentences)} sentences "
+                    f"({len(todo) - skipped} scored with '{plan.label}', {skipped} prefiltered)")
+        analysis_hash = await asyncio.to_thread(
+            save_analysis, request.text, starts, ends, scores, plan.label, prefiltered
+        )
+        flags = prefiltered if plan.prefilter_threshold is not None else None
 
         # Generate highlighted HTML if provided
         highlighted_html = None
         if request.html:
             logger.info("Generating highlighted HTML...")
-            highlighted_html = highlight_html(request.html, results)
+            highlighted_html = highlight_html(request.html, request.text, starts, ends, scores)
             logger.debug("HTML highlighting completed")
 
+        if request.format == "columnar":
+            return SentimentResponse(
+                sentiment_columns=SentimentColumns(
+                    labels=LABELS, **columns_batch(starts, ends, scores, flags)
+                ),
+                highlighted_html=highlighted_html,
+                content_hash=analysis_hash,
+                incremental=incremental,
+                model=plan.label,
+                cascade=cascade_report(plan, len(todo) - skipped, escalated),
+                prefilter=prefilter_report(plan, len(todo), skipped)
+            )
+
         return SentimentResponse(
-            sentiment_results=results,
-            highlighted_html=highlighted_html
+            sentiment_results=to_records(request.text, starts, ends, scores, flags),
+            highlighted_html=highlighted_html,
+            content_hash=analysis_hash,
+            incremental=incremental,
+            model=plan.label,
+            cascade=cascade_report(plan, len(todo) - skipped, escalated),
+            prefilter=prefilter_report(plan, len(todo), skipped)
         )
 
     except Exception as e:
@@ -272,3 +600,111 @@ async def analyze_sentiment_endpoint(request: SentimentRequest):
             status_code=500,
             detail=f"Error analyzing sentiment: {str(e)}"
         )
+
+
+@app.post("/analyze/stream")
+async def analyze_sentiment_stream(request: SentimentRequest,
+                                   stream_format: StreamProtocol = "ndjson"):
+    """
+    Stream sentiment results as they are scored.
+
+    Events, in order:
+        start            - {"sentence_count", "labels", "format", "incremental", "model"}
+        batch            - {"offset", "results"} (records) or {"offset", "columns"} (columnar)
+        highlighted_html - {"highlighted_html"} (only when html was provided)
+        done             - {"sentence_count", "content_hash", "cascade", "prefilter"}
+        error            - {"detail"} if scoring fails mid-stream
+
+    Args:
+        request: SentimentRequest with text, optional html and batch format
+        stream_format: "ndjson" (default) or "sse"
+
+    Returns:
+        StreamingResponse emitting one event per scored batch
+    """
+    logger.info(f"Received streaming sentiment request for text of length {len(request.text)}")
+
+    # Resolved once: a default switch mid-stream does not change this request's models
+    plan = resolve_plan(request)
+
+    starts, ends = segment_sentences(request.text)
+    if len(starts) == 0:
+        logger.warning("No sentences found in the provided text")
+        raise HTTPException(
+            status_code=400,
+            detail="No sentences found in the provided text."
+        )
+    sentences = [request.text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+    logger.info(f"Streaming sentiment for {len(sentences)} sentences")
+
+    scores, prefiltered, todo, incremental = await asyncio.to_thread(
+        reuse_previous_scores, request.previous_hash, sentences, plan.label
+    )
+    flags = prefiltered if plan.prefilter_threshold is not None else None
+    needs_scoring = np.zeros(len(sentences), dtype=bool)
+    needs_scoring[todo] = True
+
+    async def event_stream():
+        yield encode_event({
+            "event": "start",
+            "sentence_count": len(sentences),
+            "labels": LABELS,
+            "format": request.format,
+            "incremental": incremental,
+            "model": plan.label
+        }, stream_format)
+
+        escalated = 0
+        try:
+            for batch_start in range(0, len(sentences), BATCH_SIZE):
+                batch_end = min(batch_start + BATCH_SIZE, len(sentences))
+                pending = (
+                    np.flatnonzero(needs_scoring[batch_start:batch_end]) + batch_start
+                ).tolist()
+                if pending:
+                    # Run inference off the event loop so each batch is flushed immediately
+                    scores[pending], escalated_mask, prefiltered[pending] = await asyncio.to_thread(
+                        score_with_plan, [sentences[idx] for idx in pending], plan
+                    )
+                    escalated += int(escalated_mask.sum())
+                batch = slice(batch_start, batch_end)
+                event = {"event": "batch", "offset": batch_start}
+                batch_flags = None if flags is None else flags[batch]
+                if request.format == "columnar":
+                    event["columns"] = columns_batch(
+                        starts[batch], ends[batch], scores[batch], batch_flags
+                    )
+                else:
+                    event["results"] = to_records(
+                        request.text, starts[batch], ends[batch], scores[batch], batch_flags
+                    )
+                yield encode_event(event, stream_format)
+
+            if request.html:
+                highlighted_html = await asyncio.to_thread(
+                    highlight_html, request.html, request.text, starts, ends, scores
+                )
+                event = {"event": "highlighted_html", "highlighted_html": highlighted_html}
+                yield encode_event(event, stream_format)
+
+            skipped = int(prefiltered[todo].sum())
+            analysis_hash = await asyncio.to_thread(
+                save_analysis, request.text, starts, ends, scores, plan.label, prefiltered
+            )
+            logger.info(f"Streamed sentiment results for {len(sentences)} sentences")
+            yield encode_event({
+                "event": "done",
+                "sentence_count": len(sentences),
+                "content_hash": analysis_hash,
+                "cascade": cascade_report(plan, len(todo) - skipped, escalated),
+                "prefilter": prefilter_report(plan, len(todo), skipped)
+            }, stream_format)
+
+        except Exception as e:
+            logger.error(f"Error streaming sentiment: {str(e)}", exc_info=True)
+            yield encode_event(
+                {"event": "error", "detail": f"Error analyzing sentiment: {str(e)}"}, stream_format
+            )
+
+    return StreamingResponse(event_stream(), media_type=MEDIA_TYPES[stream_format],
+                             headers=STREAM_HEADERS)
@@ -0,0 +1,32 @@
+"""
+Helpers for streaming responses as NDJSON or Server-Sent Events.
+
+Every streamed item is a JSON object with an "event" key, e.g.
+{"event": "batch", ...}. NDJSON writes one object per line; SSE writes an
+``event:``/``data:`` frame per object.
+"""
+
+import json
+from typing import Dict, Literal
+
+StreamProtocol = Literal["ndjson", "sse"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_event(event: Dict, protocol: StreamProtocol = "ndjson") -> str:
+    """Serialize one stream event in the requested protocol."""
+    payload = json.dumps(event, ensure_ascii=False)
+    if protocol == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+# Headers that stop proxies (nginx) from buffering the stream
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
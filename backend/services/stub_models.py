@@ -0,0 +1,160 @@
+"""
+Offline stub models for load testing and CI.
+
+These stand in for FinBERT, the BERT NER pipeline and the Gemini-backed
+LangExtract call when ``FINSIGHT_STUB_MODELS=1`` / ``LANGEXTRACT_PROVIDER=stub``
+are set. They are deterministic, need no network or model weights, and keep
+the same call signatures as the real objects so the rest of each service's
+request path runs unchanged.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+# Small finance lexicon used to fake sentiment logits
+POSITIVE_WORDS = {
+    "growth", "grew", "increase", "increased", "record", "strong", "exceeded",
+    "beat", "beating", "higher", "profit", "gain", "gains", "improved", "up",
+}
+NEGATIVE_WORDS = {
+    "decline", "declined", "decrease", "decreased", "loss", "losses", "weak",
+    "missed", "lower", "impairment", "default", "risk", "down", "fell", "drop",
+}
+
+_WORD_PATTERN = re.compile(r"[A-Za-z']+")
+
+# Numbers with optional thousands separators and decimals, e.g. "2,500,000" or "3.5"
+_NUMBER_PATTERN = re.compile(r"(\d+(?:[,.]\d+)*)")
+
+# Capitalized word runs, e.g. "Apple Inc." or "Tim Cook"
+_PROPER_NOUN_PATTERN = re.compile(
+    r"\b[A-Z][a-zA-Z&]+(?:\s+[A-Z][a-zA-Z&]+)*(?:\s+(?:Inc|Corp|Ltd|LLC|Co)\.?)?"
+)
+_ORG_SUFFIXES = (
+    "Inc", "Inc.", "Corp", "Corp.", "Ltd", "Ltd.", "LLC", "Co.", "Bank", "Holdings", "Group"
+)
+
+
+def lexicon_scores(text: str) -> List[float]:
+    """Return fake [positive, negative, neutral] logits for a sentence."""
+    words = [w.lower() for w in _WORD_PATTERN.findall(text)]
+    positive = sum(1 for w in words if w in POSITIVE_WORDS)
+    negative = sum(1 for w in words if w in NEGATIVE_WORDS)
+    return [float(positive) * 2.0, float(negative) * 2.0, 1.0]
+
+
+class StubSentimentTokenizer:
+    """Tokenizer stand-in: passes the raw texts through to the stub model."""
+
+    def __call__(self, text: Union[str, List[str]], **kwargs) -> Dict[str, List[str]]:
+        texts = [text] if isinstance(text, str) else list(text)
+        return {"texts": texts}
+
+
+@dataclass
+class _StubOutput:
+    logits: object
+
+
+class StubSentimentModel:
+    """Sequence classifier stand-in returning lexicon-based logits."""
+
+    def __call__(self, texts: List[str], **kwargs) -> _StubOutput:
+        import torch
+
+        return _StubOutput(logits=torch.tensor([lexicon_scores(t) for t in texts]))
+
+    def eval(self) -> "StubSentimentModel":
+        return self
+
+
+class StubNERPipeline:
+    """NER pipeline stand-in matching the ``aggregation_strategy="simple"`` output."""
+
+    def __call__(self, text: Union[str, List[str]], **kwargs):
+        if isinstance(text, list):
+            return [self._recognize(t) for t in text]
+        return self._recognize(text)
+
+    @staticmethod
+    def _recognize(text: str) -> List[Dict]:
+        entities = []
+        for match in _PROPER_NOUN_PATTERN.finditer(text):
+            word = match.group(0)
+            # A capitalized word at a sentence start is usually not an entity
+            preceding = text[match.start() - 2:match.start()].strip()
+            if " " not in word and (match.start() == 0 or preceding in {".", "!", "?"}):
+                continue
+            entity_group = "ORG" if word.split()[-1] in _ORG_SUFFIXES else "MISC"
+            entities.append({
+                "entity_group": entity_group,
+                "score": 0.9,
+                "word": word,
+                "start": match.start(),
+                "end": match.end(),
+            })
+        return entities
+
+
+@dataclass
+class StubExtraction:
+    """Mirror of ``lx.data.Extraction`` with the fields the service reads."""
+    extraction_class: str
+    extraction_text: str
+    attributes: Dict[str, str] = field(default_factory=dict)
+    char_interval: Optional[Dict[str, int]] = None
+
+
+@dataclass
+class StubAnnotatedDocument:
+    """Mirror of ``lx.data.AnnotatedDocument`` with the fields the service reads."""
+    text: str
+    extractions: List[StubExtraction] = field(default_factory=list)
+
+
+def example_pattern(extraction_text: str) -> "re.Pattern[str]":
+    """
+    Build a regex that generalizes an example extraction.
+
+    Numbers are generalized so "$2,500,000" also matches "$119.6"; texts
+    without digits are matched literally.
+    """
+    if not any(ch.isdigit() for ch in extraction_text):
+        return re.compile(re.escape(extraction_text))
+    parts = _NUMBER_PATTERN.split(extraction_text)
+    pattern = "".join(
+        # Odd positions hold the captured numbers
+        _NUMBER_PATTERN.pattern if i % 2 else re.escape(part)
+        for i, part in enumerate(parts)
+    )
+    return re.compile(pattern)
+
+
+def stub_extract(text: str, examples: List) -> StubAnnotatedDocument:
+    """
+    Deterministic extraction driven by the request's examples.
+
+    Each example extraction is turned into a pattern (see ``example_pattern``)
+    and every non-overlapping match in ``text`` becomes an extraction with the
+    example's class and attributes.
+    """
+    extractions = []
+    taken = []
+    for example in examples:
+        for ext in example.extractions:
+            if not ext.extraction_text:
+                continue
+            for match in example_pattern(ext.extraction_text).finditer(text):
+                start, end = match.span()
+                if any(start < t_end and t_start < end for t_start, t_end in taken):
+                    continue
+                taken.append((start, end))
+                extractions.append(StubExtraction(
+                    extraction_class=ext.extraction_class,
+                    extraction_text=match.group(0),
+                    attributes=dict(ext.attributes),
+                    char_interval={"start_pos": start, "end_pos": end},
+                ))
+    extractions.sort(key=lambda e: e.char_interval["start_pos"])
+    return StubAnnotatedDocument(text=text, extractions=extractions)
@@ -0,0 +1,66 @@
+"""
+Shared fixtures: service apps running offline (stub models) in a temporary directory
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.services.artifact_store import ArtifactStore
+from backend.services.incremental_analysis import open_store
+
+
+def _service(module_name, tmp_path, monkeypatch):
+    import importlib
+
+    # Services write logs/, cache/ and output/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    service = importlib.import_module(f"backend.services.{module_name}")
+    if hasattr(service, "STUB_MODELS"):
+        monkeypatch.setattr(service, "STUB_MODELS", True)
+    if hasattr(service, "analysis_store"):
+        monkeypatch.setattr(service, "analysis_store", open_store(module_name.split("_")[0]))
+    if hasattr(service, "artifact_store"):
+        # Closed on shutdown, so each app run gets its own
+        monkeypatch.setattr(service, "artifact_store", ArtifactStore(str(tmp_path / "artifacts")))
+    return service
+
+
+@pytest.fixture
+def sentiment_service(tmp_path, monkeypatch):
+    return _service("sentiment_service", tmp_path, monkeypatch)
+
+
+@pytest.fixture
+def sentiment_client(sentiment_service):
+    with TestClient(sentiment_service.app) as client:
+        yield client
+
+
+
+@pytest.fixture
+def langextract_service(tmp_path, monkeypatch):
+    from backend.services.extraction_providers import StubProvider
+
+    service = _service("langextract_service", tmp_path, monkeypatch)
+    monkeypatch.setattr(service, "extraction_provider", StubProvider())
+    monkeypatch.setattr(service, "extraction_cache", None)
+    monkeypatch.setattr(service, "SAVE_OUTPUTS", False)
+    return service
+
+
+@pytest.fixture
+def langextract_client(langextract_service):
+    with TestClient(langextract_service.app) as client:
+        yield client
+
+
+@pytest.fixture
+def ner_service(tmp_path, monkeypatch):
+    service = _service("ner_service", tmp_path, monkeypatch)
+    monkeypatch.setattr(service, "NER_GAZETTEER", "")
+    return service
+
+
+@pytest.fixture
+def ner_client(ner_service):
+    with TestClient(ner_service.app) as client:
+        yield client
@@ -0,0 +1,42 @@
+"""
+Unit tests for the per-request artifact store
+"""
+import os
+import time
+
+from backend.services.artifact_store import ArtifactStore
+
+
+def test_save_is_content_addressed_and_readable_before_write(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    first = store.save({"result.html": "<p>one</p>"})
+    second = store.save({"result.html": "<p>two</p>"})
+    assert first != second
+    assert store.save({"result.html": "<p>one</p>"}) == first
+    assert store.read(first, "result.html") == b"<p>one</p>"
+
+    store.close()
+    assert (tmp_path / second / "result.html").read_text() == "<p>two</p>"
+    assert store.read(second, "result.html") == b"<p>two</p>"
+
+
+def test_invalid_ids_and_names_are_rejected(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    assert store.read("../../etc", "passwd") is None
+    artifact_id = store.save({"a.html": "x"})
+    assert store.read(artifact_id, "../a.html") is None
+    store.close()
+
+
+def test_retention_by_count_and_age(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_artifacts=2, max_age_seconds=3600)
+    ages = {"a" * 24: 7200, "b" * 24: 300, "c" * 24: 200, "d" * 24: 100}
+    for artifact_id, age in ages.items():
+        (tmp_path / artifact_id).mkdir()
+        stamp = time.time() - age
+        os.utime(tmp_path / artifact_id, (stamp, stamp))
+
+    store._prune()
+    store.close()
+    # "a" is too old; "b" is beyond the two most recent
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["c" * 24, "d" * 24]
@@ -0,0 +1,31 @@
+"""
+Unit tests for the shared atomic write and background writer helpers
+"""
+import pytest
+
+from backend.services.atomic_files import BackgroundWriter, atomic_write
+
+
+def test_atomic_write_replaces_and_cleans_up_on_failure(tmp_path):
+    path = tmp_path / "out.txt"
+    atomic_write(path, b"first")
+    atomic_write(path, b"second")
+    assert path.read_bytes() == b"second"
+
+    with pytest.raises(TypeError):
+        atomic_write(path, "not bytes")
+    assert path.read_bytes() == b"second"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.txt"]
+
+
+def test_background_writer_runs_jobs_in_order_and_drains_on_close():
+    done = []
+    writer = BackgroundWriter("test-writer", queue_size=2)
+    for i in range(10):
+        writer.submit(done.append, i)
+    writer.submit(lambda: 1 / 0)  # A failing job does not stop the writer
+    writer.submit(done.append, 10)
+    writer.close()
+    assert done == list(range(11)) and writer.pending() == 0
+    with pytest.raises(RuntimeError):
+        writer.submit(done.append, 11)
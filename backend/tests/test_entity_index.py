@@ -0,0 +1,33 @@
+"""
+Unit tests for the per-document entity index
+"""
+from backend.services.entity_index import build_entity_index, normalize_entity
+
+
+def _mention(word, group, start, score):
+    return {"entity_group": group, "word": word, "start": start, "end": start + len(word),
+            "score": score}
+
+
+def test_normalize_entity_merges_surface_variants():
+    assert normalize_entity("Apple Inc.", "ORG") == normalize_entity("APPLE", "ORG") == "apple"
+    assert normalize_entity("Goldman  Sachs Group, Inc.", "ORG") == "goldman sachs group"
+    # Legal suffixes are only dropped for organisations
+    assert normalize_entity("Co", "PER") == "co"
+
+
+def test_build_entity_index_groups_mentions():
+    mentions = [
+        _mention("Apple Inc.", "ORG", 0, 0.9),
+        _mention("Tim Cook", "PER", 20, 0.99),
+        _mention("Apple", "ORG", 40, 0.7),
+        _mention("Apple", "ORG", 60, 0.8),
+        _mention("Apple", "LOC", 80, 0.5),
+    ]
+    index = build_entity_index(mentions)
+    assert [(e["text"], e["entity_group"], e["count"]) for e in index] == [
+        ("Apple", "ORG", 3), ("Tim Cook", "PER", 1), ("Apple", "LOC", 1)
+    ]
+    apple = index[0]
+    assert apple["starts"] == [0, 40, 60] and apple["ends"] == [10, 45, 65]
+    assert apple["max_score"] == 0.9 and apple["mean_score"] == 0.8
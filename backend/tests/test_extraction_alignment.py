@@ -0,0 +1,38 @@
+"""
+Unit tests for extraction alignment
+"""
+from backend.services.extraction_alignment import AhoCorasick, align_extractions
+
+TEXT = "Revenue was $1.2 billion. The Company expects $1.2 billion again; the Company said so."
+
+
+def test_aho_corasick_finds_overlapping_matches():
+    matches = sorted(AhoCorasick(["he", "she", "hers"]).finditer("ushers"))
+    assert matches == [(0, 2, 4), (1, 1, 4), (2, 2, 6)]
+
+
+def test_repeated_values_map_to_successive_occurrences():
+    texts = ["$1.2 billion", "Company", "$1.2 billion", "Company"]
+    aligned = align_extractions(TEXT, texts, [None] * 4)
+    assert [TEXT[s:e] for s, e in aligned] == texts
+    assert aligned[0][0] < aligned[1][0] < aligned[2][0] < aligned[3][0]
+
+
+def test_provider_intervals_are_kept_or_used_as_hints():
+    second = TEXT.index("$1.2 billion", 20)
+    exact = align_extractions(TEXT, ["$1.2 billion"], [(second, second + 12)])
+    assert exact == [(second, second + 12)]
+
+    # An interval that's slightly off still selects the nearest occurrence
+    hinted = align_extractions(TEXT, ["$1.2 billion"], [(second + 3, second + 15)])
+    assert hinted == [(second, second + 12)]
+
+
+def test_fuzzy_fallback_for_whitespace_and_case():
+    text = "Net  income\nrose to ＄5 million."
+    aligned = align_extractions(
+        text, ["net income rose", "$5 Million", "missing"], [None, None, None]
+    )
+    assert text[slice(*aligned[0])] == "Net  income\nrose"
+    assert text[slice(*aligned[1])] == "＄5 million"
+    assert aligned[2] is None
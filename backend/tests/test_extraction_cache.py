@@ -0,0 +1,56 @@
+"""
+Unit tests for the LangExtract result cache
+"""
+import os
+import time
+
+from backend.services.extraction_cache import ExtractionCache
+
+EXAMPLES = [{
+    "text": "Alpha paid $5.",
+    "extractions": [{"extraction_class": "amount", "extraction_text": "$5", "attributes": {}}],
+}]
+
+
+def test_key_is_stable_and_sensitive_to_inputs():
+    key = ExtractionCache.make_key("text", "prompt", EXAMPLES, "gemini", provider="stub")
+    assert key == ExtractionCache.make_key("text", "prompt", EXAMPLES, "gemini", provider="stub")
+    assert key != ExtractionCache.make_key("text!", "prompt", EXAMPLES, "gemini", provider="stub")
+    assert key != ExtractionCache.make_key(
+        "text", "prompt", EXAMPLES, "other-model", provider="stub"
+    )
+    assert key != ExtractionCache.make_key("text", "prompt", [], "gemini", provider="stub")
+
+
+def test_hit_miss_and_stats(tmp_path):
+    cache = ExtractionCache(str(tmp_path), ttl_seconds=60, max_bytes=1024 * 1024)
+    key = ExtractionCache.make_key("text", "prompt", EXAMPLES, "gemini")
+
+    assert cache.get(key) is None
+    cache.put(key, {"extractions": [{"extraction_text": "$5"}], "chunks": 1})
+    assert cache.get(key) == {"extractions": [{"extraction_text": "$5"}], "chunks": 1}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["size_bytes"] > 0
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ExtractionCache(str(tmp_path), ttl_seconds=10, max_bytes=1024 * 1024)
+    cache.put("ab" * 32, {"chunks": 1})
+    old = time.time() - 60
+    os.utime(cache._path("ab" * 32), (old, old))
+    assert cache.get("ab" * 32) is None
+
+
+def test_size_cap_evicts_oldest(tmp_path):
+    cache = ExtractionCache(str(tmp_path), ttl_seconds=3600, max_bytes=300)
+    keys = [f"{i:02d}" * 32 for i in range(5)]
+    for age, key in enumerate(keys):
+        cache.put(key, {"payload": "x" * 100})
+        stamp = time.time() - 100 + age
+        os.utime(cache._path(key), (stamp, stamp))
+
+    assert cache.stats()["size_bytes"] <= 300
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
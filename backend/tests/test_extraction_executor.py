@@ -0,0 +1,79 @@
+"""
+Unit tests for the shared extraction executor
+"""
+import asyncio
+import threading
+import time
+
+from backend.services.extraction_executor import MeteredExecutor
+
+
+def test_runs_calls_and_records_stats():
+    executor = MeteredExecutor(2)
+
+    async def main():
+        return await asyncio.gather(*(executor.run(pow, n, 2) for n in range(5)))
+
+    assert asyncio.run(main()) == [0, 1, 4, 9, 16]
+    stats = executor.stats()
+    assert stats["completed"] == 5 and stats["queued"] == 0 and stats["running"] == 0
+    executor.shutdown()
+
+
+def test_timeout_releases_caller_and_cancels_queued_work():
+    executor = MeteredExecutor(1)
+    release = threading.Event()
+
+    async def main():
+        tasks = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(3)]
+        started = time.monotonic()
+        _, pending = await asyncio.wait(tasks, timeout=0.2)
+        for task in pending:
+            task.cancel()
+        await asyncio.sleep(0)
+        return time.monotonic() - started, len(pending)
+
+    elapsed, pending = asyncio.run(main())
+    assert elapsed < 2 and pending == 3
+
+    stats = executor.stats()
+    assert stats["cancelled"] == 2 and stats["queued"] == 0 and stats["running"] == 1
+    release.set()
+    executor.shutdown()
+
+
+def test_waiting_calls_are_admitted_by_priority():
+    executor = MeteredExecutor(1)
+    release = threading.Event()
+    order = []
+
+    async def main():
+        busy = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting = [asyncio.create_task(executor.run(order.append, name, priority=priority))
+                   for name, priority in (("batch-1", 1), ("batch-2", 1), ("interactive", 0))]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["waiting_for_worker"] == 3
+        release.set()
+        await asyncio.gather(busy, *waiting)
+
+    asyncio.run(main())
+    assert order == ["interactive", "batch-1", "batch-2"]
+    assert executor.stats()["completed"] == 4
+    executor.shutdown()
+
+
+def test_timeout_starts_when_the_call_does():
+    executor = MeteredExecutor(1)
+
+    async def main():
+        # The second call waits ~0.3s for the worker, longer than its 0.2s timeout
+        first = asyncio.create_task(executor.run(time.sleep, 0.3, timeout=0.2))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(executor.run(time.sleep, 0.05, timeout=0.2))
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, asyncio.TimeoutError) and second is None
+    assert executor.stats()["timed_out"] == 1
+    executor.shutdown()
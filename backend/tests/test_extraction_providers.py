@@ -0,0 +1,50 @@
+"""
+Unit tests for the LangExtract provider layer (stub and record/replay)
+"""
+import pytest
+
+from backend.services.extraction_providers import (
+    ExtractionProvider, ReplayMissError, create_provider, document_to_dict
+)
+
+EXAMPLES = [{
+    "text": "Alpha paid $5 million.",
+    "extractions": [{
+        "extraction_class": "amount",
+        "extraction_text": "$5 million",
+        "attributes": {"unit": "million"},
+    }],
+}]
+TEXT = "Beta paid $7 million, then $12.5 million."
+
+
+def test_stub_provider_generalizes_examples():
+    provider = create_provider("stub")
+    document = provider.extract(TEXT, "prompt", provider.prepare(EXAMPLES), "model")
+    assert [e.extraction_text for e in document.extractions] == ["$7 million", "$12.5 million"]
+    assert document.extractions[0].char_interval == {"start_pos": 10, "end_pos": 20}
+
+
+def test_record_then_replay_returns_same_document(tmp_path):
+    recorder = create_provider("stub", "record", str(tmp_path))
+    recorded = recorder.extract(TEXT, "prompt", recorder.prepare(EXAMPLES), "model")
+
+    replayer = create_provider("stub", "replay", str(tmp_path))
+    replayed = replayer.extract(TEXT, "prompt", replayer.prepare(EXAMPLES), "model")
+    assert document_to_dict(replayed) == document_to_dict(recorded)
+
+    with pytest.raises(ReplayMissError):
+        replayer.extract(TEXT + " More.", "prompt", replayer.prepare(EXAMPLES), "model")
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError):
+        create_provider("openai")
+
+
+def test_providers_must_implement_extract():
+    class Incomplete(ExtractionProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
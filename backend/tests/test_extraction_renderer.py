@@ -0,0 +1,85 @@
+"""
+Unit tests for the native extraction visualization renderer
+"""
+import json
+import re
+from html.parser import HTMLParser
+
+from backend.services.extraction_renderer import render_extractions_html
+
+
+class _SpanChecker(HTMLParser):
+    """Collects data-extraction-index values and checks spans are balanced."""
+
+    def __init__(self):
+        super().__init__()
+        self.depth = 0
+        self.indexes = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "span":
+            self.depth += 1
+            attrs = dict(attrs)
+            if "data-extraction-index" in attrs:
+                self.indexes.append(int(attrs["data-extraction-index"]))
+
+    def handle_endtag(self, tag):
+        if tag == "span":
+            self.depth -= 1
+
+
+def _parse(html_output):
+    checker = _SpanChecker()
+    checker.feed(html_output)
+    return checker
+
+
+def test_highlights_are_indexed_and_text_is_escaped():
+    text = "Acme <Corp> paid $5 million."
+    extractions = [
+        {"extraction_class": "company", "extraction_text": "Acme <Corp>", "attributes": {},
+         "start_char": 0, "end_char": 11},
+        {"extraction_class": "amount", "extraction_text": "$5 million", "attributes": {"unit": "m"},
+         "start_char": 17, "end_char": 27},
+        {"extraction_class": "note", "extraction_text": "unplaced", "attributes": {}},
+    ]
+    html_output = render_extractions_html(text, extractions)
+    checker = _parse(html_output)
+    assert checker.depth == 0
+    assert checker.indexes == [0, 1]
+    assert "Acme &lt;Corp&gt;</span>" in html_output
+
+
+def test_nested_and_crossing_spans_stay_well_formed():
+    text = "The Acme Bank Group results"
+    extractions = [
+        {"extraction_class": "org", "extraction_text": "Acme Bank Group", "attributes": {},
+         "start_char": 4, "end_char": 19},
+        {"extraction_class": "org", "extraction_text": "Acme Bank", "attributes": {},
+         "start_char": 4, "end_char": 13},
+        {"extraction_class": "misc", "extraction_text": "Group results", "attributes": {},
+         "start_char": 14, "end_char": 27},
+    ]
+    checker = _parse(render_extractions_html(text, extractions))
+    assert checker.depth == 0
+    assert checker.indexes[:3] == [0, 1, 2]
+
+
+def test_no_positions_renders_placeholder():
+    html_output = render_extractions_html(
+        "text", [{"extraction_class": "x", "extraction_text": "y", "attributes": {}}]
+    )
+    assert "No valid extractions" in html_output
+
+
+def test_player_data_holds_only_what_the_player_reads():
+    text = "Acme paid $5 million."
+    extractions = [
+        {"extraction_class": "company", "extraction_text": "Acme", "attributes": {"role": "payer"},
+         "start_char": 0, "end_char": 4},
+    ]
+    html_output = render_extractions_html(text, extractions)
+    script = re.search(r"const extractions = (.*);\n", html_output).group(1)
+    [entry] = json.loads(script)
+    assert set(entry) == {"index", "startPos", "endPos", "attributesHtml"}
+    assert (entry["index"], entry["startPos"], entry["endPos"]) == (0, 0, 4)
@@ -0,0 +1,70 @@
+"""
+Unit tests for the fast sentiment tier (layer truncation, offline loading, cascade)
+"""
+import json
+
+import numpy as np
+import pytest
+
+from backend.services.fast_sentiment import (
+    REPORT_FILE, cascade_scores, load_classifier, main, split_source,
+)
+
+WORDS = ["revenue", "grew", "declined", "the", "company", "loss", "profit", "strong", "weak", "."]
+
+
+def _tiny_finbert(path):
+    """Save a small randomly initialized 3-label BERT classifier to path."""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    vocab = path / "vocab.txt"
+    path.mkdir()
+    special = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab.write_text("\n".join(special + WORDS), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(path)
+    config = BertConfig(vocab_size=len(special + WORDS), hidden_size=16, num_hidden_layers=3,
+                        num_attention_heads=2, intermediate_size=32, num_labels=3)
+    BertForSequenceClassification(config).save_pretrained(path)
+    return str(path)
+
+
+def test_split_source():
+    assert split_source("ProsusAI/finbert#layers=4") == ("ProsusAI/finbert", 4)
+    assert split_source("models/finbert-fast") == ("models/finbert-fast", None)
+
+
+def test_cascade_escalates_only_low_confidence_sentences():
+    def fast(batch):
+        return np.array([[0.9, 0.05, 0.05], [0.4, 0.3, 0.3], [0.1, 0.1, 0.8]], dtype=np.float32)
+
+    calls = []
+
+    def full(batch):
+        calls.append(batch)
+        return np.array([[0.0, 1.0, 0.0]] * len(batch), dtype=np.float32)
+
+    scores, escalated = cascade_scores(["a", "b", "c"], fast, full, threshold=0.8)
+    assert escalated.tolist() == [False, True, False]
+    assert calls == [["b"]]
+    assert scores.argmax(axis=1).tolist() == [0, 1, 2]
+
+
+def test_local_truncated_model_and_build_cli(tmp_path, capsys):
+    teacher = _tiny_finbert(tmp_path / "teacher")
+    tokenizer, model = load_classifier(f"{teacher}#layers=1")
+    assert len(model.bert.encoder.layer) == 1 and model.config.num_hidden_layers == 1
+    with pytest.raises(ValueError):
+        load_classifier(f"{teacher}#layers=9")
+
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("The company grew revenue. Profit declined. " * 20, encoding="utf-8")
+    output = tmp_path / "fast"
+    main([str(corpus), "--teacher", teacher, "--layers", "2", "--epochs", "1",
+          "--output", str(output)])
+
+    report = json.loads((output / REPORT_FILE).read_text(encoding="utf-8"))
+    assert report["layers"] == 2 and 0.0 <= report["fast_agreement"] <= 1.0
+    assert 0.0 <= report["cascade_escalation_fraction"] <= 1.0
+    _, fast = load_classifier(str(output))
+    assert fast.config.num_hidden_layers == 2
+    assert "SENTIMENT_FAST_MODEL=" in capsys.readouterr().out
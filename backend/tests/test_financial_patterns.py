@@ -0,0 +1,42 @@
+"""
+Unit tests for the rule-based MONEY/PERCENT/DATE pass and entity merging
+"""
+from backend.services.financial_patterns import find_financial_entities, merge_entities
+
+
+def test_finds_amounts_percentages_dates_and_fiscal_periods():
+    text = ("Revenue rose 12.5% to $2.5 billion in Q3 2024, up 150 basis points. Net income was "
+            "USD 1,250,000 for fiscal year 2024 versus 5 million dollars on March 31, 2023 (FY23). "
+            "Item 2024 and A1234% are not entities.")
+    found = [(e["entity_group"], e["word"]) for e in find_financial_entities(text)]
+    assert found == [
+        ("PERCENT", "12.5%"), ("MONEY", "$2.5 billion"), ("DATE", "Q3 2024"),
+        ("PERCENT", "150 basis points"), ("MONEY", "USD 1,250,000"), ("DATE", "fiscal year 2024"),
+        ("MONEY", "5 million dollars"), ("DATE", "March 31, 2023"), ("DATE", "FY23"),
+    ]
+    for entity in find_financial_entities(text):
+        assert text[entity["start"]:entity["end"]] == entity["word"]
+
+
+def test_periods_do_not_overmatch_without_a_year():
+    text = ("The second half of the meeting covered fiscal 12 months of data, "
+            "not fiscal '24 or the first half of 2025.")
+    assert [e["word"] for e in find_financial_entities(text)] == [
+        "second half", "fiscal '24", "first half of 2025"
+    ]
+
+
+def test_span_range_is_respected():
+    text = "Up 5% in 2024. Down 3% in Q1 2025."
+    assert [e["word"] for e in find_financial_entities(text, 15, len(text))] == ["3%", "Q1 2025"]
+
+
+def test_merge_prefers_type_priority_then_longer_spans():
+    rules = [{"entity_group": "DATE", "word": "Q3 2024", "start": 10, "end": 17, "score": 1.0}]
+    model = [
+        {"entity_group": "MISC", "word": "Q3", "start": 10, "end": 12, "score": 0.6},
+        {"entity_group": "ORG", "word": "Apple", "start": 0, "end": 5, "score": 0.9},
+        {"entity_group": "ORG", "word": "Apple Inc", "start": 0, "end": 9, "score": 0.8},
+    ]
+    merged = merge_entities(rules, model)
+    assert [e["word"] for e in merged] == ["Apple Inc", "Q3 2024"]
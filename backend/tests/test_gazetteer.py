@@ -0,0 +1,70 @@
+"""
+Unit tests for the memory-mapped gazetteer matcher
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.services.gazetteer import Gazetteer, index_path
+
+GAZETTEER = """ticker|name
+AAPL|Apple Inc.
+MSFT|Microsoft Corporation
+BAC|Bank of America Corp
+IT|Gartner, Inc.
+BRK.B|Berkshire Hathaway Inc.
+"""
+
+
+def _open(tmp_path, **kwargs):
+    source = tmp_path / "listings.txt"
+    source.write_text(GAZETTEER, encoding="utf-8")
+    return Gazetteer.open(str(source), str(tmp_path / "index"), **kwargs)
+
+
+def test_names_and_tickers_in_context(tmp_path):
+    gazetteer = _open(tmp_path)
+    assert isinstance(gazetteer.vocab.base, np.memmap)
+    text = ("Apple (NASDAQ: AAPL) and Bank of America Corp. hired IT staff; "
+            "shares of $BRK.B rose while MICROSOFT CORPORATION and apple pie did not.")
+    found = [(e["entity_group"], e["word"], e["canonical"]) for e in gazetteer.find(text)]
+    assert found == [
+        ("ORG", "Apple", "Apple Inc."),
+        ("TICKER", "AAPL", "Apple Inc."),
+        ("ORG", "Bank of America Corp", "Bank of America Corp"),
+        ("TICKER", "BRK.B", "Berkshire Hathaway Inc."),
+        ("ORG", "MICROSOFT CORPORATION", "Microsoft Corporation"),
+    ]
+    for entity in gazetteer.find(text):
+        assert text[entity["start"]:entity["end"]] == entity["word"]
+
+
+def test_bare_tickers_and_index_reuse(tmp_path):
+    gazetteer = _open(tmp_path, bare_tickers=True)
+    assert [e["word"] for e in gazetteer.find("IT budgets grew at MSFT.")] == ["IT", "MSFT"]
+    meta_path = gazetteer.index_dir / "meta.json"
+    built = meta_path.stat().st_mtime_ns
+
+    # Unchanged source: the saved index is reused, not rebuilt
+    _open(tmp_path)
+    assert meta_path.stat().st_mtime_ns == built
+    assert _open(tmp_path).find("x", 0, 1) == []
+
+    # Changed source: a new index replaces the stale one
+    source = tmp_path / "listings.txt"
+    source.write_text(GAZETTEER + "NVDA|NVIDIA Corporation\n", encoding="utf-8")
+    updated = Gazetteer.open(str(source), str(tmp_path / "index"), bare_tickers=True)
+    assert [e["word"] for e in updated.find("NVDA and MSFT")] == ["NVDA", "MSFT"]
+    assert [p.name for p in (tmp_path / "index").iterdir()] == [updated.index_dir.name]
+
+
+def test_concurrent_builds_all_open_the_index(tmp_path):
+    source = tmp_path / "listings.txt"
+    source.write_text(GAZETTEER, encoding="utf-8")
+    index_dir = str(tmp_path / "index")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        opened = list(pool.map(lambda _: Gazetteer.open(str(source), index_dir), range(16)))
+    assert all(g.index_dir == index_path(str(source), index_dir) for g in opened)
+    assert all(g.find("Apple Inc. rose")[0]["canonical"] == "Apple Inc." for g in opened)
+    # Losing builders leave no temporary directories behind
+    assert [p.name for p in (tmp_path / "index").iterdir()] == [opened[0].index_dir.name]
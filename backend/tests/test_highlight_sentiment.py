@@ -0,0 +1,111 @@
+"""
+Tests for the shared sentiment highlighter and bulk re-rendering
+"""
+import gzip
+import json
+
+from backend.services import highlight_sentiment
+from backend.services.highlight_sentiment import apply_highlights, bulk_rerender, strip_highlights
+
+
+def _record(sentence, start, cls, score):
+    scores = {"positive": 0.0, "negative": 0.0, "neutral": 0.0, cls: score}
+    return {"sentence": sentence, "class": cls,
+            "position": {"start": start, "end": start + len(sentence)}, "confidence_scores": scores}
+
+
+def _span(color, text):
+    return f'<span data-finsight-sentiment style="background-color: {color};">{text}</span>'
+
+
+def test_repeated_sentences_highlight_the_right_occurrence():
+    html = "<p>Sales rose.</p><p>Sales rose.</p><p>AT&amp;T fell.</p>"
+    text = "Sales rose. Sales rose. AT&T fell."
+    result = apply_highlights(html, text, [(0, 11, None), (12, 23, "red"), (24, 34, "blue")])
+    assert result == (f"<p>Sales rose.</p><p>{_span('red', 'Sales rose.')}</p>"
+                      f"<p>{_span('blue', 'AT&amp;T fell.')}</p>")
+
+
+def test_offsets_map_across_tags_and_markdown():
+    html = ("<html><head><style>p { color: red; }</style></head><body><h1>Results</h1>"
+            "<p>Bad <b>news</b>\n  today. Costs fell.</p><ul><li>Margins rose.</li></ul>"
+            "</body></html>")
+    text = "# Results\n\nBad **news** today. Costs fell.\n\n- Margins [rose](http://x.io)."
+    bad, costs, margins = text.index("Bad"), text.index("Costs"), text.index("Margins")
+    result = apply_highlights(html, text, [(bad, costs - 1, "red"), (costs, costs + 11, None),
+                                           (margins, len(text), "blue")])
+    assert strip_highlights(result) == html
+    assert result.count("<span") == 4
+    # A sentence crossing an inline tag gets one span per text run
+    assert (f"<p>{_span('red', 'Bad ')}<b>{_span('red', 'news')}</b>"
+            f"{_span('red', chr(10) + '  today.')} Costs fell.</p>") in result
+    assert f"<li>{_span('blue', 'Margins rose.')}</li>" in result
+
+
+def test_sentences_missing_from_the_html_are_skipped():
+    html = "<p>Only this.</p>" + "<p>filler</p>" * 200
+    text = "Not in the document at all. " * 50 + "Only this."
+    spans = [(i * 28, i * 28 + 27, "red") for i in range(50)] + [(1400, 1410, "blue")]
+    result = apply_highlights(html, text, spans)
+    assert result.count("<span") == 1 and 'blue;">Only this.</span>' in result
+
+
+def test_strip_highlights_keeps_other_spans():
+    html = ('<p><span style="background-color: rgb(255, 100, 100);">'
+            'Bad <span class="x">news</span>.</span></p>')
+    assert strip_highlights(html) == '<p>Bad <span class="x">news</span>.</p>'
+
+
+def test_strip_highlights_matches_the_marker_not_the_colour():
+    highlighted = apply_highlights("<p>Bad news. Good news.</p>", "Bad news. Good news.",
+                                   [(0, 9, "hsl(0, 80%, 70%)"), (10, 20, "#9f9")])
+    assert strip_highlights(highlighted) == "<p>Bad news. Good news.</p>"
+    # Re-serialised markup keeps the marker as an empty attribute
+    assert strip_highlights('<span class="h" data-finsight-sentiment="">x</span>') == "x"
+    # Spans that merely look like highlights are left alone
+    other = ('<span style="background-color: #9f9;">x</span>'
+             '<span data-finsight-sentiment-note="1">y</span>')
+    assert strip_highlights(other) == other
+
+
+def test_bulk_rerender_skips_unchanged_pairs(tmp_path, monkeypatch):
+    results = [_record("Profit grew.", 0, "positive", 1.0),
+               _record("Costs fell.", 13, "neutral", 1.0)]
+    (tmp_path / "a_sentiment.json").write_text(json.dumps(results), encoding="utf-8")
+    html_path = tmp_path / "a_sentiment.html"
+    html_path.write_text("<p>Profit grew. Costs fell.</p>", encoding="utf-8")
+
+    assert bulk_rerender(str(tmp_path), workers=2)["rendered"] == 1
+    first = html_path.read_text(encoding="utf-8")
+    assert first == f"<p>{_span('rgb(100, 255, 100)', 'Profit grew.')} Costs fell.</p>"
+    assert bulk_rerender(str(tmp_path), workers=2) == {"rendered": 0, "skipped": 1, "failed": 0}
+
+    # A new colour scheme re-renders over the old highlights
+    monkeypatch.setattr(highlight_sentiment, "HIGHLIGHT_VERSION", "test")
+    monkeypatch.setattr(highlight_sentiment, "get_highlight_color",
+                        lambda cls, scores: "#010203" if cls != "neutral" else None)
+    assert bulk_rerender(str(tmp_path), workers=1)["rendered"] == 1
+    assert html_path.read_text(encoding="utf-8") == (
+        f"<p>{_span('#010203', 'Profit grew.')} Costs fell.</p>"
+    )
+
+
+def test_bulk_rerender_handles_gzip_pairs_and_bad_records(tmp_path):
+    results = [_record("Profit grew.", 0, "positive", 1.0)]
+    (tmp_path / "a_sentiment.json.gz").write_bytes(gzip.compress(json.dumps(results).encode()))
+    html_path = tmp_path / "a_sentiment.html.gz"
+    html_path.write_bytes(gzip.compress(b"<p>Profit grew.</p>"))
+    # Well-formed JSON of the wrong shape fails its pair, not the run
+    (tmp_path / "b_sentiment.json").write_text(json.dumps({"sentence": "x"}), encoding="utf-8")
+    (tmp_path / "b_sentiment.html").write_text("<p>x</p>", encoding="utf-8")
+    (tmp_path / "c_sentiment.json").write_text(json.dumps(["x"]), encoding="utf-8")
+    (tmp_path / "c_sentiment.html").write_text("<p>x</p>", encoding="utf-8")
+
+    assert bulk_rerender(str(tmp_path), workers=2) == {"rendered": 1, "skipped": 0, "failed": 2}
+    rendered = gzip.decompress(html_path.read_bytes()).decode()
+    assert rendered == f"<p>{_span('rgb(100, 255, 100)', 'Profit grew.')}</p>"
+    assert bulk_rerender(str(tmp_path), workers=1)["skipped"] == 1
+
+    # A truncated manifest re-renders everything instead of crashing
+    (tmp_path / highlight_sentiment.MANIFEST_FILE).write_text('{"a', encoding="utf-8")
+    assert bulk_rerender(str(tmp_path), workers=1)["rendered"] == 1
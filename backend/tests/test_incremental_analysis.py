@@ -0,0 +1,24 @@
+"""
+Unit tests for incremental re-analysis helpers
+"""
+from backend.services.incremental_analysis import entities_by_span, match_segments, split_paragraphs
+
+
+def test_split_paragraphs_skips_blank_runs():
+    text = "First para.\n\n  \n\nSecond para.\nStill second.\n\n"
+    spans = split_paragraphs(text)
+    assert [text[start:end] for start, end in spans] == [
+        "First para.", "Second para.\nStill second."
+    ]
+
+
+def test_match_segments_finds_unchanged_segments_anywhere():
+    old = ["Intro.", "Revenue was $5M.", "Outlook is stable."]
+    new = ["Intro.", "Revenue was $6M.", "Outlook is stable.", "Intro."]
+    assert match_segments(old, new) == [0, None, 2, 0]
+
+
+def test_entities_by_span_drops_entities_crossing_paragraphs():
+    spans = [(0, 10), (12, 30)]
+    entities = [{"start": 0, "end": 5}, {"start": 8, "end": 14}, {"start": 20, "end": 25}]
+    assert entities_by_span(entities, spans) == [[entities[0]], [entities[2]]]
@@ -0,0 +1,202 @@
+"""
+Endpoint tests for the LangExtract service (offline stub provider)
+"""
+import asyncio
+import json
+import time
+
+from backend.services.extraction_executor import MeteredExecutor
+from backend.services.extraction_providers import StubProvider
+
+EXAMPLES = [{"text": "Alpha paid $5 million.", "extractions": [
+    {"extraction_class": "amount", "extraction_text": "$5 million",
+     "attributes": {"unit": "million"}}
+]}]
+
+
+def _batch(documents):
+    return {"documents": [{"id": f"doc-{i}", "text": text} for i, text in enumerate(documents)],
+            "prompt_description": "Extract amounts", "examples": EXAMPLES, "model_id": "stub-model"}
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class CountingProvider(StubProvider):
+    """Stub that counts prompt compilations and fails documents containing "FAIL"."""
+
+    def __init__(self):
+        super().__init__()
+        self.prepared = 0
+
+    def prepare(self, examples):
+        self.prepared += 1
+        return super().prepare(examples)
+
+    def extract(self, text, prompt, prepared_examples, model_id):
+        if "FAIL" in text:
+            raise ValueError("provider exploded")
+        return super().extract(text, prompt, prepared_examples, model_id)
+
+
+def test_batch_streams_ndjson_events_and_compiles_prompt_once(
+    langextract_service, langextract_client, monkeypatch
+):
+    provider = CountingProvider()
+    monkeypatch.setattr(langextract_service, "extraction_provider", provider)
+    documents = ["Beta paid $7 million.", "FAIL here.", "Gamma paid $9 million."]
+
+    response = langextract_client.post("/extract/batch", json=_batch(documents))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson(response)
+
+    assert [e["event"] for e in events] == ["start", "document", "document", "document", "done"]
+    assert events[0]["documents"] == 3
+    by_id = {e["id"]: e for e in events[1:-1]}
+    assert [e["extraction_text"] for e in by_id["doc-0"]["extractions"]] == ["$7 million"]
+    assert by_id["doc-1"]["success"] is False and by_id["doc-1"]["status_code"] == 500
+    assert "provider exploded" in by_id["doc-1"]["detail"]
+    assert by_id["doc-2"]["success"] is True
+    assert events[-1]["succeeded"] == 2 and events[-1]["failed"] == 1
+    assert provider.prepared == 1
+
+
+def test_batch_sse_framing(langextract_client):
+    response = langextract_client.post(
+        "/extract/batch?stream_format=sse", json=_batch(["Beta paid $7 million."])
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert [frame.split("\n")[0] for frame in frames] == [
+        "event: start", "event: document", "event: done"
+    ]
+    assert json.loads(frames[1].split("\n")[1][len("data: "):])["success"] is True
+
+
+def test_batch_unavailable_provider_is_503(langextract_service, langextract_client, monkeypatch):
+    monkeypatch.setattr(langextract_service.extraction_provider, "requires_api_key", True)
+    monkeypatch.setattr(langextract_service, "API_KEY", "")
+    response = langextract_client.post("/extract/batch", json=_batch(["Beta paid $7 million."]))
+    assert response.status_code == 503
+    assert "API key" in response.json()["detail"]
+
+
+def test_split_into_chunks_overlaps_at_word_boundaries(langextract_service):
+    text = " ".join(f"word{i}" for i in range(400))
+    chunks = langextract_service.split_into_chunks(text, chunk_size=500, overlap=100)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(text)
+    for (start, end), (next_start, _) in zip(chunks, chunks[1:]):
+        assert end - start <= 500
+        assert start < next_start < end and end - next_start <= 100  # Overlap, within the limit
+        assert text[next_start - 1] == " " and text[end - 1] == " "  # Never inside a word
+
+
+def test_merge_remaps_offsets_and_drops_overlap_duplicates(langextract_service):
+    from backend.services.stub_models import StubAnnotatedDocument, StubExtraction
+
+    text = "Alpha paid $5 million. Beta paid $7 million. Gamma paid $9 million."
+    first, second = (0, 45), (23, len(text))  # "Beta paid $7 million." is in both
+
+    def chunk(start, end):
+        chunk_text = text[start:end]
+        return start, StubAnnotatedDocument(chunk_text, [
+            StubExtraction("amount", amount)
+            for amount in ("$5 million", "$7 million", "$9 million")
+            if amount in chunk_text
+        ])
+
+    merged = langextract_service.merge_chunk_extractions(text, [chunk(*first), chunk(*second)])
+    assert [e["extraction_text"] for e in merged] == ["$5 million", "$7 million", "$9 million"]
+    for extraction in merged:
+        interval = extraction["char_interval"]
+        assert text[interval["start_pos"]:interval["end_pos"]] == extraction["extraction_text"]
+
+
+def test_failed_chunks_give_a_partial_result(langextract_service, langextract_client, monkeypatch):
+    monkeypatch.setattr(langextract_service, "extraction_provider", CountingProvider())
+    sentences = [f"Company {i} paid ${i} million." for i in range(400)]
+    sentences[200] = "FAIL here."
+    text = " ".join(sentences)
+
+    response = langextract_client.post("/extract", json={
+        "text": text, "prompt_description": "Extract amounts", "examples": EXAMPLES,
+        "model_id": "stub-model",
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["partial"] is True and body["chunks"] > 2
+    [failed] = body["failed_chunks"]
+    assert failed["start"] <= text.index("FAIL") < failed["end"]
+    assert "provider exploded" in failed["error"]
+    found = {e["extraction_text"] for e in body["extractions"]}
+    assert "$0 million" in found and "$399 million" in found
+    # Amounts only in the failed chunk are missing
+    assert all(
+        text[e["start_char"]:e["end_char"]] == e["extraction_text"] for e in body["extractions"]
+    )
+    assert len(found) < 400
+
+
+class SlowProvider(StubProvider):
+    """Stub whose every call takes ``seconds``."""
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.seconds = seconds
+
+    def extract(self, text, prompt, prepared_examples, model_id):
+        time.sleep(self.seconds)
+        return super().extract(text, prompt, prepared_examples, model_id)
+
+
+def test_batch_chunks_wait_behind_interactive_ones_without_timing_out(
+    langextract_service, langextract_client, monkeypatch
+):
+    provider = SlowProvider(0.2)
+    monkeypatch.setattr(langextract_service, "extraction_provider", provider)
+    monkeypatch.setattr(langextract_service, "extraction_executor", MeteredExecutor(1))
+    monkeypatch.setattr(langextract_service, "EXTRACTION_TIMEOUT", 0.9)
+    prepared = provider.prepare(EXAMPLES)
+
+    def extract(priority):
+        return langextract_service.run_chunked_extraction(
+            "Beta paid $7 million.", "Extract amounts", prepared, "stub-model", priority=priority)
+
+    async def main():
+        # Four interactive calls (0.8s of work) are admitted ahead of the batch chunk,
+        # which then waits longer than EXTRACTION_TIMEOUT before its own call starts
+        interactive = [asyncio.create_task(extract("interactive")) for _ in range(4)]
+        batch = asyncio.create_task(extract("batch"))
+        return await asyncio.gather(*interactive, batch)
+
+    results = asyncio.run(main())
+    assert all(not failed and extractions for extractions, _, failed in results)
+    assert langextract_service.extraction_executor.stats()["timed_out"] == 0
+
+
+def test_a_provider_call_over_the_timeout_fails_its_chunk(langextract_service, langextract_client,
+                                                          monkeypatch):
+    provider = SlowProvider(0.5)
+    monkeypatch.setattr(langextract_service, "extraction_provider", provider)
+    monkeypatch.setattr(langextract_service, "extraction_executor", MeteredExecutor(1))
+    monkeypatch.setattr(langextract_service, "EXTRACTION_TIMEOUT", 0.1)
+    response = langextract_client.post("/extract/batch", json=_batch(["Beta paid $7 million."]))
+    document = _ndjson(response)[1]
+    assert document["success"] is False and document["status_code"] == 504
+
+
+def test_repeated_extraction_is_served_from_the_cache(langextract_service, langextract_client,
+                                                      monkeypatch, tmp_path):
+    from backend.services.extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(str(tmp_path / "extraction-cache"), ttl_seconds=None, max_bytes=1 << 20)
+    monkeypatch.setattr(langextract_service, "extraction_cache", cache)
+    request = {"text": "Beta paid $7 million.", "prompt_description": "Extract amounts",
+               "examples": EXAMPLES, "model_id": "stub-model"}
+
+    first = langextract_client.post("/extract", json=request).json()
+    second = langextract_client.post("/extract", json=request).json()
+    assert (first["cache"], second["cache"]) == ("miss", "hit")
+    assert second["extractions"] == first["extractions"]
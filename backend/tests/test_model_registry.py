@@ -0,0 +1,81 @@
+"""
+Unit tests for the lazily loaded, LRU-evicted model registry
+"""
+import pytest
+
+from backend.services.model_registry import ModelRegistry, parse_model_specs
+
+MB = 1024 * 1024
+
+
+def _registry(budget_mb=0):
+    loads = []
+
+    def loader(source):
+        loads.append(source)
+        return {"source": source}
+
+    specs = {"base": "org/base", "small": "org/small", "tiny": "/models/tiny"}
+    registry = ModelRegistry(
+        specs, "base", loader, memory_budget_bytes=budget_mb * MB, size_of=lambda m: 100 * MB
+    )
+    return registry, loads
+
+
+def test_parse_model_specs():
+    specs = parse_model_specs(" distil=org/distil, /models/tiny/ ,", "finbert", "ProsusAI/finbert")
+    assert specs == {
+        "finbert": "ProsusAI/finbert", "distil": "org/distil", "tiny": "/models/tiny/",
+    }
+
+
+def test_lazy_load_selection_and_latency_stats():
+    registry, loads = _registry()
+    assert loads == [] and not registry.is_loaded()
+    with registry.use(items=4) as model:
+        assert model == {"source": "org/base"}
+    with registry.use("small") as model:
+        assert model == {"source": "org/small"}
+    with registry.use("small"):
+        pass
+    assert loads == ["org/base", "org/small"]
+
+    stats = registry.stats()["models"]
+    assert stats["base"]["calls"] == 1 and stats["base"]["items"] == 4
+    assert stats["small"]["calls"] == 2 and stats["small"]["latency_ms"]["p95"] >= 0
+    assert stats["tiny"]["loaded"] is False and stats["tiny"]["latency_ms"] is None
+    with pytest.raises(KeyError):
+        registry.resolve("missing")
+
+
+def test_lru_eviction_skips_default_and_in_flight_models():
+    registry, loads = _registry(budget_mb=250)
+    registry.load()
+    with registry.use("small"):
+        # Over budget, but "base" is the default, "small" is in flight and "tiny" was just loaded
+        registry.load("tiny")
+        assert all(registry.is_loaded(name) for name in ("base", "small", "tiny"))
+    # Released: the least recently used idle model goes
+    assert not registry.is_loaded("small") and registry.is_loaded("tiny")
+    assert registry.stats()["models"]["small"]["evictions"] == 1
+    assert registry.stats()["memory_used_mb"] <= 250
+
+    with registry.use("small"):
+        pass
+    assert loads.count("org/small") == 2 and not registry.is_loaded("tiny")
+
+
+def test_hot_swap_keeps_in_flight_requests_on_their_model():
+    registry, loads = _registry(budget_mb=250)
+    name = registry.resolve()
+    with registry.use(name) as old_model:
+        registry.set_default("small")
+        assert registry.resolve() == "small"
+        assert old_model == {"source": "org/base"}  # Still usable mid-request
+    assert registry.is_loaded("small")
+
+    registry.register("distil", "org/distil")
+    registry.set_default("distil")
+    assert registry.stats()["default"] == "distil"
+    with pytest.raises(ValueError):
+        registry.register("distil", "org/other")
@@ -0,0 +1,46 @@
+"""
+Unit tests for sentence-segmented, batched NER
+"""
+from backend.services.ner_segments import pack_segments, run_segments
+from backend.services.stub_models import StubNERPipeline
+
+
+def test_pack_segments_keeps_sentences_whole():
+    text = "Alpha rose. Beta fell sharply. Gamma held. Delta was flat."
+    segments = pack_segments(text, 0, len(text), max_chars=32)
+    assert [text[start:end] for start, end in segments] == [
+        "Alpha rose. Beta fell sharply.", "Gamma held. Delta was flat."
+    ]
+
+
+def test_pack_segments_splits_overlong_sentences_at_whitespace():
+    text = "Intro. " + "word " * 30 + "end."
+    segments = pack_segments(text, 7, len(text), max_chars=40)
+    assert all(end - start <= 40 for start, end in segments)
+    assert segments[0][0] == 7 and segments[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(segments, segments[1:]))
+
+
+def test_run_segments_returns_document_offsets():
+    text = "Revenue grew at Apple Inc. this year. Then, Tim Cook met Goldman Sachs. Shares rose."
+    segments = pack_segments(text, 0, len(text), max_chars=40)
+    entities = run_segments(StubNERPipeline(), text, segments, batch_size=2)
+    expected = ["Apple Inc", "Tim Cook", "Goldman Sachs"]
+    assert [text[e["start"]:e["end"]] for e in entities] == expected
+    assert [e["word"] for e in entities] == expected
+
+
+def test_pack_segments_by_tokens_keeps_number_dense_text_in_budget(tmp_path):
+    from transformers import BertTokenizerFast
+
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "revenue", "was", "$", ",", "."]
+                               + [str(d) for d in range(10)]), encoding="utf-8")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+    # ~1 token per character: 200 characters is far more than 40 tokens
+    text = "Revenue was $1,234,567. " * 8 + "1,2,3,4,5,6,7,8,9 " * 6 + "end."
+    segments = pack_segments(text, 0, len(text), max_chars=200, tokenizer=tokenizer, max_tokens=40)
+    counts = [len(tokenizer(text[s:e], add_special_tokens=False)["input_ids"]) for s, e in segments]
+    assert max(counts) <= 40 and len(segments) > 1
+    assert segments[0][0] == 0 and segments[-1][1] == len(text)
+    assert text[segments[0][0]:segments[0][1]].endswith(".")
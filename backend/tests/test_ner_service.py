@@ -0,0 +1,69 @@
+"""
+Endpoint tests for the NER service (offline stub pipeline)
+"""
+# Paragraphs start lowercase: the stub tags any capitalized word after a blank line
+OLD = "revenue grew at Apple Inc. this year.\n\nthen Tim Cook met Goldman Sachs on 5 March 2024."
+NEW = ("an opening paragraph about Morgan Stanley.\n\n" + OLD.replace("this year", "this quarter")
+       + "\n\nlater Jane Doe joined Acme Corp.")
+
+
+def _recognize(client, text, **fields):
+    response = client.post("/recognize", json={"text": text, "output": "mentions", **fields})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_incremental_run_matches_full_run(ner_client):
+    previous = _recognize(ner_client, OLD)
+    incremental = _recognize(ner_client, NEW, previous_hash=previous["content_hash"])
+    assert incremental["incremental"]["reused"] == 1
+    assert incremental["incremental"]["recomputed"] == 3
+
+    full = _recognize(ner_client, NEW)
+    assert incremental["entities"] == full["entities"]
+    assert "Goldman Sachs" in [NEW[e["start"]:e["end"]] for e in incremental["entities"]]
+
+
+def test_unknown_previous_hash_falls_back_to_full_run(ner_client):
+    result = _recognize(ner_client, NEW, previous_hash="0" * 64)
+    assert result["incremental"]["previous_found"] is False
+    assert result["incremental"]["recomputed"] == 4
+    assert result["entities"] == _recognize(ner_client, NEW)["entities"]
+
+
+def test_index_output_omits_mentions_and_html(ner_client):
+    response = ner_client.post(
+        "/recognize", json={"text": OLD + " Apple Inc. again.", "output": "index"}
+    ).json()
+    assert "entities" not in response and "highlighted_html" not in response
+    apple = next(entry for entry in response["entity_index"] if entry["text"] == "Apple Inc")
+    assert apple["count"] == 2
+
+
+def test_sentences_are_packed_by_the_pipelines_tokenizer(ner_service, ner_client, monkeypatch,
+                                                          tmp_path):
+    from transformers import BertTokenizerFast
+
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "revenue", "was", "$", ",", "."]
+                               + [str(d) for d in range(10)]), encoding="utf-8")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+    name = ner_service.models.load(None)
+    with ner_service.models.use(name, items=0) as ner_pipeline:
+        monkeypatch.setattr(ner_pipeline, "tokenizer", tokenizer, raising=False)
+    monkeypatch.setattr(ner_service, "NER_SEGMENT_MAX_TOKENS", 40)
+    packed = []
+    run_segments = ner_service.run_segments
+
+    def recording_run_segments(pipe, text, segments, batch_size):
+        packed.extend(segments)
+        return run_segments(pipe, text, segments, batch_size)
+
+    monkeypatch.setattr(ner_service, "run_segments", recording_run_segments)
+    items = ner_client.get("/models").json()["models"][name]["items"]
+
+    text = "revenue was $1,234,567. " * 8
+    _recognize(ner_client, text, mode="sentence")
+    counts = [len(tokenizer(text[s:e], add_special_tokens=False)["input_ids"]) for s, e in packed]
+    assert len(packed) > 1 and max(counts) <= 40
+    assert ner_client.get("/models").json()["models"][name]["items"] == items + len(packed)
@@ -0,0 +1,55 @@
+"""
+Unit tests for the hashed n-gram neutral pre-filter
+"""
+import json
+import random
+
+import numpy as np
+
+from backend.services.neutral_prefilter import NeutralPrefilter, featurize, read_scored_rows
+
+FILLER = ("the company board fiscal year ended december segment report filed section shares "
+          "common stock").split()
+POLAR = ["growth", "strong", "record", "loss", "impairment", "decline"]
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(5, 12))]
+        polar = rng.random() < 0.3
+        if polar:
+            words.insert(rng.randrange(len(words)), rng.choice(POLAR))
+        label = "positive" if polar else "neutral"
+        rows.append({"sentence": " ".join(words) + ".", "class": label})
+    return rows
+
+
+def test_featurize_is_stable_and_collapses_numbers():
+    ids = featurize("Revenue was $5.2 million in 2024.")
+    assert np.array_equal(ids, featurize("revenue was $7 million in 1999."))
+    assert np.array_equal(ids, np.unique(ids)) and len(featurize("")) == 0
+
+
+def test_train_calibrate_and_round_trip(tmp_path):
+    path = tmp_path / "finbert.jsonl"
+    path.write_text("".join(json.dumps(row) + "\n" for row in _rows(3000)), encoding="utf-8")
+    sentences, neutral = read_scored_rows([str(path)])
+    model = NeutralPrefilter.train(sentences, neutral, epochs=2)
+
+    test = _rows(1000, seed=1)
+    p_neutral = model.predict([row["sentence"] for row in test] + [""])
+    test_neutral = np.array([row["class"] == "neutral" for row in test])
+    assert p_neutral[:-1][test_neutral].mean() > 0.9 > p_neutral[:-1][~test_neutral].mean()
+
+    # Higher recall targets skip fewer sentences and keep the target on new data
+    assert model.threshold(0.9) <= model.threshold(0.99)
+    skipped = p_neutral[:-1] > model.threshold(0.99)
+    assert (skipped & ~test_neutral).sum() <= 0.02 * (~test_neutral).sum()
+    assert skipped.mean() > 0.5
+
+    model.save(str(tmp_path / "prefilter.npz"))
+    loaded = NeutralPrefilter.load(str(tmp_path / "prefilter.npz"))
+    assert np.allclose(loaded.predict(sentences[:50]), model.predict(sentences[:50]))
+    assert loaded.stats()["train_sentences"] == model.meta["train_sentences"]
@@ -0,0 +1,37 @@
+"""
+Unit tests for the converter's background output writer
+"""
+import asyncio
+import gzip
+
+from backend.services.output_writer import OutputWriter, safe_stem
+
+
+def test_content_hash_names_and_compression(tmp_path):
+    writer = OutputWriter(str(tmp_path), queue_size=2)
+
+    async def submit_all():
+        files = {"text": (".txt", "one"), "markdown": (".md", "# one")}
+        first = await writer.submit("report", files)
+        second = await writer.submit("report", {"text": (".txt", "two")})
+        again = await writer.submit("report", files)
+        packed = await writer.submit("report", files, compress=True)
+        return first, second, again, packed
+
+    first, second, again, packed = asyncio.run(submit_all())
+    writer.close()
+
+    assert first["text"][:-4] == first["markdown"][:-3]
+    assert first["text"] != second["text"]
+    assert again["text"] == first["text"]
+    assert packed["text"] == first["text"] + ".gz"
+    assert open(first["text"], encoding="utf-8").read() == "one"
+    assert gzip.decompress(open(packed["text"], "rb").read()) == b"one"
+    stats = writer.stats()
+    assert stats["written"] == 5 and stats["skipped_existing"] == 2 and stats["queued"] == 0
+
+
+def test_safe_stem():
+    assert safe_stem("Q3 report (final).pdf") == "Q3_report_final"
+    assert safe_stem("../../etc/passwd") == "passwd"
+    assert safe_stem("") == "document"
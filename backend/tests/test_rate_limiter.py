@@ -0,0 +1,80 @@
+"""
+Unit tests for the LLM rate-limit scheduler
+"""
+import asyncio
+
+import pytest
+
+from backend.services.extraction_providers import ProviderThrottledError, StubProvider
+from backend.services.rate_limiter import (
+    PRIORITIES, ModelLimiter, RateLimitScheduler, is_throttle_error,
+)
+
+
+def test_interactive_requests_jump_ahead_of_batch():
+    # One request per 0.05s, no burst
+    limiter = ModelLimiter(requests_per_minute=1200, tokens_per_minute=0, request_burst=1)
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(1, PRIORITIES[priority])
+        order.append(name)
+
+    async def main():
+        await limiter.acquire(1)  # drain the bucket
+        batch = [asyncio.create_task(request(f"batch{i}", "batch")) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", "interactive"))
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(main())
+    assert order[0] == "interactive"
+    assert order[1:] == ["batch0", "batch1", "batch2"]
+    assert limiter.stats()["max_queue_wait_seconds"] > 0
+
+
+def test_token_budget_limits_throughput():
+    limiter = ModelLimiter(requests_per_minute=0, tokens_per_minute=6000, token_burst=100)
+
+    async def main():
+        return [await limiter.acquire(100) for _ in range(3)]
+
+    waits = asyncio.run(main())
+    assert waits[0] < 0.01
+    # 100 tokens refill in 1s at 6000/min
+    assert 0.8 < waits[1] < 1.5
+
+
+def test_throttle_detection_and_stub_quota():
+    assert is_throttle_error(ProviderThrottledError("quota"))
+    assert is_throttle_error(RuntimeError("429 RESOURCE_EXHAUSTED"))
+    assert not is_throttle_error(RuntimeError("invalid argument"))
+
+    provider = StubProvider(quota_rpm=2)
+    examples = provider.prepare([])
+    provider.extract("a", "p", examples, "m")
+    provider.extract("b", "p", examples, "m")
+    with pytest.raises(ProviderThrottledError):
+        provider.extract("c", "p", examples, "m")
+
+
+def test_backoff_pauses_the_model():
+    limiter = ModelLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    async def main():
+        delay = await limiter.backoff(attempt=2, base_delay=0.05, max_delay=1)
+        waited = await limiter.acquire(1)
+        return delay, waited
+
+    delay, waited = asyncio.run(main())
+    assert 0 <= delay <= 0.2
+    assert waited >= delay - 0.01
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_parse_model_limits():
+    limits = RateLimitScheduler.parse_limits("gemini-2.0-flash-exp=15:1000000, other=60")
+    assert limits == {"gemini-2.0-flash-exp": (15.0, 1000000.0), "other": (60.0, 0.0)}
+    scheduler = RateLimitScheduler(30, 0, limits)
+    assert scheduler.limiter("other").requests.rate == 1.0
+    assert scheduler.limiter("unknown").requests.rate == 0.5
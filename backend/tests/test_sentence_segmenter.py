@@ -0,0 +1,59 @@
+"""
+Unit tests for the shared sentence segmenter
+"""
+from backend.services.sentence_segmenter import segment_sentences
+
+
+def sentences(text):
+    starts, ends = segment_sentences(text)
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+def test_abbreviations_and_decimals_do_not_split():
+    text = "Apple Inc. reported revenue of $3.5 bn. The U.S. market was flat."
+    assert sentences(text) == [
+        "Apple Inc. reported revenue of $3.5 bn.",
+        "The U.S. market was flat.",
+    ]
+
+
+def test_offsets_point_into_original_text():
+    text = "  First sentence!   Second one?\nThird."
+    starts, ends = segment_sentences(text)
+    assert starts.dtype.kind == "i"
+    assert [text[s:e] for s, e in zip(starts, ends)] == ["First sentence!", "Second one?", "Third."]
+
+
+def test_markdown_bullets_headings_and_tables():
+    text = (
+        "## Results\n\n"
+        "- Revenue grew 5%\n"
+        "1. Margins fell\n\n"
+        "| Metric | Value |\n"
+        "|---|---|\n"
+        "| EPS | $1.52 |\n"
+    )
+    assert sentences(text) == [
+        "Results",
+        "Revenue grew 5%",
+        "Margins fell",
+        "| Metric | Value |",
+        "| EPS | $1.52 |",
+    ]
+
+
+def test_empty_text():
+    starts, ends = segment_sentences("   \n ")
+    assert len(starts) == 0 and len(ends) == 0
+
+
+def test_long_whitespace_runs_stay_linear():
+    import time
+
+    started = time.perf_counter()
+    for padding in (" ", "\t"):
+        text = "x" + padding * 100_000 + "x"
+        assert sentences(text) == [text]
+    assert sentences("x" + " " * 100_000 + "\n\n" + "y") == ["x", "y"]
+    # Quadratic scanning took minutes on these inputs
+    assert time.perf_counter() - started < 2.0
@@ -0,0 +1,87 @@
+"""
+Tests for the offline sentiment batch runner (stub model, no weights needed)
+"""
+import json
+import os
+
+import pytest
+
+from backend.services.sentiment_analysis import ParquetSink, collect_files, main
+
+
+def test_collect_files_expands_directories_and_globs(tmp_path):
+    (tmp_path / "a.txt").write_text("One.", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.md").write_text("Two.", encoding="utf-8")
+    (tmp_path / "sub" / "c.pdf").write_text("skip", encoding="utf-8")
+
+    assert [p.rsplit("/", 1)[-1] for p in collect_files([str(tmp_path)])] == ["a.txt", "b.md"]
+    assert len(collect_files([str(tmp_path / "**" / "*.md"), str(tmp_path / "a.txt")])) == 2
+
+
+def test_jsonl_run_resumes_from_checkpoint(tmp_path, capsys):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "q1.txt").write_text("Revenue grew strongly. The board met.", encoding="utf-8")
+    (corpus / "q2.txt").write_text("Losses increased due to impairment.", encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+
+    main([str(corpus), "--output", str(output), "--workers", "2", "--stub"])
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) == 3
+    by_sentence = {row["sentence"]: row for row in rows}
+    assert by_sentence["Revenue grew strongly."]["class"] == "positive"
+    assert by_sentence["Losses increased due to impairment."]["class"] == "negative"
+
+    (corpus / "q3.txt").write_text("The meeting was held.", encoding="utf-8")
+    main([str(corpus), "--output", str(output), "--workers", "2", "--stub"])
+    assert "2 already done, 1 to analyze" in capsys.readouterr().out
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 4
+
+
+def test_resume_after_crash_between_sink_and_checkpoint(tmp_path, capsys):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "q1.txt").write_text("Revenue grew strongly. The board met.", encoding="utf-8")
+    (corpus / "q2.txt").write_text("Losses increased due to impairment.", encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    checkpoint = tmp_path / "results.jsonl.checkpoint"
+    main([str(corpus), "--output", str(output), "--workers", "1", "--stub"])
+    expected = sorted(output.read_text(encoding="utf-8").splitlines())
+
+    # Crash after the last file's rows reached the sink (the last one cut off
+    # mid-line) but before its checkpoint line was complete
+    lines = checkpoint.read_text(encoding="utf-8").splitlines()
+    checkpoint.write_text(lines[0] + "\n" + lines[1][:5], encoding="utf-8")
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"file": ')
+
+    main([str(corpus), "--output", str(output), "--workers", "1", "--stub"])
+    captured = capsys.readouterr()
+    assert "1 already done, 1 to analyze" in captured.out and "Dropping" in captured.err
+    assert sorted(output.read_text(encoding="utf-8").splitlines()) == expected
+    assert sorted(checkpoint.read_text(encoding="utf-8").splitlines()) == sorted(lines)
+
+
+def test_parquet_parts_appear_only_when_complete(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    sink = ParquetSink(str(tmp_path / "out.parquet"), files_per_part=1)
+    assert sink.write([{"file": "a.txt", "sentence": "One."}])
+    [part] = (tmp_path / "out.parquet").iterdir()
+    assert pq.read_table(part).to_pylist() == [{"file": "a.txt", "sentence": "One."}]
+
+    # A crash while the part is being written leaves nothing behind
+    def write_then_crash(table, where, **kwargs):
+        if isinstance(where, (str, os.PathLike)):
+            with open(where, "wb") as f:
+                f.write(b"PAR1")
+        else:
+            where.write(b"PAR1")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(pq, "write_table", write_then_crash)
+    with pytest.raises(KeyboardInterrupt):
+        sink.write([{"file": "b.txt", "sentence": "Two."}])
+    assert [p.name for p in (tmp_path / "out.parquet").iterdir()] == [part.name]
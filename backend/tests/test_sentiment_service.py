@@ -0,0 +1,95 @@
+"""
+Endpoint tests for the sentiment service (offline stub model)
+"""
+import json
+
+import numpy as np
+
+from backend.services.neutral_prefilter import NUM_FEATURES, NeutralPrefilter
+
+TEXT = "Revenue grew strongly. The board met in March. Losses widened sharply."
+
+
+def test_low_prefilter_threshold_still_labels_skipped_sentences_neutral(
+    sentiment_service, sentiment_client, monkeypatch
+):
+    # P(neutral) = 0.25 for every sentence, above a 0.1 skip threshold
+    weights = np.zeros(NUM_FEATURES, dtype=np.float32)
+    calibration = np.array([0.1, 0.2], dtype=np.float32)
+    model = NeutralPrefilter(weights, float(np.log(0.25 / 0.75)), calibration)
+    monkeypatch.setattr(sentiment_service, "prefilter", model)
+
+    response = sentiment_client.post(
+        "/analyze", json={"text": TEXT, "prefilter": True, "prefilter_recall": 0.0}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["prefilter"]["prefiltered"] == 3
+    for record in body["sentiment_results"]:
+        assert record["prefiltered"] and record["class"] == "neutral"
+        assert abs(sum(record["confidence_scores"].values()) - 1.0) < 1e-6
+
+
+def test_default_model_switch_accepts_only_registered_models(
+    sentiment_service, sentiment_client, monkeypatch
+):
+    monkeypatch.setattr(sentiment_service.models, "default", sentiment_service.models.default)
+    assert sentiment_client.post("/models/default", json={"name": "missing"}).status_code == 400
+    response = sentiment_client.post("/models/default", json={"name": "x", "source": "/tmp/x"})
+    assert response.status_code == 422
+
+    response = sentiment_client.post("/models/default", json={"name": "finbert"})
+    assert response.status_code == 200 and response.json()["default"] == "finbert"
+    assert sentiment_client.get("/models").json()["models"]["finbert"]["loaded"]
+
+
+def test_fast_tier_rejects_an_explicit_model(sentiment_service, sentiment_client, monkeypatch):
+    monkeypatch.setattr(sentiment_service, "FAST_MODEL_NAME", "finbert")
+    response = sentiment_client.post(
+        "/analyze", json={"text": TEXT, "tier": "fast", "model": "finbert"}
+    )
+    assert response.status_code == 400 and "fast tier" in response.json()["detail"]
+    assert sentiment_client.post("/analyze", json={"text": TEXT, "tier": "fast"}).status_code == 200
+
+
+def test_columnar_output_matches_records(sentiment_service, sentiment_client):
+    records = sentiment_client.post("/analyze", json={"text": TEXT}).json()["sentiment_results"]
+    response = sentiment_client.post("/analyze", json={"text": TEXT, "format": "columnar"})
+    columns = response.json()["sentiment_columns"]
+
+    starts, ends, scores = (np.array(columns[key]) for key in ("starts", "ends", "scores"))
+    assert sentiment_service.to_records(TEXT, starts, ends, scores) == records
+    assert [columns["labels"][i] for i in columns["class_ids"]] == [r["class"] for r in records]
+
+
+def test_batches_cover_sentence_counts_not_divisible_by_batch_size(sentiment_service,
+                                                                    sentiment_client, monkeypatch):
+    text = " ".join(f"Sentence {i} shows {'strong growth' if i % 2 else 'a loss'}."
+                    for i in range(7))
+    expected = sentiment_client.post("/analyze", json={"text": text}).json()["sentiment_results"]
+
+    batch_sizes = []
+    score_batch = sentiment_service.score_batch
+    monkeypatch.setattr(sentiment_service, "BATCH_SIZE", 3)
+
+    def recording_score_batch(batch, model_name=None):
+        batch_sizes.append(len(batch))
+        return score_batch(batch, model_name)
+
+    monkeypatch.setattr(sentiment_service, "score_batch", recording_score_batch)
+    results = sentiment_client.post("/analyze", json={"text": text}).json()["sentiment_results"]
+    assert batch_sizes == [3, 3, 1]
+    assert results == expected
+
+
+def test_incremental_analysis_reuses_previous_scores(sentiment_client):
+    previous = sentiment_client.post("/analyze", json={"text": TEXT}).json()
+    amended = TEXT + " Margins improved."
+    request = {"text": amended, "previous_hash": previous["content_hash"]}
+    response = sentiment_client.post("/analyze", json=request).json()
+    assert (response["incremental"]["reused"], response["incremental"]["recomputed"]) == (3, 1)
+    assert response["sentiment_results"][:3] == previous["sentiment_results"]
+
+    stream = sentiment_client.post("/analyze/stream", json=request)
+    start = json.loads(stream.text.splitlines()[0])
+    assert start["event"] == "start" and start["incremental"]["reused"] == 3
@@ -0,0 +1,113 @@
+"""
+Tests for NDJSON/SSE streaming: the sentiment stream and the converter's relay of it
+"""
+import asyncio
+import json
+
+import httpx
+
+from backend.services.streaming import encode_event
+
+TEXT = " ".join(f"Sentence {i} shows {'strong growth' if i % 2 else 'a loss'}." for i in range(5))
+
+
+def _ndjson(body):
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+def test_encode_event_framing():
+    event = {"event": "batch", "offset": 0}
+    assert encode_event(event) == '{"event": "batch", "offset": 0}\n'
+    assert encode_event(event, "sse") == 'event: batch\ndata: {"event": "batch", "offset": 0}\n\n'
+
+
+def test_sentiment_stream_ndjson_and_sse(sentiment_service, sentiment_client, monkeypatch):
+    monkeypatch.setattr(sentiment_service, "BATCH_SIZE", 2)
+    payload = {"text": TEXT, "html": f"<p>{TEXT}</p>"}
+
+    response = sentiment_client.post("/analyze/stream", json=payload)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson(response.text)
+    assert [e["event"] for e in events] == [
+        "start", "batch", "batch", "batch", "highlighted_html", "done"
+    ]
+    assert [e["offset"] for e in events if e["event"] == "batch"] == [0, 2, 4]
+    results = sum(len(e["results"]) for e in events if e["event"] == "batch")
+    assert results == events[0]["sentence_count"] == 5
+
+    response = sentiment_client.post("/analyze/stream?stream_format=sse", json=payload)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame.split("\n") for frame in response.text.split("\n\n") if frame]
+    assert [lines[0] for lines in frames] == [f"event: {e['event']}" for e in events]
+    assert [json.loads(lines[1][len("data: "):]) for lines in frames][:-1] == events[:-1]
+
+
+def test_sentiment_stream_reports_errors_mid_stream(sentiment_service, sentiment_client,
+                                                    monkeypatch):
+    monkeypatch.setattr(sentiment_service, "BATCH_SIZE", 2)
+    score_with_plan = sentiment_service.score_with_plan
+    calls = []
+
+    def failing_second_batch(sentences, plan):
+        calls.append(len(sentences))
+        if len(calls) == 2:
+            raise RuntimeError("model crashed")
+        return score_with_plan(sentences, plan)
+
+    monkeypatch.setattr(sentiment_service, "score_with_plan", failing_second_batch)
+    events = _ndjson(sentiment_client.post("/analyze/stream", json={"text": TEXT}).text)
+    assert [e["event"] for e in events] == ["start", "batch", "error"]
+    assert "model crashed" in events[-1]["detail"]
+
+
+def test_converter_relays_sentiment_stream(sentiment_service, sentiment_client, monkeypatch):
+    from backend.services import document_converter
+
+    # Route the relay's HTTP client to the sentiment app in-process
+    transport = httpx.ASGITransport(app=sentiment_service.app)
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(document_converter.httpx, "AsyncClient",
+                        lambda **kwargs: client_class(transport=transport, **kwargs))
+    document = {"filename": "report.txt", "text": TEXT, "markdown": TEXT}
+
+    async def relay():
+        stream = document_converter.relay_sentiment_stream(
+            "http://sentiment/analyze/stream", {"text": TEXT}, document, "ndjson", "report",
+            save=False
+        )
+        return [json.loads(chunk) async for chunk in stream]
+
+    events = asyncio.run(relay())
+    assert [e["event"] for e in events] == ["document", "start", "batch", "done"]
+    assert events[0]["filename"] == "report.txt"
+    assert len(events[2]["results"]) == 5
+
+
+def test_converter_relay_reports_malformed_events(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    from backend.services import document_converter
+
+    upstream = FastAPI()
+
+    @upstream.post("/analyze/stream")
+    async def broken_stream():
+        lines = [json.dumps({"event": "start"}) + "\n", '{"event": "batch", "res\n']
+        return StreamingResponse(iter(lines), media_type="application/x-ndjson")
+
+    transport = httpx.ASGITransport(app=upstream)
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(document_converter.httpx, "AsyncClient",
+                        lambda **kwargs: client_class(transport=transport, **kwargs))
+    document = {"filename": "report.txt", "text": TEXT, "markdown": TEXT}
+
+    async def relay():
+        stream = document_converter.relay_sentiment_stream(
+            "http://sentiment/analyze/stream", {"text": TEXT}, document, "ndjson", "report"
+        )
+        return [json.loads(chunk) async for chunk in stream]
+
+    events = asyncio.run(relay())
+    assert [e["event"] for e in events] == ["document", "start", "error"]
+    assert "Malformed event" in events[-1]["detail"]
@@ -14,7 +14,7 @@ const InsightsPanel = ({ analysisResults, analysisType }: InsightsPanelProps) =>
   };
 
   const isNERResponse = (data: any): data is NERResponse => {
-    return data && 'entities' in data;
+    return data && ('entities' in data || 'entity_index' in data);
   };
 
   const isLangExtractResponse = (data: any): data is LangExtractResponse => {
@@ -40,7 +40,7 @@ const InsightsPanel = ({ analysisResults, analysisType }: InsightsPanelProps) =>
   const getNERChartData = (results: NERResponse) => {
     const entityCounts: Record<string, number> = {};
 
-    results.entities.forEach((entity) => {
+    (results.entities ?? []).forEach((entity) => {
       entityCounts[entity.entity_group] = (entityCounts[entity.entity_group] || 0) + 1;
     });
 
@@ -236,9 +236,10 @@ const InsightsPanel = ({ analysisResults, analysisType }: InsightsPanelProps) =>
 
     if (analysisType === "ner" && isNERResponse(analysisResults)) {
       const results = analysisResults;
-      const total = results.entities.length;
+      const entities = results.entities ?? [];
+      const total = entities.length;
       const avgScore = (
-        results.entities.reduce((sum, e) => sum + e.score, 0) / total
+        entities.reduce((sum, e) => sum + e.score, 0) / total
       ).toFixed(2);
 
       return (
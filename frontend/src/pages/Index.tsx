@@ -144,7 +144,7 @@ const Index = () => {
 
         // Extract NER entities for table
         setExtractions(
-          nerData.entities.map((entity) => ({
+          (nerData.entities ?? []).map((entity) => ({
             text: entity.word,
             class: entity.entity_group,
             score: entity.score,
@@ -34,11 +34,27 @@ export interface SentimentResult {
     negative: number;
     neutral: number;
   };
+  prefiltered?: boolean;
 }
 
 export interface SentimentResponse {
   sentiment_results: SentimentResult[];
   highlighted_html?: string;
+  model?: string;
+  cascade?: {
+    fast_model: string;
+    full_model: string;
+    threshold: number;
+    scored: number;
+    escalated: number;
+    escalation_fraction: number;
+  };
+  prefilter?: {
+    threshold: number;
+    checked: number;
+    prefiltered: number;
+    prefiltered_fraction: number;
+  };
 }
 
 export interface NEREntity {
@@ -47,13 +63,29 @@ export interface NEREntity {
   word: string;
   start: number;
   end: number;
+  canonical?: string;
+}
+
+export interface NEREntityIndexEntry {
+  text: string;
+  normalized: string;
+  entity_group: string;
+  count: number;
+  starts: number[];
+  ends: number[];
+  max_score: number;
+  mean_score: number;
 }
 
 export interface NERResponse {
   success: boolean;
-  entities: NEREntity[];
-  highlighted_html: string;
+  // entities and highlighted_html are omitted for output="index"
+  entities?: NEREntity[];
+  entity_index?: NEREntityIndexEntry[];
+  highlighted_html?: string;
+  artifact_id?: string;
   saved_file?: string;
+  model?: string;
 }
 
 export interface Extraction {
@@ -68,10 +100,11 @@ export interface LangExtractResponse {
   success: boolean;
   extractions: Extraction[];
   html_visualization: string;
+  artifact_id?: string | null;
   saved_files?: {
     jsonl: string;
     html: string;
-  };
+  } | null;
 }
 
 // API Functions
@@ -119,6 +152,63 @@ export async function analyzeSentiment(
   return response.json();
 }
 
+/**
+ * Analyze sentiment with results streamed in batches (NDJSON).
+ * onBatch is called as soon as each batch of sentences is scored; the
+ * promise resolves with the full response once highlighting is done.
+ */
+export async function analyzeSentimentStream(
+  text: string,
+  html: string | undefined,
+  onBatch: (results: SentimentResult[], total: number) => void
+): Promise<SentimentResponse> {
+  const response = await fetch(`${API_BASE_URLS.sentiment}/analyze/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ text, html }),
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to analyze sentiment');
+  }
+
+  const result: SentimentResponse = { sentiment_results: [] };
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let total = 0;
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line);
+    if (event.event === 'start') {
+      total = event.sentence_count;
+    } else if (event.event === 'batch') {
+      result.sentiment_results.push(...event.results);
+      onBatch(event.results, total);
+    } else if (event.event === 'highlighted_html') {
+      result.highlighted_html = event.highlighted_html;
+    } else if (event.event === 'error') {
+      throw new Error(event.detail || 'Failed to analyze sentiment');
+    }
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+
+  return result;
+}
+
 /**
  * Recognize named entities in text
  */
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Evaluate the neutral pre-filter: speedup vs label agreement with FinBERT.
+
+Reads FinBERT-labelled sentences (JSONL from backend.services.sentiment_analysis,
+ideally from filings not used for training). For each recall target it
+reports the skip threshold, the share of sentences skipped, and the recall
+of non-neutral sentences. It also reports agreement with FinBERT's labels
+(skipped sentences count as neutral, the rest keep FinBERT's label) and the
+end-to-end speedup. The speedup uses the pre-filter's measured cost plus
+FinBERT's measured cost per sentence for the sentences that are not skipped.
+
+Examples:
+    python scripts/evaluate_neutral_prefilter.py rows.jsonl --prefilter prefilter.npz
+    python scripts/evaluate_neutral_prefilter.py rows.jsonl --prefilter prefilter.npz --model-ms 12
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.neutral_prefilter import NeutralPrefilter, read_scored_rows  # noqa: E402
+from backend.services.sentiment_analysis import MODEL_NAME, score_sentences  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Evaluate the neutral pre-filter against FinBERT labels"
+    )
+    parser.add_argument("inputs", nargs="+", help="FinBERT-scored JSONL files")
+    parser.add_argument("--prefilter", required=True, help="Pre-filter model file (.npz)")
+    parser.add_argument("--recall", default="0.9,0.95,0.98,0.99,0.995",
+                        help="Comma-separated non-neutral recall targets (default: %(default)s)")
+    parser.add_argument("--model", default=MODEL_NAME,
+                        help="Model timed for the speedup (default: %(default)s)")
+    parser.add_argument("--model-ms", type=float,
+                        help="Use this model cost per sentence instead of timing it")
+    parser.add_argument("--timing-sentences", type=int, default=256,
+                        help="Sentences used to time the model")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--stub", action="store_true", help="Time the offline stub model")
+    return parser.parse_args()
+
+
+def model_seconds_per_sentence(args, sentences) -> float:
+    if args.model_ms is not None:
+        return args.model_ms / 1000
+    if args.stub:
+        from backend.services.stub_models import StubSentimentModel, StubSentimentTokenizer
+        tokenizer, model = StubSentimentTokenizer(), StubSentimentModel()
+    else:
+        from backend.services.fast_sentiment import load_classifier
+        tokenizer, model = load_classifier(args.model)
+    sample = sentences[:args.timing_sentences]
+    score_sentences(sample[:args.batch_size], tokenizer, model, args.batch_size)  # Warm-up
+    started = time.perf_counter()
+    score_sentences(sample, tokenizer, model, args.batch_size)
+    return (time.perf_counter() - started) / len(sample)
+
+
+def main():
+    args = parse_args()
+    sentences, neutral = read_scored_rows(args.inputs)
+    if not sentences:
+        raise SystemExit("No scored sentences found in the inputs")
+    prefilter = NeutralPrefilter.load(args.prefilter)
+
+    started = time.perf_counter()
+    p_neutral = prefilter.predict(sentences)
+    prefilter_cost = (time.perf_counter() - started) / len(sentences)
+    model_cost = model_seconds_per_sentence(args, sentences)
+
+    non_neutral = ~neutral
+    print(f"Sentences:        {len(sentences)} ({neutral.mean():.1%} neutral per FinBERT)")
+    print(f"Pre-filter cost:  {prefilter_cost * 1e6:.1f} us/sentence")
+    print(f"Model cost:       {model_cost * 1000:.2f} ms/sentence")
+    print()
+    print(f"{'recall target':>13} {'threshold':>10} {'skipped':>8} {'recall':>8} "
+          f"{'agreement':>10} {'speedup':>8}")
+    for target in (float(value) for value in args.recall.split(",")):
+        threshold = prefilter.threshold(target)
+        skipped = p_neutral > threshold
+        missed = int((skipped & non_neutral).sum())
+        recall = 1 - missed / non_neutral.sum() if non_neutral.any() else 1.0
+        agreement = 1 - missed / len(sentences)
+        speedup = model_cost / (prefilter_cost + model_cost * (1 - skipped.mean()))
+        print(f"{target:>13} {threshold:>10.4f} {skipped.mean():>8.1%} {recall:>8.2%} "
+              f"{agreement:>10.2%} {speedup:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
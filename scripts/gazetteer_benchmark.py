@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the NER gazetteer index: build time, index size, open time and
+lookup throughput.
+
+Uses a real gazetteer file and document if given, otherwise generates a
+synthetic listing of --entries companies/tickers and a filing-like text that
+mentions some of them.
+
+Examples:
+    python scripts/gazetteer_benchmark.py --entries 300000 --text-kb 500
+    python scripts/gazetteer_benchmark.py --gazetteer listings.txt --text filing.txt
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.gazetteer import Gazetteer, build_index, index_path  # noqa: E402
+
+SYLLABLES = ["al", "be", "cor", "da", "en", "fin", "gro", "hol", "in", "jo", "ka", "lu", "mar",
+             "nex", "or", "pra", "qua", "ro", "sta", "tri", "un", "ve", "wes", "xa", "yo", "zen"]
+SUFFIXES = ["Inc.", "Corp.", "Corporation", "Holdings", "Group", "Ltd.", "plc", "Bancorp",
+            "Technologies"]
+FILLER = ("The Company reported revenue growth of 12% year over year, driven by strong demand. "
+          "Operating expenses increased due to higher personnel costs "
+          "and investments in research. ")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the NER gazetteer index")
+    parser.add_argument("--gazetteer", help="Gazetteer file (default: synthetic)")
+    parser.add_argument("--text", help="Document to match (default: synthetic)")
+    parser.add_argument("--entries", type=int, default=300000,
+                        help="Synthetic gazetteer size (default: 300000)")
+    parser.add_argument("--text-kb", type=int, default=500,
+                        help="Synthetic document size in KB (default: 500)")
+    parser.add_argument("--repeat", type=int, default=5, help="Lookup repetitions (default: 5)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def synthetic_gazetteer(path: Path, entries: int, rng: random.Random):
+    names = []
+    tickers = set()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("ticker|name\n")
+        for _ in range(entries):
+            words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+                     for _ in range(rng.randint(1, 3))]
+            name = " ".join(words + [rng.choice(SUFFIXES)])
+            ticker = "".join(
+                rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 5))
+            )
+            if ticker in tickers:
+                ticker = ""
+            tickers.add(ticker)
+            f.write(f"{ticker}|{name}\n")
+            names.append((ticker, name))
+    return names
+
+
+def synthetic_text(names, size_kb: int, rng: random.Random) -> str:
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        ticker, name = rng.choice(names)
+        listing = f"{name} (NASDAQ: {ticker})" if ticker else name
+        sentence = f"{listing} signed an agreement. "
+        parts.append(sentence + FILLER)
+        size += len(parts[-1])
+    return "".join(parts)
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        if args.gazetteer:
+            source = Path(args.gazetteer)
+            names = None
+        else:
+            source = tmp_path / "gazetteer.txt"
+            print(f"Generating synthetic gazetteer with {args.entries} entries...")
+            names = synthetic_gazetteer(source, args.entries, rng)
+
+        started = time.perf_counter()
+        meta = build_index(str(source), str(tmp_path / "index"))
+        index_dir = index_path(str(source), str(tmp_path / "index"))
+        build_seconds = time.perf_counter() - started
+        index_bytes = sum(f.stat().st_size for f in index_dir.iterdir())
+
+        started = time.perf_counter()
+        gazetteer = Gazetteer(str(index_dir))
+        open_seconds = time.perf_counter() - started
+
+        if args.text:
+            text = Path(args.text).read_text(encoding="utf-8")
+        else:
+            text = synthetic_text(names or [("", "Acme Corp.")], args.text_kb, rng)
+
+        gazetteer.find(text[:10000])  # Warm up the mapped pages
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            entities = gazetteer.find(text)
+        lookup_seconds = (time.perf_counter() - started) / args.repeat
+
+    print()
+    print(f"Entries:          {meta['entries']} "
+          f"({meta['sequences']} match sequences, {meta['vocab']} distinct tokens)")
+    print(f"Trie nodes:       {meta['nodes']}")
+    print(f"Build time:       {build_seconds:.2f}s")
+    print(f"Index size:       {index_bytes / 1024 / 1024:.1f} MB")
+    print(f"Open (mmap):      {open_seconds * 1000:.1f} ms")
+    print(f"Document:         {len(text) / 1024:.0f} KB, {len(entities)} matches")
+    print(f"Lookup:           {lookup_seconds * 1000:.1f} ms per document "
+          f"({len(text) / lookup_seconds / 1024 / 1024:.2f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
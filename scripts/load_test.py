@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTTP load-test harness for the FinSight backend services
+
+Starts all four services through start_backend.py --production, optionally
+with offline stub models and the stub LangExtract provider, then replays a
+weighted mix of /convert, /analyze, /recognize and /extract traffic at a
+target request rate. Reports throughput, error rate and latency percentiles
+per endpoint, /health latency per service (a proxy for event-loop blocking)
+and resident memory of the service processes before and after the run.
+
+Examples:
+    python scripts/load_test.py --stub --rps 20 --duration 60
+    python scripts/load_test.py --no-start --mix analyze=3,recognize=1
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+# Ensure UTF-8 encoding for console output on Windows
+if sys.platform == "win32":
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+HOST = "127.0.0.1"
+
+# Endpoint name -> (port, path)
+ENDPOINTS = {
+    "convert": (8000, "/convert"),
+    "analyze": (8001, "/analyze"),
+    "recognize": (8002, "/recognize"),
+    "extract": (8003, "/extract"),
+}
+
+SERVICE_PORTS = {
+    "Document Converter": 8000,
+    "Sentiment Analysis": 8001,
+    "NER Service": 8002,
+    "LangExtract Service": 8003,
+}
+
+DEFAULT_MIX = "convert=1,analyze=4,recognize=3,extract=1"
+
+SAMPLE_TEXT = (
+    "Apple Inc. reported record revenue of $119.6 billion for the fourth quarter. "
+    "The company's CEO, Tim Cook, stated that this represents strong growth "
+    "across all product lines. "
+    "Earnings per share increased to $1.52, beating analyst expectations. "
+    "However, wearables revenue declined 4% year over year due to weak demand in Greater China. "
+    "The results exceeded Wall Street projections, sending shares higher in after-hours trading. "
+)
+
+EXTRACT_EXAMPLES = [
+    {
+        "text": "Alpha Finance Corp. enters into agreement for $2,500,000.",
+        "extractions": [
+            {
+                "extraction_class": "party",
+                "extraction_text": "Alpha Finance Corp.",
+                "attributes": {"role": "provider"}
+            },
+            {
+                "extraction_class": "amount",
+                "extraction_text": "$2,500,000",
+                "attributes": {"currency": "USD"}
+            }
+        ]
+    }
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the FinSight backend services")
+    parser.add_argument("--rps", type=float, default=10.0,
+                        help="Target requests per second (default: 10)")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Test duration in seconds (default: 30)")
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"Weighted endpoint mix, e.g. '{DEFAULT_MIX}'"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=100,
+        help="Client connection pool limit per run (default: 100)"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Per-request timeout in seconds")
+    parser.add_argument(
+        "--text-repeat",
+        type=int,
+        default=5,
+        help="Repeat the sample paragraph N times to grow the request text (default: 5)"
+    )
+    parser.add_argument("--stub", action="store_true",
+                        help="Use offline stub models and stub LangExtract provider")
+    parser.add_argument("--no-start", action="store_true",
+                        help="Use already running services instead of starting them")
+    parser.add_argument("--startup-timeout", type=float, default=300.0,
+                        help="Seconds to wait for services to become healthy")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the endpoint mix")
+    parser.add_argument("--json-output", help="Write the report as JSON to this path")
+    return parser.parse_args()
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'name=weight,...' into a weight dictionary."""
+    weights = {}
+    for item in mix.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}'. Choose from: {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight) if weight else 1.0
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("Endpoint mix must contain at least one positive weight")
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Total resident memory of a process and its children (Linux only)."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            for line in (proc / str(current) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+                    break
+            children_path = proc / str(current) / "task" / str(current) / "children"
+            children = children_path.read_text().split()
+            pending.extend(int(c) for c in children)
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024.0
+
+
+def build_request(client: httpx.AsyncClient, name: str, text: str):
+    """Return a coroutine issuing one request for the given endpoint."""
+    port, path = ENDPOINTS[name]
+    url = f"http://{HOST}:{port}{path}"
+
+    if name == "convert":
+        markdown = "# Quarterly Report\n\n" + text
+        files = {"file": ("load_test.md", markdown.encode("utf-8"), "text/markdown")}
+        return client.post(url, files=files)
+    if name == "analyze":
+        html = f"<html><body><p>{text}</p></body></html>"
+        return client.post(url, json={"text": text, "html": html})
+    if name == "recognize":
+        return client.post(url, json={"text": text})
+    return client.post(url, json={
+        "text": text,
+        "prompt_description": "Extract parties and monetary amounts",
+        "examples": EXTRACT_EXAMPLES,
+    })
+
+
+async def wait_until_healthy(timeout: float) -> bool:
+    """Poll every service's /health until all report healthy or timeout expires."""
+    deadline = time.monotonic() + timeout
+    pending = dict(SERVICE_PORTS)
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while pending and time.monotonic() < deadline:
+            for name, port in list(pending.items()):
+                try:
+                    response = await client.get(f"http://{HOST}:{port}/health")
+                    if response.status_code == 200 and response.json().get("status") == "healthy":
+                        print(f"  ✅ {name} is healthy")
+                        del pending[name]
+                except httpx.HTTPError:
+                    pass
+            if pending:
+                await asyncio.sleep(1.0)
+    for name in pending:
+        print(f"  ❌ {name} did not become healthy")
+    return not pending
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event,
+                       samples: Dict[str, List[float]]):
+    """Measure /health latency while the load runs (event-loop blocking indicator)."""
+    while not stop.is_set():
+        for name, port in SERVICE_PORTS.items():
+            started = time.perf_counter()
+            try:
+                await client.get(f"http://{HOST}:{port}/health")
+                samples[name].append((time.perf_counter() - started) * 1000.0)
+            except httpx.HTTPError:
+                samples[name].append(float("nan"))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(args, weights: Dict[str, float]) -> Dict:
+    rng = random.Random(args.seed)
+    names = list(weights)
+    weight_values = [weights[n] for n in names]
+    text = SAMPLE_TEXT * args.text_repeat
+
+    latencies: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = {n: 0 for n in names}
+    error_samples: Dict[str, str] = {}
+    health_samples: Dict[str, List[float]] = {n: [] for n in SERVICE_PORTS}
+
+    limits = httpx.Limits(max_connections=args.max_connections,
+                          max_keepalive_connections=args.max_connections)
+    total_requests = int(args.rps * args.duration)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client, \
+            httpx.AsyncClient(timeout=args.timeout) as health_client:
+
+        async def issue(name: str, scheduled: float):
+            try:
+                response = await build_request(client, name, text)
+                ok = response.status_code == 200
+                if not ok:
+                    error_samples.setdefault(
+                        name, f"HTTP {response.status_code}: {response.text[:200]}"
+                    )
+            except httpx.HTTPError as e:
+                ok = False
+                error_samples.setdefault(name, f"{type(e).__name__}: {e}")
+            # Latency is measured from the scheduled send time, so client-side
+            # queueing behind the connection limit is not hidden (open-loop load)
+            latency_ms = (time.perf_counter() - scheduled) * 1000.0
+            if ok:
+                latencies[name].append(latency_ms)
+            else:
+                errors[name] += 1
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(health_client, stop, health_samples))
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total_requests):
+            scheduled = start + i / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = rng.choices(names, weights=weight_values)[0]
+            tasks.append(asyncio.create_task(issue(name, scheduled)))
+
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    report = {"elapsed_seconds": elapsed, "target_rps": args.rps, "endpoints": {}, "health_ms": {}}
+    for name in names:
+        values = sorted(latencies[name])
+        count = len(values) + errors[name]
+        report["endpoints"][name] = {
+            "requests": count,
+            "errors": errors[name],
+            "error_rate": errors[name] / count if count else 0.0,
+            "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(values, 50),
+            "p90_ms": percentile(values, 90),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else 0.0,
+            "first_error": error_samples.get(name),
+        }
+    for name, samples in health_samples.items():
+        values = sorted(v for v in samples if v == v)  # drop NaN (failed probes)
+        report["health_ms"][name] = {
+            "samples": len(samples),
+            "failed": len(samples) - len(values),
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99),
+            "max_ms": values[-1] if values else 0.0,
+        }
+    return report
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 60)
+    print("📊 Load Test Results")
+    print("=" * 60)
+    print(f"Duration: {report['elapsed_seconds']:.1f}s "
+          f"at target {report['target_rps']:.1f} req/s\n")
+
+    header = (f"{'endpoint':<10} {'reqs':>6} {'err%':>6} {'rps':>7} "
+              f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    print(header)
+    print("-" * len(header))
+    for name, stats in report["endpoints"].items():
+        print(
+            f"{name:<10} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% "
+            f"{stats['throughput_rps']:>7.2f} {stats['p50_ms']:>7.0f}ms {stats['p90_ms']:>7.0f}ms "
+            f"{stats['p99_ms']:>7.0f}ms {stats['max_ms']:>7.0f}ms"
+        )
+    for name, stats in report["endpoints"].items():
+        if stats["first_error"]:
+            print(f"  ⚠️  {name}: {stats['first_error']}")
+
+    print("\n🩺 /health latency under load (high values mean a blocked event loop):")
+    for name, stats in report["health_ms"].items():
+        print(
+            f"  • {name:<20} p50 {stats['p50_ms']:>7.1f}ms  p99 {stats['p99_ms']:>7.1f}ms  "
+            f"max {stats['max_ms']:>7.1f}ms  failed {stats['failed']}/{stats['samples']}"
+        )
+
+    if report.get("rss_mb_before") is not None:
+        growth = report["rss_mb_after"] - report["rss_mb_before"]
+        print(
+            f"\n🧠 Service memory (RSS): {report['rss_mb_before']:.0f} MB -> "
+            f"{report['rss_mb_after']:.0f} MB ({growth:+.0f} MB)"
+        )
+    print("=" * 60)
+
+
+def main():
+    args = parse_args()
+    weights = parse_mix(args.mix)
+
+    print("=" * 60)
+    print("🚦 FinSight Backend Load Test")
+    print("=" * 60)
+
+    backend = None
+    if not args.no_start:
+        env = os.environ.copy()
+        if args.stub:
+            env["FINSIGHT_STUB_MODELS"] = "1"
+            env["LANGEXTRACT_PROVIDER"] = "stub"
+        print(f"\n📦 Starting services{' with stub models' if args.stub else ''}...")
+        backend = subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / "scripts" / "start_backend.py"), "--production"],
+            cwd=str(PROJECT_ROOT),
+            env=env,
+        )
+
+    try:
+        print("\n⏳ Waiting for services to become healthy...")
+        if not asyncio.run(wait_until_healthy(args.startup_timeout)):
+            sys.exit(1)
+
+        rss_before = process_tree_rss_mb(backend.pid) if backend else None
+
+        mix_text = ", ".join(f"{name}={weight:g}" for name, weight in weights.items())
+        print(f"\n🔥 Replaying {mix_text} at {args.rps:g} req/s for {args.duration:g}s...")
+        report = asyncio.run(run_load(args, weights))
+
+        if backend:
+            report["rss_mb_before"] = rss_before
+            report["rss_mb_after"] = process_tree_rss_mb(backend.pid)
+
+        print_report(report)
+
+        if args.json_output:
+            with open(args.json_output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report saved to: {args.json_output}")
+
+    finally:
+        if backend:
+            print("\n🛑 Stopping services...")
+            # start_backend.py shuts its children down on Ctrl+C
+            if sys.platform == "win32":
+                backend.terminate()
+            else:
+                backend.send_signal(signal.SIGINT)
+            try:
+                backend.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                backend.kill()
+
+
+if __name__ == "__main__":
+    main()
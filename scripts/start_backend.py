@@ -3,11 +3,23 @@
 """
 Unified startup script for all backend services
 Starts all FastAPI services on different ports
+
+Development (default): uvicorn --reload, one worker per service; if any
+service dies the whole stack is stopped.
+
+Production (--production): no reload, configurable worker count per service,
+and crashed services are restarted with exponential backoff while the rest
+of the stack keeps serving.
 """
 
+import argparse
+import json
+import signal
 import subprocess
 import sys
 import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 # Ensure UTF-8 encoding for console output on Windows
@@ -22,71 +34,255 @@ PROJECT_ROOT = Path(__file__).parent.parent
 # Service configurations
 SERVICES = [
     {
+        "key": "converter",
         "name": "Document Converter",
         "file": "backend.services.document_converter",
         "port": 8000,
-        "host": "127.0.0.1"
+        "host": "127.0.0.1",
+        "workers": 1
     },
     {
+        "key": "sentiment",
         "name": "Sentiment Analysis",
         "file": "backend.services.sentiment_service",
         "port": 8001,
-        "host": "127.0.0.1"
+        "host": "127.0.0.1",
+        "workers": 1
     },
     {
+        "key": "ner",
         "name": "NER Service",
         "file": "backend.services.ner_service",
         "port": 8002,
-        "host": "127.0.0.1"
+        "host": "127.0.0.1",
+        "workers": 1
     },
     {
+        "key": "langextract",
         "name": "LangExtract Service",
         "file": "backend.services.langextract_service",
         "port": 8003,
-        "host": "127.0.0.1"
+        "host": "127.0.0.1",
+        "workers": 1
     }
 ]
 
+# Restart backoff for crashed services in production mode (seconds)
+RESTART_BACKOFF_INITIAL = 1.0
+RESTART_BACKOFF_MAX = 60.0
+# A service that stays up this long gets its backoff reset
+RESTART_BACKOFF_RESET_AFTER = 120.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start all FinSight backend services")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="No reload, per-service workers and automatic restart of crashed services"
+    )
+    parser.add_argument(
+        "--no-reload",
+        action="store_true",
+        help="Run uvicorn without --reload (implied by --production)"
+    )
+    parser.add_argument(
+        "--workers",
+        action="append",
+        default=[],
+        metavar="[SERVICE=]N",
+        help="Worker processes per service, e.g. '--workers 2' or '--workers sentiment=4' "
+             f"(services: {', '.join(s['key'] for s in SERVICES)}). Production mode only."
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=300.0,
+        help="Seconds to wait for all services to pass their /health readiness probe (default: 300)"
+    )
+    return parser.parse_args()
+
+
+def apply_worker_overrides(overrides):
+    """Apply '--workers' values ('N' for all services or 'service=N') to SERVICES."""
+    by_key = {s["key"]: s for s in SERVICES}
+    for override in overrides:
+        key, sep, count = override.rpartition("=")
+        if not sep:
+            targets = SERVICES
+        elif key in by_key:
+            targets = [by_key[key]]
+        else:
+            raise SystemExit(
+                f"Unknown service '{key}' in --workers. Choose from: {', '.join(by_key)}"
+            )
+        if not count.isdigit() or int(count) < 1:
+            raise SystemExit(f"Invalid worker count '{count}' in --workers")
+        for service in targets:
+            service["workers"] = int(count)
+
+
+def build_command(service, production, reload):
+    """Build the uvicorn command line for a service."""
+    cmd = [
+        sys.executable,
+        "-m", "uvicorn",
+        f"{service['file']}:app",
+        "--host", service['host'],
+        "--port", str(service['port']),
+    ]
+    if production:
+        cmd += ["--workers", str(service["workers"]), "--no-access-log"]
+    elif reload:
+        # Only watch the backend directory to avoid .venv and node_modules
+        cmd += ["--reload", "--reload-dir", str(PROJECT_ROOT / "backend")]
+    return cmd
+
+
+def launch(entry):
+    """Start (or restart) the uvicorn process for a service entry."""
+    # Don't capture output - let it print to console
+    entry["process"] = subprocess.Popen(entry["cmd"], cwd=str(PROJECT_ROOT))
+    entry["started_at"] = time.monotonic()
+    entry["ready"] = False
+
+
+def is_ready(entry):
+    """Readiness probe: GET /health must return 200 with status 'healthy'."""
+    url = f"http://{entry['host']}:{entry['port']}/health"
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            if response.status != 200:
+                return False
+            return json.loads(response.read().decode("utf-8")).get("status") == "healthy"
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def wait_until_ready(processes, timeout, production):
+    """
+    Poll readiness probes of all services in parallel until every one is ready.
+
+    In production mode services that crash during startup are restarted via
+    supervise(); in development mode a crash aborts startup.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for p in processes:
+            if p["ready"]:
+                continue
+            if p["process"].poll() is not None:
+                if not production:
+                    print(f"\n❌ {p['name']} exited during startup!")
+                    return False
+                supervise([p])
+                continue
+            if is_ready(p):
+                p["ready"] = True
+                elapsed = time.monotonic() - p["started_at"]
+                print(f"  ✅ {p['name']} ready on port {p['port']} ({elapsed:.1f}s)")
+        if all(p["ready"] for p in processes):
+            return True
+        time.sleep(0.5)
+
+    for p in processes:
+        if not p["ready"]:
+            print(f"  ❌ {p['name']} not ready after {timeout:.0f}s")
+    return False
+
+
+def supervise(processes):
+    """
+    Restart crashed services with exponential backoff (production mode).
+
+    Each service is handled independently, so one crash never takes down the
+    rest of the stack.
+    """
+    now = time.monotonic()
+    for p in processes:
+        if p["process"].poll() is None:
+            # Healthy long enough: forget earlier crashes
+            healthy_for = now - p["started_at"]
+            if p["backoff"] > RESTART_BACKOFF_INITIAL and healthy_for > RESTART_BACKOFF_RESET_AFTER:
+                p["backoff"] = RESTART_BACKOFF_INITIAL
+            continue
+
+        if p["restart_at"] is None:
+            code = p["process"].returncode
+            p["restart_at"] = now + p["backoff"]
+            print(f"\n❌ {p['name']} exited with code {code}; restarting in {p['backoff']:.0f}s...")
+            p["backoff"] = min(p["backoff"] * 2, RESTART_BACKOFF_MAX)
+        elif now >= p["restart_at"]:
+            p["restart_at"] = None
+            p["restarts"] += 1
+            print(f"\n🔄 Restarting {p['name']} (restart #{p['restarts']})...")
+            launch(p)
+
+
+def stop_all(processes):
+    print("\n\n🛑 Stopping all services...")
+    for p in processes:
+        print(f"  Stopping {p['name']}...")
+        p['process'].terminate()
+    for p in processes:
+        try:
+            p['process'].wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            p['process'].kill()
+    print("\n✅ All services stopped.")
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
 def main():
+    args = parse_args()
+    production = args.production
+    reload = not (args.production or args.no_reload)
+    if args.workers and not production:
+        print("⚠️  --workers only applies with --production; ignoring")
+    apply_worker_overrides(args.workers if production else [])
+
+    # Process managers (systemd, docker) stop us with SIGTERM
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
     print("=" * 60)
-    print("🚀 Starting FinSight Backend Services")
+    mode = "production" if production else "development"
+    print(f"🚀 Starting FinSight Backend Services ({mode} mode)")
     print("=" * 60)
 
     processes = []
+    startup_begin = time.monotonic()
 
     try:
+        # Launch every service at once; readiness probes replace fixed sleeps
         for service in SERVICES:
-            print(f"\n📦 Starting {service['name']} on port {service['port']}...")
-
-            # Start the service using uvicorn
-            # Only watch the backend directory to avoid .venv and node_modules
-            cmd = [
-                sys.executable,
-                "-m", "uvicorn",
-                f"{service['file']}:app",
-                "--host", service['host'],
-                "--port", str(service['port']),
-                "--reload",
-                "--reload-dir", str(PROJECT_ROOT / "backend")
-            ]
-
-            # Don't capture output - let it print to console
-            process = subprocess.Popen(
-                cmd,
-                cwd=str(PROJECT_ROOT)
-            )
-
-            processes.append({
+            workers = f" with {service['workers']} worker(s)" if production else ""
+            print(f"\n📦 Starting {service['name']} on port {service['port']}{workers}...")
+            entry = {
                 "name": service['name'],
-                "process": process,
-                "port": service['port']
-            })
+                "host": service['host'],
+                "port": service['port'],
+                "cmd": build_command(service, production, reload),
+                "backoff": RESTART_BACKOFF_INITIAL,
+                "restart_at": None,
+                "restarts": 0,
+            }
+            launch(entry)
+            processes.append(entry)
 
-            # Give it a moment to start
-            time.sleep(2)
+        print("\n💡 Waiting for services to pass readiness probes "
+              "(models may take a while to load)...\n")
+        ready = wait_until_ready(processes, args.ready_timeout, production)
+        if not ready and not production:
+            raise KeyboardInterrupt
 
         print("\n" + "=" * 60)
-        print("✅ All services started successfully!")
+        if ready:
+            print(f"✅ All services started in {time.monotonic() - startup_begin:.1f}s!")
+        else:
+            print("⚠️  Some services are not ready yet; they will keep being supervised")
         print("=" * 60)
         print("\n📍 Running services:")
         for p in processes:
@@ -98,11 +294,13 @@ def main():
 
         print("\n⚠️  Press Ctrl+C to stop all services")
         print("=" * 60)
-        print("\n💡 Waiting for models to load... Check logs above\n")
 
         # Wait for all processes
         while True:
             time.sleep(1)
+            if production:
+                supervise(processes)
+                continue
             # Check if any process has died
             for p in processes:
                 if p['process'].poll() is not None:
@@ -110,15 +308,7 @@ def main():
                     raise KeyboardInterrupt
 
     except KeyboardInterrupt:
-        print("\n\n🛑 Stopping all services...")
-        for p in processes:
-            print(f"  Stopping {p['name']}...")
-            p['process'].terminate()
-            try:
-                p['process'].wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                p['process'].kill()
-        print("\n✅ All services stopped.")
+        stop_all(processes)
         sys.exit(0)
 
 if __name__ == "__main__":